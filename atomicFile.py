@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Atomic file updates
+JSON caches and textfiles that several worker processes rewrite: each write
+goes through its own temp file, and read-merge-write cycles hold a lock file
+so no process drops another's update
+"""
+import os
+import time
+import tempfile
+from contextlib import contextmanager
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+def writeAtomically(path, text):
+    # A temp file of our own, parallel workers writing the same path can't clobber each other's
+    descriptor, tempPath = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=os.path.basename(path) + ".")
+    try:
+        with os.fdopen(descriptor, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tempPath, path)
+    except BaseException:
+        try:
+            os.unlink(tempPath)
+        except OSError:
+            pass
+        raise
+
+@contextmanager
+def fileLock(path):
+    """Hold an exclusive lock on path + ".lock" across processes"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(f"{path}.lock", "a+") as f:
+        if os.name == "nt":
+            # msvcrt only offers a non-blocking lock on Windows, retry until it is ours
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+                    break
+                except OSError:
+                    time.sleep(0.05)
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Offline upload benchmark
+Serves the stand-in Studio and Instagram pages from benchmark/ on localhost
+with artificial latencies, runs the real uploaders against them in headless
+Chrome and reports per-video latency, throughput and per-step timings,
+compared against a stored baseline
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from concurrent.futures import ThreadPoolExecutor
+import config
+from config import success, error, info, warning, highlight
+
+benchDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark")
+defaultBaselinePath = os.path.join(benchDir, "baseline.json")
+
+# Milliseconds, keys match the later("...") calls in the stand-in pages
+latencyPresets = {
+    "none": {"page": 0, "menu": 0, "dialog": 0, "upload": 0, "transfer": 0, "dropdown": 0, "step": 0, "publish": 0},
+    "fast": {"page": 50, "menu": 50, "dialog": 150, "upload": 500, "transfer": 2000, "dropdown": 100, "step": 200, "publish": 500},
+    "realistic": {"page": 400, "menu": 200, "dialog": 600, "upload": 3000, "transfer": 20000, "dropdown": 300, "step": 800, "publish": 2500}
+}
+
+def makeHandler(latency):
+    pages = {"/studio": "studio.html", "/instagram": "instagram.html"}
+
+    class StandInHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            pageName = next((name for prefix, name in pages.items() if self.path.startswith(prefix)), None)
+            if pageName is None:
+                self.send_error(404)
+                return
+
+            time.sleep(latency.get("page", 0) / 1000)
+            with open(os.path.join(benchDir, pageName), "r", encoding="utf-8") as f:
+                body = f.read().replace("/*LATENCY*/{}", json.dumps(latency)).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StandInHandler
+
+def startStandInServer(latency):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), makeHandler(latency))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def benchProfiles(count, workDir, firstPort, launchProfile):
+    tags = "benchmark,vocabulary,english"
+    return {
+        f"bench{i + 1}": {
+            "profileName": f"bench{i + 1}",
+            "youtubeChannelId": f"UCbench{i + 1}",
+            "debuggingPort": firstPort + i,
+            "tags": tags,
+            "chromeDataDir": os.path.join(workDir, "chromeData", f"bench{i + 1}"),
+            "launchProfile": launchProfile
+        }
+        for i in range(count)
+    }
+
+def percentile(values, fraction):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, round(fraction * (len(values) - 1))))]
+
+def runBenchmark(videos, profileCount, platforms, latency, launchProfile="lean", firstPort=9400, concurrent=True,
+                 batchPlatforms=None):
+    """
+    Upload `videos` dummy videos per profile through the stand-ins, platforms in
+    batchPlatforms get all of a profile's videos in one batch session
+
+    Returns:
+        dict: Summary with per-video latencies, throughput and per-step p50/p95
+    """
+    workDir = tempfile.mkdtemp(prefix="naradx-bench-")
+    server = startStandInServer(latency)
+    baseUrl = f"http://127.0.0.1:{server.server_address[1]}"
+
+    # Point the uploaders at the stand-ins before they are imported
+    config.youtubeStudioUrl = f"{baseUrl}/studio"
+    config.instagramUrl = f"{baseUrl}/instagram/"
+    profilesConfig = benchProfiles(profileCount, workDir, firstPort, launchProfile)
+    config.profiles.update(profilesConfig)
+
+    import metrics
+    metrics.metrics.spansPath = os.path.join(workDir, "spans.jsonl")
+    metrics.metrics.promPath = os.path.join(workDir, "uploader.prom")
+    # Hits on the stand-in pages must not reorder the real selector fallbacks
+    from selectorRegistry import registry
+    registry.path = os.path.join(workDir, "selectorStats.json")
+    registry.stats = {}
+    from uploadRunner import uploadVideo
+    from youTubeUpload import uploadBatchToYoutube
+    from instagramUpload import uploadReelsToInstagram
+    batchUploaders = {"youtube": uploadBatchToYoutube, "instagram": uploadReelsToInstagram}
+    batchPlatforms = [name for name in platforms if name in (batchPlatforms or [])]
+    from sessionPool import SessionPool
+
+    videoPaths = []
+    for i in range(videos):
+        videoPath = os.path.join(workDir, f"video{i + 1}.mp4")
+        with open(videoPath, "wb") as f:
+            f.write(os.urandom(256 * 1024))
+        videoPaths.append(videoPath)
+
+    latencies = []
+    memoryMB = []
+    failures = 0
+    lock = threading.Lock()
+
+    def runProfile(profileName, pool):
+        nonlocal failures
+        session = pool.acquire(profileName)
+        perVideo = [name for name in platforms if name not in batchPlatforms]
+        try:
+            for platformName in batchPlatforms:
+                startTime = time.perf_counter()
+                results = batchUploaders[platformName](profileName, [
+                    (f"Benchmark {i + 1}", f"Benchmark video {i + 1} #benchmark", videoPath)
+                    for i, videoPath in enumerate(videoPaths)
+                ], session)
+                with lock:
+                    # One dialog for all of them, spread evenly
+                    latencies.extend([(time.perf_counter() - startTime) / len(videoPaths)] * len(videoPaths))
+                    failures += sum(1 for ok in results if not ok)
+            for i, videoPath in enumerate(videoPaths if perVideo else []):
+                startTime = time.perf_counter()
+                results = uploadVideo(
+                    profileName, f"Benchmark {i + 1}", f"Benchmark video {i + 1} #benchmark",
+                    videoPath, session, concurrent, perVideo
+                )
+                with lock:
+                    latencies.append(time.perf_counter() - startTime)
+                    failures += sum(1 for ok in results.values() if not ok)
+            sessionMemory = session.memoryMB()
+            if sessionMemory is not None:
+                with lock:
+                    memoryMB.append(sessionMemory)
+        finally:
+            pool.release(profileName)
+
+    try:
+        startTime = time.perf_counter()
+        with SessionPool(config.profiles) as pool:
+            with ThreadPoolExecutor(max_workers=profileCount) as executor:
+                for future in [executor.submit(runProfile, name, pool) for name in profilesConfig]:
+                    future.result()
+        wallSeconds = time.perf_counter() - startTime
+
+        steps = {}
+        if os.path.exists(metrics.metrics.spansPath):
+            for record in metrics.loadSpans(metrics.metrics.spansPath):
+                steps.setdefault(record["name"], []).append(record["seconds"])
+    finally:
+        server.shutdown()
+        shutil.rmtree(workDir, ignore_errors=True)
+
+    totalVideos = videos * profileCount
+    return {
+        "videos": totalVideos,
+        "profiles": profileCount,
+        "platforms": platforms,
+        "latency": latency,
+        "failures": failures,
+        "wallSeconds": round(wallSeconds, 2),
+        "throughputPerMinute": round(totalVideos / wallSeconds * 60, 2) if wallSeconds else 0.0,
+        "videoP50": round(percentile(latencies, 0.5), 2),
+        "videoP95": round(percentile(latencies, 0.95), 2),
+        "launchProfile": launchProfile,
+        "batchPlatforms": batchPlatforms,
+        "chromeMemoryMB": max(memoryMB) if memoryMB else None,
+        "steps": {
+            name: {"p50": round(percentile(values, 0.5), 3), "p95": round(percentile(values, 0.95), 3)}
+            for name, values in sorted(steps.items())
+        }
+    }
+
+def compareToBaseline(summary, baseline, tolerance):
+    """Regressions beyond tolerance as human readable lines"""
+    regressions = []
+    for key in ("videoP50", "videoP95"):
+        if baseline.get(key) and summary[key] > baseline[key] * (1 + tolerance):
+            regressions.append(f"{key}: {baseline[key]}s -> {summary[key]}s")
+    if baseline.get("throughputPerMinute") and summary["throughputPerMinute"] < baseline["throughputPerMinute"] * (1 - tolerance):
+        regressions.append(f"throughputPerMinute: {baseline['throughputPerMinute']} -> {summary['throughputPerMinute']}")
+    for name, timings in summary["steps"].items():
+        previous = baseline.get("steps", {}).get(name)
+        # Sub-100ms steps are noise at this resolution
+        if previous and previous["p50"] >= 0.1 and timings["p50"] > previous["p50"] * (1 + tolerance):
+            regressions.append(f"{name} p50: {previous['p50']}s -> {timings['p50']}s")
+    return regressions
+
+def printSummary(summary):
+    print(highlight(f"\n=== Benchmark: {summary['videos']} video(s) over {summary['profiles']} profile(s) ==="))
+    print(info(f"⏱️  Wall time: {summary['wallSeconds']}s, throughput: {summary['throughputPerMinute']} videos/min"))
+    print(info(f"📼 Per video p50: {summary['videoP50']}s, p95: {summary['videoP95']}s"))
+    if summary["chromeMemoryMB"] is not None:
+        print(info(f"🧠 Largest Chrome process tree: {summary['chromeMemoryMB']} MB ({summary['launchProfile']} launch profile)"))
+    if summary["failures"]:
+        print(error(f"❌ {summary['failures']} platform upload(s) failed"))
+    print(highlight(f"\n{'span':<44}{'p50 s':>9}{'p95 s':>9}"))
+    for name, timings in summary["steps"].items():
+        print(f"{name:<44}{timings['p50']:>9.3f}{timings['p95']:>9.3f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the uploaders against local stand-in pages")
+    parser.add_argument("--videos", type=int, default=3, help="Videos per profile")
+    parser.add_argument("--profiles", type=int, default=1, help="Profiles uploading in parallel")
+    parser.add_argument("--platforms", nargs="+", default=["youtube", "instagram"], choices=["youtube", "instagram"])
+    parser.add_argument("--latency", default="fast", choices=list(latencyPresets), help="Artificial latency preset")
+    parser.add_argument("--sequential", action="store_true", help="Upload platforms one after the other")
+    parser.add_argument("--batch", nargs="+", default=[], choices=["youtube", "instagram"],
+                        help="Platforms that get each profile's videos in one batch session")
+    parser.add_argument("--launch-profile", default="lean", help="Chrome launch profile from config.launchProfiles")
+    parser.add_argument("--port", type=int, default=9400, help="First remote debugging port")
+    parser.add_argument("--baseline", default=defaultBaselinePath, help="Baseline JSON to compare with")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown before flagging, 0.2 = 20%%")
+    parser.add_argument("--output", help="Also write the summary JSON here")
+    args = parser.parse_args()
+
+    summary = runBenchmark(
+        args.videos, args.profiles, args.platforms, latencyPresets[args.latency],
+        launchProfile=args.launch_profile, firstPort=args.port, concurrent=not args.sequential,
+        batchPlatforms=args.batch
+    )
+    printSummary(summary)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(summary, f, indent=2)
+        print(success(f"✅ Baseline saved to {args.baseline}"))
+        return
+
+    if not os.path.exists(args.baseline):
+        print(warning("⚠️ No baseline yet, run with --save-baseline to create one"))
+        return
+    with open(args.baseline, "r") as f:
+        baseline = json.load(f)
+    if any(baseline.get(key) != summary[key] for key in ("latency", "platforms", "launchProfile", "batchPlatforms")):
+        print(warning("⚠️ Baseline was recorded with different settings, comparison may be skewed"))
+
+    regressions = compareToBaseline(summary, baseline, args.tolerance)
+    if regressions:
+        print(error(f"\n❌ {len(regressions)} regression(s) against the baseline:"))
+        for line in regressions:
+            print(error(f"   {line}"))
+        sys.exit(1)
+    print(success("\n✅ No regressions against the baseline"))
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,157 @@
 import os
+import re
 import sys
+import json
 import time
 import logging
 import subprocess
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from config import success, error, info, warning, highlight, basePath
+import threading
+import urllib.request
+from config import success, error, info, warning, basePath, launchProfiles, devToolsTimeout
+from resourceGovernor import getProcessTreeMemoryMB
+from processReaper import profileDataDir, killProcessTree
+from metrics import span, setAttribute
+from atomicFile import writeAtomically, fileLock
+
+binaryCachePath = os.path.join(basePath, "cache", "binaries.json")
+
+def findChromePath():
+    if os.name == "nt":
+        chromePath = "C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe"
+        if not os.path.exists(chromePath):
+            chromePath = "C:\\Program Files (x86)\\Google\\Chrome\\Application\\chrome.exe"
+    else:
+        chromePath = "/usr/bin/google-chrome"
+        if not os.path.exists(chromePath):
+            chromePath = "/usr/bin/google-chrome-stable"
+        if not os.path.exists(chromePath):
+            chromePath = "/snap/bin/chromium"
+        if not os.path.exists(chromePath):
+            try:
+                chromePath = subprocess.check_output(["which", "google-chrome"], text=True).strip()
+            except subprocess.CalledProcessError:
+                try:
+                    chromePath = subprocess.check_output(["which", "chrome"], text=True).strip()
+                except subprocess.CalledProcessError:
+                    print(error("❌ Chrome not found. Please install Chrome."))
+                    sys.exit(1)
+    
+    return chromePath
+
+def fileFingerprint(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+def majorVersion(versionText):
+    match = re.search(r"(\d+)\.\d+\.\d+", versionText or "")
+    return int(match.group(1)) if match else None
+
+class BinaryCache:
+    """
+    Chrome and chromedriver paths and versions, resolved once and kept in
+    cache/binaries.json until the binary on disk changes
+    """
+    def __init__(self, path=binaryCachePath):
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries = self.load()
+    
+    def load(self):
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(warning(f"⚠️ Ignoring unreadable binary cache {self.path}: {e}"))
+            return {}
+    
+    def save(self, name):
+        # Other workers save the same file, only our entry is written over what is on disk
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with fileLock(self.path):
+                merged = self.load()
+                merged[name] = self.entries[name]
+                writeAtomically(self.path, json.dumps(merged, indent=2))
+            self.entries = merged
+        except Exception as e:
+            print(warning(f"⚠️ Could not save binary cache: {e}"))
+    
+    def resolve(self, name, finder):
+        """Cached entry for a binary, found again with finder() once the cached file changed or vanished"""
+        with self.lock:
+            entry = self.entries.get(name)
+            if entry and entry.get("fingerprint") and fileFingerprint(entry["path"]) == entry["fingerprint"]:
+                return dict(entry)
+            path = finder()
+            entry = {"path": path, "fingerprint": fileFingerprint(path), "version": None}
+            self.entries[name] = entry
+            self.save(name)
+            return dict(entry)
+    
+    def setVersion(self, name, version):
+        with self.lock:
+            entry = self.entries.get(name)
+            if entry and entry.get("version") != version:
+                entry["version"] = version
+                self.save(name)
+    
+    def chromePath(self):
+        return self.resolve("chrome", findChromePath)["path"]
+    
+    def chromeDriverVersion(self, chromeDriverPath):
+        entry = self.resolve("chromedriver", lambda: chromeDriverPath)
+        if entry["path"] != chromeDriverPath:
+            with self.lock:
+                self.entries.pop("chromedriver", None)
+            entry = self.resolve("chromedriver", lambda: chromeDriverPath)
+        if entry["version"] is None and entry["fingerprint"]:
+            try:
+                output = subprocess.check_output([chromeDriverPath, "--version"], text=True, timeout=10)
+                self.setVersion("chromedriver", output.strip())
+                return output.strip()
+            except Exception:
+                return None
+        return entry["version"]
+
+binaryCache = BinaryCache()
+
+def waitForDevTools(port, timeout=None, process=None):
+    """
+    Poll Chrome's DevTools /json/version endpoint until it answers
+
+    Args:
+        port (int): Remote debugging port
+        timeout (float): Seconds before giving up, config.devToolsTimeout by default
+        process (Popen): Launched Chrome, a crash is reported right away instead of at the timeout
+
+    Returns:
+        dict: The /json/version payload, e.g. {"Browser": "Chrome/120.0.6099.109", ...}
+    """
+    timeout = devToolsTimeout if timeout is None else timeout
+    url = f"http://127.0.0.1:{port}/json/version"
+    deadline = time.monotonic() + timeout
+    delay = 0.02
+    lastError = None
+    
+    while True:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                return json.load(response)
+        except Exception as e:
+            lastError = e
+        
+        # Exit code 0 means it handed off to a Chrome already running on this profile, keep polling
+        if process is not None and process.poll() not in (None, 0):
+            raise RuntimeError(f"Chrome exited with code {process.returncode} before DevTools was up on port {port}")
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"Chrome DevTools did not answer on port {port} within {timeout}s ({lastError})")
+        time.sleep(delay)
+        delay = min(delay * 1.5, 0.25)
 
 class BrowserManager:
     def __init__(self, profiles, profileName):
@@ -15,8 +160,9 @@ class BrowserManager:
             sys.exit(1)
             
         self.profile = profiles[profileName]
-        self.chromeDataDir = os.path.join(basePath, "chromeData", self.profile["profileName"])
+        self.chromeDataDir = profileDataDir(self.profile)
         self.debuggingPort = self.profile["debuggingPort"]
+        self.launchProfile = self.profile.get("launchProfile", "full")
         self.profileName = profileName
         
         # Set chromedriver path with proper extension for Windows
@@ -25,6 +171,12 @@ class BrowserManager:
         
         self.chromeProcess = None
         self.driver = None
+        self.extraDrivers = []
+        self.lock = threading.Lock()
+        self.lastUsed = time.time()
+        self.leases = 0
+        self.timeToFirstCommand = None
+        self.devTools = None
         
         print(info(f"🔧 Using profile: {self.profileName}"))
         
@@ -32,29 +184,48 @@ class BrowserManager:
         return os.path.normpath(path)
     
     def getChromePath(self):
-        if os.name == "nt":
-            chromePath = "C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe"
-            if not os.path.exists(chromePath):
-                chromePath = "C:\\Program Files (x86)\\Google\\Chrome\\Application\\chrome.exe"
-        else:
-            chromePath = "/usr/bin/google-chrome"
-            if not os.path.exists(chromePath):
-                chromePath = "/usr/bin/google-chrome-stable"
-            if not os.path.exists(chromePath):
-                chromePath = "/snap/bin/chromium"
-            if not os.path.exists(chromePath):
-                try:
-                    chromePath = subprocess.check_output(["which", "google-chrome"], text=True).strip()
-                except subprocess.CalledProcessError:
-                    try:
-                        chromePath = subprocess.check_output(["which", "chrome"], text=True).strip()
-                    except subprocess.CalledProcessError:
-                        print(error("❌ Chrome not found. Please install Chrome."))
-                        sys.exit(1)
-        
-        return chromePath
+        return binaryCache.chromePath()
+    
+    def checkVersions(self, versionInfo):
+        chromeVersion = versionInfo.get("Browser", "")
+        binaryCache.setVersion("chrome", chromeVersion)
+        driverVersion = binaryCache.chromeDriverVersion(self.chromeDriverPath)
+        chromeMajor, driverMajor = majorVersion(chromeVersion), majorVersion(driverVersion)
+        if chromeMajor and driverMajor and chromeMajor != driverMajor:
+            print(warning(f"⚠️ chromedriver {driverMajor} does not match Chrome {chromeMajor}, attaching may fail"))
     
-    def startBrowser(self, url):
+    def launchArgs(self):
+        if self.launchProfile not in launchProfiles:
+            print(warning(f"⚠️ Unknown launch profile '{self.launchProfile}', using full"))
+            return list(self.profile.get("chromeArgs", []))
+        return launchProfiles[self.launchProfile] + list(self.profile.get("chromeArgs", []))
+    
+    def memoryMB(self):
+        """Resident memory of this session's Chrome process tree in MB, None if unknown"""
+        if not self.chromeProcess or self.chromeProcess.poll() is not None:
+            return None
+        rssMB, _ = getProcessTreeMemoryMB(self.chromeProcess.pid)
+        return rssMB
+    
+    def reportMemory(self, when):
+        if not self.chromeProcess or self.chromeProcess.poll() is not None:
+            return
+        rssMB, processCount = getProcessTreeMemoryMB(self.chromeProcess.pid)
+        if rssMB is not None:
+            print(info(f"🧠 {self.profileName} Chrome {when}: {rssMB} MB resident in {processCount} process(es) "
+                       f"(launch profile: {self.launchProfile})"))
+    
+    def startBrowser(self, url, attach=True):
+        """
+        Launch Chrome for this profile and attach chromedriver to it
+
+        Args:
+            url (str): Page to open
+            attach (bool): Stop once DevTools answers, for callers speaking DevTools themselves
+
+        Returns:
+            bool: True once Chrome is up
+        """
         try:
             chromePath = self.getChromePath()
             userDataDir = self.pathStr(self.chromeDataDir)
@@ -67,44 +238,124 @@ class BrowserManager:
                 "--no-first-run",
                 "--no-default-browser-check",
                 "--disable-blink-features=AutomationControlled",
+                *self.launchArgs(),
                 url
             ]
             
-            self.chromeProcess = subprocess.Popen(chromeArgs)
-            time.sleep(2)
-            
-            chromeOptions = Options()
-            chromeOptions.add_experimental_option("debuggerAddress", f"localhost:{self.debuggingPort}")
-            
-            service = Service(executable_path=self.chromeDriverPath)
-            self.driver = webdriver.Chrome(service=service, options=chromeOptions)
+            startTime = time.perf_counter()
+            with span("browser.startup", profile=self.profileName):
+                # Attach the moment DevTools answers instead of after a fixed sleep
+                with span("browser.launch"):
+                    self.chromeProcess = subprocess.Popen(chromeArgs)
+                    versionInfo = waitForDevTools(self.debuggingPort, process=self.chromeProcess)
+                self.devTools = versionInfo
+                if attach:
+                    self.checkVersions(versionInfo)
+                    self.driver = self.createDriver()
+                    self.driver.window_handles
+                self.timeToFirstCommand = time.perf_counter() - startTime
+                setAttribute("browser", versionInfo.get("Browser"))
             
             osName = "Windows" if os.name == "nt" else "Ubuntu"
-            print(success(f"✅ Connected to Chrome ({osName}) - Profile: {self.profileName}"))
+            print(success(f"✅ Connected to Chrome ({osName}) - Profile: {self.profileName} "
+                          f"in {self.timeToFirstCommand:.2f}s"))
+            self.reportMemory("after launch")
             return True
             
         except Exception as e:
             print(error(f"❌ Browser startup error: {e}"))
             return False
     
-    def closeBrowser(self):
+    def createDriver(self):
+        # Imported on use, the DevTools orchestrator launches Chrome here without ever loading Selenium
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.chrome.service import Service
+        
+        chromeOptions = Options()
+        chromeOptions.add_experimental_option("debuggerAddress", f"localhost:{self.debuggingPort}")
+        
+        service = Service(executable_path=self.chromeDriverPath)
+        with span("browser.attach", profile=self.profileName):
+            return webdriver.Chrome(service=service, options=chromeOptions)
+    
+    def attachDriver(self):
+        # Extra chromedriver client on the same Chrome, so another thread can drive its own tab
+        driver = self.createDriver()
+        with self.lock:
+            self.extraDrivers.append(driver)
+        return driver
+    
+    def detachDriver(self, driver):
+        with self.lock:
+            if driver in self.extraDrivers:
+                self.extraDrivers.remove(driver)
         try:
-            if self.driver:
-                self.driver.quit()
-                print(info(f"🔒 Closing Chrome session for {self.profileName}..."))
-            
-            if self.chromeProcess:
-                self.chromeProcess.terminate()
-                self.chromeProcess.wait(timeout=5)
-                print(success(f"✅ Chrome session closed for {self.profileName}"))
-                
+            driver.quit()
+        except Exception as e:
+            print(warning(f"⚠️ Error detaching driver for {self.profileName}: {e}"))
+    
+    def isAlive(self):
+        if not self.driver:
+            return False
+        if self.chromeProcess and self.chromeProcess.poll() is not None:
+            return False
+        try:
+            self.driver.window_handles
+            return True
+        except Exception:
+            return False
+    
+    def openTab(self, url, driver=None):
+        driver = driver or self.driver
+        self.lastUsed = time.time()
+        driver.switch_to.new_window('tab')
+        driver.get(url)
+        return driver.current_window_handle
+    
+    def closeTab(self, handle, driver=None):
+        driver = driver or self.driver
+        self.lastUsed = time.time()
+        try:
+            handles = driver.window_handles
+            if handle not in handles:
+                return
+            # Keep the last tab around, closing it would end the Chrome session
+            if len(handles) > 1:
+                driver.switch_to.window(handle)
+                driver.close()
+                remaining = [h for h in handles if h != handle]
+                driver.switch_to.window(remaining[0])
         except Exception as e:
-            print(warning(f"⚠️ Error closing Chrome for {self.profileName}: {e}"))
+            print(warning(f"⚠️ Error closing tab for {self.profileName}: {e}"))
+    
+    def closeBrowser(self):
+        """
+        Quit chromedriver and stop Chrome with its renderer and GPU processes
+
+        Returns:
+            bool: True if no Chrome process of this session is left running
+        """
+        for driver in list(self.extraDrivers):
+            self.detachDriver(driver)
+        self.reportMemory("before close")
+        
+        if self.driver:
+            print(info(f"🔒 Closing Chrome session for {self.profileName}..."))
             try:
-                if self.chromeProcess:
-                    self.chromeProcess.kill()
-            except:
-                pass
+                self.driver.quit()
+            except Exception as e:
+                print(warning(f"⚠️ Error quitting chromedriver for {self.profileName}: {e}"))
+        
+        if not self.chromeProcess:
+            return True
+        survivors = killProcessTree(self.chromeProcess.pid, process=self.chromeProcess)
+        if survivors:
+            print(error(f"❌ Chrome for {self.profileName} left {len(survivors)} process(es) running: "
+                        f"{', '.join(map(str, survivors))}"))
+            return False
+        print(success(f"✅ Chrome session closed for {self.profileName}"))
+        return True
 
 def setupLogging(logFile, profileName):
     os.makedirs('logs', exist_ok=True)
@@ -0,0 +1,628 @@
+#!/usr/bin/env python3
+"""
+asyncio upload orchestrator
+Drives many upload flows (profiles x platforms) as coroutines in one event
+loop, speaking the DevTools protocol over one websocket per Chrome with a
+flattened session per tab. The steps follow youTubeUpload and
+instagramUpload with selectors shared through uploadSteps, so Selenium is
+never loaded. Each flow has a hard timeout and can be cancelled on its own.
+`queue` takes each profile's next video from the upload queue like
+uploadWorker and saves results and checkpoints back, `file` uploads a given
+file without touching the queue. Don't run it alongside loop.py for the same
+profiles. Needs the websockets package, imported on first use
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import itertools
+from config import (success, error, info, warning, highlight, profiles, stepTimeouts, youtubeStudioUrl,
+                    instagramUrl, maxConcurrentFlows, flowTimeoutSeconds, uploadStallSeconds)
+from browserUtils import BrowserManager
+from uploadProgress import (readProgressScript, progressLabelSelectors, parseProgress, readDialogScript,
+                            dialogShowsTransferred)
+from metrics import metrics
+from uploadSteps import (Step, StepError, normalizeText, titleSelector, descriptionSelectors, playlistSelectors,
+                         showMoreLocators, entertainmentLocators, activeStepScript, stepHeadingScript, youtubeCheckpoints,
+                         cropButtonLocators, nextButtonLocators, shareButtonLocators, sharedConfirmationLocator,
+                         createLocator, instagramCheckpoints)
+from stateStore import StateStore
+from retryQueue import UploadQueue, allPlatforms
+from contentIndex import ContentIndex
+from metadataCompiler import MetadataCompiler
+from uploadWorker import prepareVideo
+
+# Helpers available to every script run through Tab.execute. A locator starting
+# with "/" or "(" is XPath, anything else CSS
+findPrelude = """
+    const find = (locators) => {
+        for (const locator of [].concat(locators)) {
+            const el = locator.startsWith("/") || locator.startsWith("(")
+                ? document.evaluate(locator, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue
+                : document.querySelector(locator);
+            if (el) return el;
+        }
+        return null;
+    };
+    const usable = el => !!el && el.isConnected && el.getClientRects().length > 0
+        && !el.disabled && el.getAttribute("aria-disabled") !== "true";
+"""
+stepAdvancedScript = f"""
+    const index = (() => {{ {activeStepScript} }})();
+    if (arguments[0] >= 0 && index >= 0) return index > arguments[0];
+    // The button stays usable across the click, so the page heading has to change too
+    const heading = (() => {{ {stepHeadingScript} }})();
+    return arguments[1] !== null && heading !== null && heading !== arguments[1] && usable(find("#next-button"));
+"""
+
+# Studio's link to the new video, its ID is what a draft is reopened by
+videoLinkScript = """
+    const link = document.querySelector(".video-url-fadeable a, ytcp-video-info a");
+    return link ? link.href : null;
+"""
+
+class CdpError(Exception):
+    pass
+
+def locatorValues(locators):
+    """(strategy, value) locators as plain strings for find()"""
+    return [value for _, value in locators]
+
+class CdpConnection:
+    """One DevTools websocket, every tab of the Chrome talks through it with its own session id"""
+    def __init__(self, url):
+        self.url = url
+        self.socket = None
+        self.reader = None
+        self.ids = itertools.count(1)
+        self.pending = {}
+
+    async def connect(self):
+        try:
+            import websockets
+        except ImportError:
+            raise CdpError("The websockets package is needed for the orchestrator, pip install websockets")
+        self.socket = await websockets.connect(self.url, max_size=None, ping_interval=None)
+        self.reader = asyncio.create_task(self.readLoop())
+
+    async def readLoop(self):
+        try:
+            async for raw in self.socket:
+                message = json.loads(raw)
+                future = self.pending.pop(message.get("id"), None)
+                if future is None or future.done():
+                    continue
+                if "error" in message:
+                    future.set_exception(CdpError(message["error"].get("message", "DevTools error")))
+                else:
+                    future.set_result(message.get("result", {}))
+        except Exception as e:
+            print(warning(f"⚠️ DevTools connection lost: {e}"))
+        finally:
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(CdpError("DevTools connection closed"))
+            self.pending.clear()
+
+    async def send(self, method, params=None, sessionId=None, timeout=30):
+        messageId = next(self.ids)
+        message = {"id": messageId, "method": method, "params": params or {}}
+        if sessionId:
+            message["sessionId"] = sessionId
+        future = asyncio.get_running_loop().create_future()
+        self.pending[messageId] = future
+        try:
+            await self.socket.send(json.dumps(message))
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self.pending.pop(messageId, None)
+
+    async def close(self):
+        if self.socket:
+            await self.socket.close()
+        if self.reader:
+            await asyncio.gather(self.reader, return_exceptions=True)
+
+class Tab:
+    """One page target, with the waits and inputs the upload steps need"""
+    def __init__(self, connection, targetId, sessionId):
+        self.connection = connection
+        self.targetId = targetId
+        self.sessionId = sessionId
+
+    async def send(self, method, params=None, timeout=30):
+        return await self.connection.send(method, params, self.sessionId, timeout)
+
+    async def execute(self, script, *args):
+        """Run a script written like a Selenium execute_script body, args must be JSON values"""
+        expression = f"(function() {{ {findPrelude} {script} }}).apply(null, {json.dumps(list(args))})"
+        response = await self.send("Runtime.evaluate", {
+            "expression": expression, "returnByValue": True, "awaitPromise": True
+        })
+        if "exceptionDetails" in response:
+            details = response["exceptionDetails"]
+            raise CdpError(details.get("exception", {}).get("description") or details.get("text", "Script error"))
+        return response.get("result", {}).get("value")
+
+    async def waitFor(self, script, *args, timeout=10, poll=0.2, description=None):
+        """Run the script until it returns something truthy and return that"""
+        deadline = asyncio.get_running_loop().time() + timeout
+        while True:
+            try:
+                value = await self.execute(script, *args)
+                if value:
+                    return value
+            except CdpError:
+                # The page may be navigating between steps
+                pass
+            if asyncio.get_running_loop().time() >= deadline:
+                raise StepError(f"Timed out after {timeout}s waiting for {description or (args[0] if args else 'the page')}")
+            await asyncio.sleep(poll)
+
+    async def present(self, locators, timeout=10):
+        await self.waitFor("return !!find(arguments[0]);", locators, timeout=timeout)
+
+    async def click(self, locators, timeout=10):
+        # A real mouse event at the element's centre, like chromedriver's click
+        point = await self.waitFor("""
+            const el = find(arguments[0]);
+            if (!usable(el)) return null;
+            el.scrollIntoView({block: "center", inline: "center"});
+            const rect = el.getBoundingClientRect();
+            return {x: rect.left + rect.width / 2, y: rect.top + rect.height / 2};
+        """, locators, timeout=timeout)
+        for eventType in ("mousePressed", "mouseReleased"):
+            await self.send("Input.dispatchMouseEvent", {
+                "type": eventType, "x": point["x"], "y": point["y"], "button": "left", "clickCount": 1
+            })
+
+    async def typeText(self, locators, text, timeout=10, clear=True, verify=True):
+        await self.waitFor("""
+            const el = find(arguments[0]);
+            if (!usable(el)) return false;
+            el.focus();
+            if (arguments[1]) {
+                if (el.tagName === "INPUT" || el.tagName === "TEXTAREA") el.select();
+                else document.execCommand("selectAll");
+            }
+            return true;
+        """, locators, clear, timeout=timeout)
+        await self.send("Input.insertText", {"text": text})
+        if not verify:
+            return
+        entered = await self.execute("""
+            const el = find(arguments[0]);
+            if (!el) return "";
+            return el.tagName === "INPUT" || el.tagName === "TEXTAREA" ? el.value : el.innerText;
+        """, locators)
+        if normalizeText(entered) != normalizeText(text):
+            raise StepError("Text not accepted by the editor")
+
+    async def setFiles(self, selector, files, timeout=20):
+        await self.present(selector, timeout)
+        document = await self.send("DOM.getDocument", {"depth": 0})
+        node = await self.send("DOM.querySelector", {"nodeId": document["root"]["nodeId"], "selector": selector})
+        if not node.get("nodeId"):
+            raise StepError(f"File input {selector} not found")
+        await self.send("DOM.setFileInputFiles", {"files": [os.path.abspath(path) for path in files],
+                                                  "nodeId": node["nodeId"]})
+
+    async def navigate(self, url, timeout=30):
+        await self.send("Page.navigate", {"url": url})
+        await self.waitFor("return document.readyState === 'complete';", timeout=timeout, description=url)
+
+async def runSteps(wizardName, steps, profileName=None, checkpoints=None, onCheckpoint=None):
+    """
+    Async counterpart of stepEngine.Wizard.run, the actions are coroutines that do their own waiting
+
+    Args:
+        checkpoints (dict): Step name -> checkpoint stage, as for Wizard
+        onCheckpoint (callable): Coroutine function called with the stage name when a checkpoint is reached
+
+    Returns:
+        bool: True if all required steps completed
+    """
+    checkpoints = checkpoints or {}
+    for step in steps:
+        timeout = step.timeout or stepTimeouts.get(f"{wizardName}.{step.name}", stepTimeouts["default"])
+        startTime = time.perf_counter()
+        try:
+            await step.action(timeout)
+            metrics.record(f"{wizardName}.{step.name}", time.perf_counter() - startTime,
+                           profile=profileName, required=step.required, driver="cdp")
+        except Exception as e:
+            metrics.record(f"{wizardName}.{step.name}", time.perf_counter() - startTime, "error",
+                           profile=profileName, required=step.required, driver="cdp")
+            message = str(e).strip().splitlines()[0] if str(e).strip() else type(e).__name__
+            if step.required:
+                print(error(f"❌ {profileName} {wizardName} step '{step.name}' failed: {message}"))
+                return False
+            print(warning(f"⚠️ {profileName} {wizardName} step '{step.name}' skipped: {message}"))
+        if step.name in checkpoints and onCheckpoint:
+            await onCheckpoint(checkpoints[step.name])
+    return True
+
+def youtubeSteps(tab, title, description, videoLocation, tags):
+    transfer = {}
+
+    async def clickCreateAndUpload(timeout):
+        await tab.click("ytcp-button#create-icon", timeout)
+        await tab.click("tp-yt-paper-item[test-id='upload-beta']", timeout)
+        await tab.setFiles("input[type='file']", [videoLocation], timeout)
+        transfer["startedAt"] = time.perf_counter()
+        await tab.present("ytcp-video-metadata-editor", timeout)
+
+    async def fillTitleAndDescription(timeout):
+        await tab.typeText(titleSelector, title, timeout)
+        try:
+            await tab.typeText(descriptionSelectors, description, 5)
+        except StepError as e:
+            print(warning(f"⚠️ Description not set: {e}"))
+
+    async def selectFirstPlaylist(timeout):
+        await tab.click(playlistSelectors, 5)
+        await tab.present("tp-yt-paper-dialog[aria-label='Choose playlists']", timeout)
+        await tab.click("#checkbox-0, ytcp-checkbox-lit[id='checkbox-0']", timeout)
+        await tab.click("ytcp-button.done-button", timeout)
+
+    async def expandAdvancedOptions(timeout):
+        await tab.click(locatorValues(showMoreLocators), 3)
+        await tab.present("#text-input[aria-label='Tags']", timeout)
+
+    async def setCategoryToEntertainment(timeout):
+        await tab.click("#category ytcp-dropdown-trigger", timeout)
+        await tab.click(locatorValues(entertainmentLocators), 5)
+
+    async def clickNext(timeout):
+        previousIndex = await tab.execute(activeStepScript)
+        previousHeading = await tab.execute(stepHeadingScript)
+        await tab.click("#next-button", timeout)
+        await tab.waitFor(stepAdvancedScript, previousIndex, previousHeading, timeout=timeout,
+                          description="the next page")
+
+    async def nextToVisibility(timeout):
+        await tab.click("#next-button", timeout)
+        await tab.waitFor("return usable(find(arguments[0]));", "tp-yt-paper-radio-button[name='PUBLIC']", timeout=timeout)
+
+    async def waitForTransfer(timeout):
+        # Same reading as uploadProgress.waitForTransfer, polled without blocking the loop
+        loop = asyncio.get_running_loop()
+        watchStart = loop.time()
+        lastPercent, lastChange = None, watchStart
+        while True:
+            now = loop.time()
+            state, percent, text = parseProgress(await tab.execute(readProgressScript, progressLabelSelectors))
+            if state == "complete":
+                break
+            if state is None and now - watchStart > 10:
+                if not dialogShowsTransferred(await tab.execute(readDialogScript)):
+                    raise StepError("No upload progress shown and the dialog doesn't show the transfer finished")
+                break
+            if state == "failed":
+                raise StepError(f"Studio reported the upload failed: {text}")
+            if percent is not None and percent != lastPercent:
+                lastPercent, lastChange = percent, now
+            if state == "uploading" and now - lastChange > uploadStallSeconds:
+                raise StepError(f"Upload stalled at {lastPercent}% for {int(now - lastChange)}s")
+            if now - watchStart > timeout:
+                raise StepError(f"Upload not finished after {int(timeout)}s (last: {text})")
+            await asyncio.sleep(0.5)
+        if "startedAt" in transfer:
+            metrics.record("youtube.transfer", time.perf_counter() - transfer["startedAt"],
+                           fileBytes=os.path.getsize(videoLocation), driver="cdp")
+
+    async def setPublicAndSave(timeout):
+        publicRadio = "tp-yt-paper-radio-button[name='PUBLIC']"
+        await tab.click(publicRadio, timeout)
+        await tab.waitFor("const el = find(arguments[0]); return !!el && (el.getAttribute('aria-checked') === 'true'"
+                          " || el.hasAttribute('checked'));", publicRadio, timeout=timeout)
+        await tab.click("#done-button", timeout)
+        await tab.waitFor("""
+            return !!find("ytcp-video-share-dialog") || !!find("ytcp-uploads-still-processing-dialog")
+                || !usable(find("ytcp-uploads-dialog"));
+        """, timeout=timeout, description="the publish confirmation")
+
+    return [
+        Step("clickCreateAndUpload", clickCreateAndUpload),
+        Step("fillTitleAndDescription", fillTitleAndDescription),
+        Step("selectFirstPlaylist", selectFirstPlaylist, required=False),
+        Step("setNotMadeForKids", lambda t: tab.click("tp-yt-paper-radio-button[name='VIDEO_MADE_FOR_KIDS_NOT_MFK']", t),
+             required=False),
+        Step("expandAdvancedOptions", expandAdvancedOptions, required=False),
+        Step("addTags", lambda t: tab.typeText("#text-input[aria-label='Tags']", tags, t, clear=False, verify=False),
+             required=False),
+        Step("setCategoryToEntertainment", setCategoryToEntertainment, required=False),
+        Step("nextToVideoElements", clickNext),
+        Step("nextToChecks", clickNext),
+        Step("nextToVisibility", nextToVisibility),
+        Step("waitForTransfer", waitForTransfer),
+        Step("setPublicAndSave", setPublicAndSave)
+    ]
+
+def instagramSteps(tab, caption, videoLocation):
+    cropButtons = locatorValues(cropButtonLocators)
+    nextButtons = locatorValues(nextButtonLocators)
+    captionBox = ["//div[@aria-label='Write a caption...']", "//div[@role='textbox']"]
+
+    async def clickCreate(timeout):
+        await tab.click(createLocator[1], timeout)
+        await tab.present(["input[type='file']", "//button[contains(text(), 'Select from computer')]"], timeout)
+
+    async def selectFile(timeout):
+        await tab.setFiles("input[type='file']", [videoLocation], timeout)
+        await tab.waitFor("return usable(find(arguments[0]));", cropButtons, timeout=timeout)
+
+    async def nextToEdit(timeout):
+        await tab.click(nextButtons, timeout)
+        await tab.waitFor("return !find(arguments[0]);", cropButtons, timeout=timeout, description="the edit page")
+
+    async def nextToCaption(timeout):
+        await tab.click(nextButtons, timeout)
+        await tab.waitFor("return usable(find(arguments[0]));", captionBox, timeout=timeout)
+
+    async def enableAutoCaptions(timeout):
+        toggle = "//input[@role='switch']"
+        await tab.waitFor("return usable(find(arguments[0]));", toggle, timeout=timeout)
+        if await tab.execute("return find(arguments[0]).getAttribute('aria-checked') === 'false';", toggle):
+            await tab.click(toggle, timeout)
+
+    async def shareReel(timeout):
+        await tab.click(locatorValues(shareButtonLocators), min(timeout, 10))
+        await tab.present(sharedConfirmationLocator[1], timeout)
+
+    return [
+        Step("clickCreate", clickCreate),
+        Step("selectFile", selectFile),
+        Step("openCropMenu", lambda t: tab.click(cropButtons, t)),
+        Step("selectOriginalCrop", lambda t: tab.click(["//span[text()='Original']",
+                                                        "//span[contains(text(), 'Original')]"], t)),
+        Step("nextToEdit", nextToEdit),
+        Step("nextToCaption", nextToCaption),
+        Step("writeCaption", lambda t: tab.typeText(captionBox, caption, t)),
+        Step("openAccessibility", lambda t: tab.click(["//span[text()='Accessibility']",
+                                                       "//div[.//span[contains(text(), 'Accessibility')]]"], t),
+             required=False),
+        Step("enableAutoCaptions", enableAutoCaptions, required=False),
+        Step("shareReel", shareReel)
+    ]
+
+class Orchestrator:
+    def __init__(self, profilesConfig=None, maxConcurrent=None, flowTimeout=None):
+        self.profiles = profilesConfig if profilesConfig is not None else profiles
+        self.semaphore = asyncio.Semaphore(maxConcurrent or maxConcurrentFlows)
+        self.flowTimeout = flowTimeout or flowTimeoutSeconds
+        self.browsers = {}
+        self.connections = {}
+        self.locks = {}
+        self.tasks = []
+
+    async def connection(self, profileName):
+        """DevTools connection of the profile's Chrome, launched on first use"""
+        lock = self.locks.setdefault(profileName, asyncio.Lock())
+        async with lock:
+            if profileName not in self.connections:
+                browser = BrowserManager(self.profiles, profileName)
+                # Launching blocks until DevTools answers, keep it off the event loop
+                started = await asyncio.to_thread(browser.startBrowser, "about:blank", False)
+                if not started:
+                    raise CdpError(f"Chrome for {profileName} did not start")
+                self.browsers[profileName] = browser
+                connection = CdpConnection(browser.devTools["webSocketDebuggerUrl"])
+                await connection.connect()
+                self.connections[profileName] = connection
+            return self.connections[profileName]
+
+    async def openTab(self, profileName, url):
+        connection = await self.connection(profileName)
+        target = await connection.send("Target.createTarget", {"url": "about:blank"})
+        attached = await connection.send("Target.attachToTarget", {"targetId": target["targetId"], "flatten": True})
+        tab = Tab(connection, target["targetId"], attached["sessionId"])
+        await tab.send("Page.enable")
+        await tab.send("Runtime.enable")
+        await tab.navigate(url)
+        return tab
+
+    async def closeTab(self, tab):
+        try:
+            await tab.connection.send("Target.closeTarget", {"targetId": tab.targetId}, timeout=5)
+        except Exception as e:
+            print(warning(f"⚠️ Could not close tab: {e}"))
+
+    async def runFlow(self, job, checkpoint=None):
+        """
+        One upload on its own tab
+
+        Args:
+            job (tuple): (profileName, platform, title, caption, videoLocation[, tags])
+            checkpoint (Checkpoint): Saved as the flow passes each stage, None to save nothing
+
+        Returns:
+            bool: True if the upload went through
+        """
+        profileName, platformName, title, caption, videoLocation, *extra = job
+        tabs = []
+
+        async def onCheckpoint(stage):
+            videoId = None
+            if platformName == "youtube" and stage == "fileSelected":
+                href = await tabs[0].execute(videoLinkScript)
+                videoId = (href.rstrip("/").split("/")[-1] or None) if href else None
+            # SQLite may wait on the write lock, keep that off the event loop
+            await asyncio.to_thread(checkpoint.reached, stage, videoId=videoId)
+
+        async def flow():
+            if platformName == "youtube":
+                channelId = self.profiles[profileName]["youtubeChannelId"]
+                tabs.append(await self.openTab(profileName, f"{youtubeStudioUrl}/channel/{channelId}"))
+                tags = extra[0] if extra else self.profiles[profileName]["tags"]
+                steps = youtubeSteps(tabs[0], title, caption, videoLocation, tags)
+                stages = youtubeCheckpoints
+            else:
+                tabs.append(await self.openTab(profileName, instagramUrl))
+                steps = instagramSteps(tabs[0], caption, videoLocation)
+                stages = instagramCheckpoints
+            return await runSteps(platformName, steps, profileName, stages, onCheckpoint if checkpoint else None)
+
+        async with self.semaphore:
+            startTime = time.perf_counter()
+            outcome = "failed"
+            try:
+                result = await asyncio.wait_for(flow(), self.flowTimeout)
+                outcome = "ok" if result else "failed"
+                return result
+            except asyncio.TimeoutError:
+                outcome = "timeout"
+                print(error(f"❌ {profileName} {platformName}: no result after {self.flowTimeout}s, cancelled"))
+                return False
+            except asyncio.CancelledError:
+                outcome = "cancelled"
+                raise
+            except Exception as e:
+                print(error(f"❌ {profileName} {platformName}: {e}"))
+                return False
+            finally:
+                for tab in tabs:
+                    await self.closeTab(tab)
+                metrics.record(f"{platformName}.upload", time.perf_counter() - startTime, outcome,
+                               profile=profileName, driver="cdp")
+                print((success if outcome == "ok" else error)(f"{'✅' if outcome == 'ok' else '❌'} "
+                                                              f"{profileName} {platformName}: {title} ({outcome})"))
+
+    def cancel(self, index):
+        """Cancel one running flow by its position in the job list"""
+        if index < len(self.tasks) and not self.tasks[index].done():
+            self.tasks[index].cancel()
+
+    async def run(self, jobs, onResult=None, checkpoints=None):
+        """
+        Run every job concurrently, bounded by maxConcurrentFlows
+
+        Args:
+            jobs (list): (profileName, platform, title, caption, videoLocation[, tags]) per flow
+            onResult (callable): Called with (job, result) as each flow finishes, in a worker thread
+            checkpoints (list): Checkpoint per job, or None
+
+        Returns:
+            list: Result per job, False for failed, timed out and cancelled flows
+        """
+        checkpoints = checkpoints or [None] * len(jobs)
+
+        async def runOne(job, checkpoint):
+            try:
+                result = await self.runFlow(job, checkpoint)
+            except asyncio.CancelledError:
+                result = False
+            if onResult:
+                await asyncio.to_thread(onResult, job, result)
+            return result
+
+        self.tasks = [asyncio.create_task(runOne(job, checkpoint)) for job, checkpoint in zip(jobs, checkpoints)]
+        try:
+            return await asyncio.gather(*self.tasks)
+        finally:
+            await self.close()
+
+    async def close(self):
+        for connection in self.connections.values():
+            await connection.close()
+        for browser in self.browsers.values():
+            await asyncio.to_thread(browser.closeBrowser)
+        self.connections.clear()
+        self.browsers.clear()
+
+def runUploads(jobs, onResult=None, maxConcurrent=None, flowTimeout=None, checkpoints=None):
+    """Blocking entry point, see Orchestrator.run"""
+    async def main():
+        orchestrator = Orchestrator(maxConcurrent=maxConcurrent, flowTimeout=flowTimeout)
+        return await orchestrator.run(jobs, onResult, checkpoints)
+    return asyncio.run(main())
+
+def claimQueueJobs(store, profileNames, platforms):
+    """
+    Claim each profile's next video per platform and run the browser-free checks, as uploadWorker does
+
+    YouTube uploads with a draft to finish are left for uploadWorker, which can reopen it
+
+    Returns:
+        tuple: (jobs, checkpoints, onResult) for runUploads, onResult saves each result to the queue
+    """
+    queue = UploadQueue(store)
+    index = ContentIndex(store)
+    compiler = MetadataCompiler(store)
+    jobs, checkpoints, owners = [], [], {}
+
+    for profileName in profileNames:
+        for videoIndex, videoPlatforms in queue.claim(profileName, platforms).items():
+            prepared = prepareVideo(store, queue, index, profileName, videoIndex, videoPlatforms)
+            if prepared is None:
+                continue
+            video, videoLocation, sha256, videoCheckpoints, _, remaining = prepared
+            metadata = compiler.forVideo(profileName, videoIndex, video)
+            for platformName in remaining:
+                checkpoint = videoCheckpoints[platformName]
+                if platformName == "youtube" and checkpoint.stage:
+                    print(info(f"⏩ {profileName} #{videoIndex} has a YouTube draft to finish, left for uploadWorker"))
+                    continue
+                if platformName == "youtube":
+                    text = metadata["youtube"]
+                    job = (profileName, platformName, text["title"], text["description"], videoLocation, text["tags"])
+                else:
+                    job = (profileName, platformName, video["title"], metadata["instagram"]["caption"], videoLocation)
+                owners[id(job)] = (videoIndex, sha256)
+                jobs.append(job)
+                checkpoints.append(checkpoint)
+
+    def onResult(job, result):
+        profileName, platformName = job[0], job[1]
+        videoIndex, sha256 = owners[id(job)]
+        try:
+            queue.recordResult(profileName, videoIndex, platformName, result)
+            index.finish(sha256, platformName, profileName, videoIndex, result)
+        except Exception as e:
+            print(error(f"❌ Failed to save changes: {e}"))
+
+    return jobs, checkpoints, onResult
+
+def main():
+    parser = argparse.ArgumentParser(description="Run many upload flows at once from one event loop")
+    commands = parser.add_subparsers(dest="command")
+    queueCommand = commands.add_parser("queue", help="Upload each profile's next queued video and save the results")
+    queueCommand.add_argument("--profiles", nargs="+", help="Profiles to upload from, all in the store by default")
+    fileCommand = commands.add_parser(
+        "file", help="Upload one file from several profiles, standalone: the upload queue is not updated"
+    )
+    fileCommand.add_argument("video", help="Video file")
+    fileCommand.add_argument("title", help="Video title")
+    fileCommand.add_argument("caption", help="Description / caption")
+    fileCommand.add_argument("--profiles", nargs="+", default=list(profiles), help="Profiles to upload from")
+    for command in (queueCommand, fileCommand):
+        command.add_argument("--platforms", nargs="+", default=list(allPlatforms), choices=list(allPlatforms))
+        command.add_argument("--timeout", type=float, help="Seconds before a flow is cancelled")
+    args = parser.parse_args()
+
+    if args.command == "queue":
+        store = StateStore()
+        jobs, checkpoints, onResult = claimQueueJobs(store, args.profiles or store.listProfiles(), args.platforms)
+        if not jobs:
+            print(success("✅ Nothing to upload"))
+            return
+    elif args.command == "file":
+        if not os.path.exists(args.video):
+            print(error(f"❌ Video not found: {args.video}"))
+            sys.exit(1)
+        jobs = [(profileName, platformName, args.title, args.caption, args.video)
+                for profileName in args.profiles for platformName in args.platforms]
+        checkpoints, onResult = None, None
+    else:
+        parser.print_help()
+        sys.exit(1)
+
+    print(highlight(f"\n=== {len(jobs)} upload flow(s) from one event loop ==="))
+    results = runUploads(jobs, onResult, flowTimeout=args.timeout, checkpoints=checkpoints)
+    print(info(f"📊 {sum(results)}/{len(results)} uploads went through"))
+    sys.exit(0 if all(results) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -22,18 +22,163 @@ if platform.system() == 'Windows':
 else:
     basePath = "/home/kaka/Desktop/NaradX_Social_Uploader"
 
+# Site roots the uploaders open, overridable to point at local stand-ins (see benchmark.py)
+youtubeStudioUrl = os.getenv("NARADX_STUDIO_URL", "https://studio.youtube.com")
+instagramUrl = os.getenv("NARADX_INSTAGRAM_URL", "https://www.instagram.com/")
+
+# SQLite state store for the profile video queues
+stateDbPath = os.path.join(basePath, "state", "uploader.db")
+metricsDir = os.path.join(basePath, "metrics")
+
+# Posting slots in local time per platform. "default" applies to every
+# profile without its own entry
+schedules = {
+    "default": {
+        "youtube": ["09:00", "21:00"],
+        "instagram": ["09:00", "21:00"]
+    }
+}
+
+# Slots missed by more than this (e.g. the box was off) are skipped, not caught up
+catchUpHours = 6
+
+# Failed platform uploads are retried with exponential backoff and jitter,
+# after retryMaxAttempts attempts the job is dead-lettered
+retryMaxAttempts = 5
+retryBaseSeconds = 15 * 60
+retryMaxSeconds = 24 * 60 * 60
+
+# Preflight rules checked by mp4Probe before a browser is started, a file that
+# breaks them is never uploaded to that platform. Aspect is width / height as displayed
+uploadRules = {
+    "youtube": {
+        "maxSeconds": 12 * 60 * 60,
+        "maxSizeMB": 256 * 1024,
+        "videoCodecs": ["avc1", "avc3", "hvc1", "hev1", "vp09", "av01", "mp4v"]
+    },
+    "instagram": {
+        "minSeconds": 3,
+        "maxSeconds": 15 * 60,
+        "minAspect": 0.5,
+        "maxAspect": 1.91,
+        "maxSizeMB": 4 * 1024,
+        "videoCodecs": ["avc1", "avc3", "hvc1", "hev1"]
+    }
+}
+
+# What YouTube shows as a Short. Only warned about, a video outside these is
+# still uploaded, as a regular video
+shortsRules = {
+    "youtube": {
+        "maxSeconds": 180,
+        "maxAspect": 1.0
+    }
+}
+
+# Upload text rendered per catalog entry by metadataCompiler from {word},
+# {WORD}, {Word} and {meaning}. "default" applies to every profile without its
+# own entry, a profile entry only needs the templates it changes. Tags default
+# to the profile's "tags"
+metadataTemplates = {
+    "default": {
+        "youtubeTitle": "Today's Word! - {WORD}",
+        "youtubeDescription": "{WORD} - {meaning}   #GRE #Vocabulary #English #WordOfTheDay #Trending #IndiaSpeaks",
+        "instagramCaption": "{WORD} means {meaning}.\n\n#GREprep #IELTSvocab #wordoftheday #learnenglish "
+                            "#englishvocabulary #vocabularyboost #englishreels #studygram #dailyvocab #explorepage"
+    }
+}
+
+# Hard limits of the platforms, rendered metadata is cut to fit
+metadataLimits = {
+    "youtube": {"titleChars": 100, "descriptionChars": 5000, "tagsChars": 500},
+    "instagram": {"captionChars": 2200, "hashtags": 30}
+}
+
+# Content already uploaded to a platform from another video: "skip" dead-letters
+# the copy, "flag" only warns
+duplicatePolicy = "skip"
+
+# Upload both platforms of a video at the same time
+concurrentUploads = True
+
+# Videos uploaded per platform in one browser session per run, so a backlog
+# drains without a cold start per video. 1 uploads one video at a time.
+# YouTube selects the whole batch in one Studio dialog (at most 15), Instagram
+# shares the reels back to back
+batchSizes = {
+    "youtube": 1,
+    "instagram": 1
+}
+
+# Resource governor: the Chrome cap is the lowest of these limits
+maxConcurrentBrowsers = 4
+browserMemoryMB = 700
+cpusPerBrowser = 1
+
+# Chrome launch profiles, chosen per profile with "launchProfile". "lean" runs
+# headless with background services off so more sessions fit on one host
+launchProfiles = {
+    "full": [],
+    "lean": [
+        "--headless=new",
+        "--disable-gpu",
+        "--renderer-process-limit=2",
+        "--disable-background-networking",
+        "--disable-extensions",
+        "--disable-sync",
+        "--disable-component-update",
+        "--disable-default-apps",
+        "--disable-features=Translate,MediaRouter,OptimizationHints",
+        "--disable-dev-shm-usage",
+        "--mute-audio",
+        "--window-size=1280,800"
+    ]
+}
+
+# Seconds to wait for a freshly launched Chrome's DevTools endpoint
+devToolsTimeout = 20
+
+# cdpOrchestrator: upload flows driven at once from one event loop, and the
+# hard limit on one flow before it is cancelled
+maxConcurrentFlows = 8
+flowTimeoutSeconds = 45 * 60
+
+# Hard wall-clock limit on one uploadWorker.py run, batches included. A worker
+# still running after this is killed together with its Chrome
+workerTimeoutSeconds = 90 * 60
+# Seconds a process tree gets to exit after SIGTERM before it is sent SIGKILL
+killGraceSeconds = 5
+
+# Fail a YouTube upload whose progress hasn't moved for this many seconds
+uploadStallSeconds = 120
+
+# Upload wizard step timeouts in seconds, keyed "<wizard>.<step>"
+stepTimeouts = {
+    "default": 10,
+    "youtube.clickCreateAndUpload": 30,
+    "youtube.fillTitleAndDescription": 15,
+    "youtube.nextToVisibility": 15,
+    "youtube.waitForTransfer": 30 * 60,
+    "youtube.setPublicAndSave": 30,
+    "instagram.clickCreate": 20,
+    "instagram.selectFile": 30,
+    "instagram.shareReel": 60
+}
+
 # User Profiles
 profiles = {
     "elitevocabulary": {
         "profileName": "elitevocabulary",
         "youtubeChannelId": "UC2z9JFAIFovJsyt2iwKOn3g",
         "debuggingPort": "9004",
+        "launchProfile": "full",
         "tags": "GRE, IELTS, vocabulary, english, learning, education, words, study, exam prep, english vocabulary"
     },
     "wokyabolrahi": {
         "profileName": "wokyabolrahi",
         "youtubeChannelId": "UC2z9JFAIFovJsyt2iwKOn3g",
         "debuggingPort": "9005",
+        "launchProfile": "full",
         "tags": "GRE, IELTS, vocabulary, english, learning, education, words, study, exam prep, english vocabulary"
     }
 }
\ No newline at end of file
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Content-hash index
+Streaming SHA-256 fingerprints of the queued video files, reused while a
+file's size and mtime are unchanged. Each platform upload claims its content
+hash, so the same rendered file queued under another profile or a new name
+is caught before a browser is started
+"""
+import os
+import sys
+import hashlib
+from datetime import datetime, timedelta, UTC
+from config import success, error, info, warning, highlight, basePath, duplicatePolicy
+from stateStore import StateStore
+
+chunkSize = 1024 * 1024
+# A claim this old without an upload belongs to a worker that died
+staleClaimHours = 6
+
+def utcNow():
+    return datetime.now(UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def hashFile(path):
+    with open(path, "rb") as f:
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        digest = hashlib.sha256()
+        buffer = bytearray(chunkSize)
+        view = memoryview(buffer)
+        while True:
+            read = f.readinto(buffer)
+            if not read:
+                break
+            digest.update(view[:read])
+        return digest.hexdigest()
+
+class ContentIndex:
+    def __init__(self, store=None, policy=None):
+        self.store = store or StateStore()
+        self.policy = policy or duplicatePolicy
+
+    def fingerprint(self, path, pending=None):
+        """
+        SHA-256 of a file, only read again when its size or mtime changed
+
+        The file is hashed outside any transaction. A new hash is saved in a
+        short transaction of its own, or appended to pending for the caller
+        to save in a batch
+        """
+        absolutePath = os.path.abspath(path)
+        stat = os.stat(absolutePath)
+        row = self.store.connection().execute(
+            "SELECT sha256 FROM fileHashes WHERE path = ? AND size = ? AND mtimeNs = ?",
+            (absolutePath, stat.st_size, stat.st_mtime_ns)
+        ).fetchone()
+        if row:
+            return row["sha256"]
+
+        sha256 = hashFile(absolutePath)
+        values = (absolutePath, stat.st_size, stat.st_mtime_ns, sha256, utcNow())
+        if pending is not None:
+            pending.append(values)
+        else:
+            self.saveHashes([values])
+        return sha256
+
+    def saveHashes(self, rows):
+        with self.store.transaction() as conn:
+            conn.executemany(
+                """
+                INSERT INTO fileHashes (path, size, mtimeNs, sha256, hashedAt) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (path) DO UPDATE SET
+                    size = excluded.size, mtimeNs = excluded.mtimeNs, sha256 = excluded.sha256, hashedAt = excluded.hashedAt
+                """,
+                rows
+            )
+
+    def claim(self, sha256, platform, profileName, position):
+        """
+        Reserve a content hash for one platform upload
+
+        Returns:
+            dict: The owning upload if another video already has it, None if the claim is ours
+        """
+        staleBefore = (datetime.now(UTC) - timedelta(hours=staleClaimHours)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        with self.store.transaction() as conn:
+            row = conn.execute(
+                "SELECT profile, position, state, updatedAt FROM contentUploads WHERE sha256 = ? AND platform = ?",
+                (sha256, platform)
+            ).fetchone()
+            ours = row is not None and row["profile"] == profileName and row["position"] == position
+            stale = row is not None and row["state"] == "claimed" and row["updatedAt"] < staleBefore
+            if row is not None and not ours and not stale:
+                return dict(row)
+            conn.execute(
+                """
+                INSERT INTO contentUploads (sha256, platform, profile, position, state, updatedAt)
+                VALUES (?, ?, ?, ?, 'claimed', ?)
+                ON CONFLICT (sha256, platform) DO UPDATE SET
+                    profile = excluded.profile, position = excluded.position,
+                    state = excluded.state, updatedAt = excluded.updatedAt
+                """,
+                (sha256, platform, profileName, position, utcNow())
+            )
+        return None
+
+    def finish(self, sha256, platform, profileName, position, uploaded):
+        """Mark our claim uploaded, or give it up so a later attempt or another copy may take it"""
+        with self.store.transaction() as conn:
+            if uploaded:
+                conn.execute(
+                    """
+                    UPDATE contentUploads SET state = 'uploaded', updatedAt = ?
+                    WHERE sha256 = ? AND platform = ? AND profile = ? AND position = ?
+                    """,
+                    (utcNow(), sha256, platform, profileName, position)
+                )
+            else:
+                conn.execute(
+                    "DELETE FROM contentUploads WHERE sha256 = ? AND platform = ? AND profile = ? AND position = ? AND state = 'claimed'",
+                    (sha256, platform, profileName, position)
+                )
+
+    def release(self, platform, profileName, position):
+        """Give up a video's claim on one platform when its content hash isn't known"""
+        with self.store.transaction() as conn:
+            conn.execute(
+                "DELETE FROM contentUploads WHERE platform = ? AND profile = ? AND position = ? AND state = 'claimed'",
+                (platform, profileName, position)
+            )
+
+    def claimPlatforms(self, path, platforms, profileName, position):
+        """
+        Fingerprint a video and claim it on each platform
+
+        Returns:
+            tuple: (sha256, {platform: owner}) with only the platforms held by another video.
+            With the "flag" policy duplicates are reported but nothing is withheld
+        """
+        sha256 = self.fingerprint(path)
+        duplicates = {}
+        for platform in platforms:
+            owner = self.claim(sha256, platform, profileName, position)
+            if owner is None:
+                continue
+            print(warning(f"⚠️ {platform}: same content as {owner['profile']} #{owner['position']} ({owner['state']})"))
+            if self.policy == "skip":
+                duplicates[platform] = owner
+        return sha256, duplicates
+
+    def scan(self, profileNames=None, batchSize=50):
+        """
+        Fingerprint every queued file and group identical content
+
+        Files are hashed without holding the write lock, the new hashes are
+        saved batchSize at a time in short transactions
+
+        Returns:
+            dict: {sha256: [(profile, position, filename)]} for content queued more than once
+        """
+        profileNames = profileNames or self.store.listProfiles()
+        groups = {}
+        missing = 0
+        pending = []
+        try:
+            for profileName in profileNames:
+                # Read up front so no statement stays open across the hashing
+                for position, video in list(self.store.iterVideos(profileName)):
+                    filename = video.get("filename")
+                    path = os.path.join(basePath, filename) if filename else None
+                    if not path or not os.path.exists(path):
+                        missing += 1
+                        continue
+                    sha256 = self.fingerprint(path, pending)
+                    groups.setdefault(sha256, []).append((profileName, position, filename))
+                    if len(pending) >= batchSize:
+                        self.saveHashes(pending)
+                        pending.clear()
+        finally:
+            # Hashes already read are kept even if the scan stops early
+            if pending:
+                self.saveHashes(pending)
+
+        if missing:
+            print(warning(f"⚠️ {missing} queued file(s) not found, skipped"))
+        return {sha256: entries for sha256, entries in groups.items() if len(entries) > 1}
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else "scan"
+    if command != "scan":
+        print(info("python contentIndex.py scan [profile...]    # hash queued files and list duplicates"))
+        sys.exit(1)
+
+    index = ContentIndex()
+    duplicates = index.scan(sys.argv[2:] or None)
+    if not duplicates:
+        print(success("✅ No duplicate content in the queues"))
+        return
+
+    print(highlight(f"\n=== {len(duplicates)} piece(s) of content queued more than once ==="))
+    for sha256, entries in duplicates.items():
+        print(error(f"\n{sha256[:16]}…"))
+        for profileName, position, filename in entries:
+            print(f"   {info(profileName)} #{position}: {filename}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+File selection through the page's file input
+Sets files with DevTools DOM.setFileInputFiles so no native file dialog is
+opened, on every OS, headless or not
+"""
+import os
+import uuid
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from config import warning
+
+fileInputLocator = (By.XPATH, "//input[@type='file']")
+
+def setFileInputFiles(driver, fileInput, files):
+    # Tag the element so DevTools can resolve the same node Selenium found
+    marker = uuid.uuid4().hex
+    driver.execute_script("arguments[0].setAttribute('data-upload-marker', arguments[1])", fileInput, marker)
+    try:
+        document = driver.execute_cdp_cmd("DOM.getDocument", {"depth": 0})
+        node = driver.execute_cdp_cmd("DOM.querySelector", {
+            "nodeId": document["root"]["nodeId"],
+            "selector": f"input[data-upload-marker='{marker}']"
+        })
+        driver.execute_cdp_cmd("DOM.setFileInputFiles", {"files": files, "nodeId": node["nodeId"]})
+    finally:
+        driver.execute_script("arguments[0].removeAttribute('data-upload-marker')", fileInput)
+
+def selectFiles(driver, files, timeout=20, locator=fileInputLocator):
+    """
+    Put one or more files into the page's file input without a file dialog
+
+    Args:
+        driver: Selenium driver
+        files (str | list): Path or paths of the files to select
+        timeout (float): How long to wait for the file input to exist
+        locator (tuple): Locator of the file input
+
+    Returns:
+        WebElement: The file input the files were set on
+    """
+    if isinstance(files, str):
+        files = [files]
+    files = [os.path.abspath(path) for path in files]
+
+    fileInput = WebDriverWait(driver, timeout).until(EC.presence_of_element_located(locator))
+
+    if len(files) > 1 and not fileInput.get_attribute("multiple"):
+        print(warning("⚠️ File input does not accept multiple files, only the first one is used"))
+        files = files[:1]
+
+    try:
+        setFileInputFiles(driver, fileInput, files)
+    except Exception:
+        # chromedriver's send_keys goes through the same DevTools call
+        fileInput.send_keys("\n".join(files))
+    return fileInput
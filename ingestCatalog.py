@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Catalog ingestion
+Streams a word catalog (like greWords.json) into a profile's queue in the
+state store. Only new or changed entries are written, matched by word or
+filename, and upload progress on existing entries is never touched
+"""
+import os
+import sys
+import json
+import sqlite3
+import argparse
+import tempfile
+from config import success, error, info, warning, highlight, stateDbPath
+from stateStore import StateStore, catalogKey
+
+# Upload progress owned by the uploader, never overwritten from the catalog
+stateFields = ("videoChecked", "youtubeUploaded", "instagramUploaded", "uploadTimestamp", "retryCount")
+
+readSize = 64 * 1024
+decoder = json.JSONDecoder()
+
+class CatalogReader:
+    """
+    Incremental reader for catalogs shaped as {"<id>": {...}}, {"videos": [...]} or [...]
+    Only the entry being decoded is held in memory
+    """
+    def __init__(self, f):
+        self.f = f
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        chunk = self.f.read(readSize)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Expected '{char}' at offset {self.pos} of the catalog")
+        self.pos += 1
+
+    def decodeValue(self):
+        self.peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            # A number or literal cut at the buffer edge decodes "successfully", so read on first
+            if end == len(self.buffer) and not self.eof and self.fill():
+                continue
+            self.pos = end
+            return value
+
+    def iterArray(self):
+        self.expect("[")
+        while True:
+            char = self.peek()
+            if char == "]":
+                self.pos += 1
+                return
+            if char == ",":
+                self.pos += 1
+                continue
+            yield self.decodeValue()
+
+    def iterObject(self):
+        self.expect("{")
+        while True:
+            char = self.peek()
+            if char == "}":
+                self.pos += 1
+                return
+            if char == ",":
+                self.pos += 1
+                continue
+            key = self.decodeValue()
+            self.expect(":")
+            if key == "videos" and self.peek() == "[":
+                yield from self.iterArray()
+            else:
+                yield self.decodeValue()
+
+    def __iter__(self):
+        char = self.peek()
+        if char == "[":
+            return self.iterArray()
+        if char == "{":
+            return self.iterObject()
+        raise ValueError("Catalog must be a JSON object or array")
+
+def catalogChanges(existing, entry):
+    """Catalog fields of entry that differ from the existing record, plus state fields it lacks"""
+    return {
+        field: value for field, value in entry.items()
+        if (field not in stateFields and existing.get(field) != value)
+        or (field in stateFields and field not in existing)
+    }
+
+def ingestCatalog(catalogPath, profileName, store=None, dryRun=False, batchSize=500):
+    """
+    Merge a catalog into a profile's queue
+
+    Args:
+        catalogPath (str): Path to the catalog JSON file
+        profileName (str): Target profile in the state store
+        store (StateStore): Store to write to, opened from config if not given
+        dryRun (bool): Only report what would change
+        batchSize (int): Entries written per transaction
+
+    Returns:
+        dict: Counts of added, changed, unchanged and skipped entries
+    """
+    store = store or StateStore()
+    counts = {"added": 0, "changed": 0, "unchanged": 0, "skipped": 0}
+    nextPosition = store.nextPosition(profileName)
+    seenKeys = set()
+    pending = []
+
+    def flush():
+        if dryRun or not pending:
+            pending.clear()
+            return
+        with store.transaction() as conn:
+            for position, video in pending:
+                store.writeVideo(conn, profileName, position, video)
+        pending.clear()
+
+    with open(catalogPath, "r", encoding="utf-8") as f:
+        for entry in CatalogReader(f):
+            key = catalogKey(entry) if isinstance(entry, dict) else None
+            if not key or key in seenKeys:
+                counts["skipped"] += 1
+                continue
+            seenKeys.add(key)
+
+            found = store.findVideoByKey(profileName, key)
+            if found is None:
+                counts["added"] += 1
+                if dryRun:
+                    print(success(f"+ {key} ({entry.get('filename', 'N/A')})"))
+                pending.append((nextPosition, entry))
+                nextPosition += 1
+            else:
+                position, existing = found
+                changes = catalogChanges(existing, entry)
+                if not changes:
+                    counts["unchanged"] += 1
+                    continue
+                counts["changed"] += 1
+                if dryRun:
+                    print(warning(f"~ {key}"))
+                    for field, value in changes.items():
+                        print(f"    {field}: {existing.get(field)!r} -> {value!r}")
+                pending.append((position, {**existing, **changes}))
+
+            if len(pending) >= batchSize:
+                flush()
+    flush()
+
+    return counts
+
+def copyStore(path):
+    """Copy the state store to path, read-only on the original, and return path"""
+    if os.path.exists(stateDbPath):
+        source = sqlite3.connect(f"file:{stateDbPath}?mode=ro", uri=True)
+        target = sqlite3.connect(path)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+    return path
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge a word catalog into a profile's upload queue")
+    parser.add_argument("catalog", nargs="?", default="greWords.json", help="Catalog JSON file")
+    parser.add_argument("profile", nargs="?", default="elitevocabulary", help="Target profile")
+    parser.add_argument("--dry-run", action="store_true", help="Show the diff without writing")
+    parser.add_argument("--export", action="store_true", help="Also rewrite profiles/<profile>.json afterwards")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.catalog):
+        print(error(f"❌ Catalog not found: {args.catalog}"))
+        sys.exit(1)
+
+    if args.dry_run:
+        # Diff against a throwaway copy, seeding it the way a real run would
+        with tempfile.TemporaryDirectory() as tempDir:
+            store = StateStore(copyStore(os.path.join(tempDir, "uploader.db")))
+            store.importNewProfiles("profiles")
+            print(highlight(f"\n=== Ingesting {args.catalog} into {args.profile} (dry run) ==="))
+            counts = ingestCatalog(args.catalog, args.profile, store, dryRun=True)
+            store.close()
+    else:
+        store = StateStore()
+        # Seed a brand new store from the existing profile file so its progress is kept
+        store.importNewProfiles("profiles")
+        print(highlight(f"\n=== Ingesting {args.catalog} into {args.profile} ==="))
+        counts = ingestCatalog(args.catalog, args.profile, store)
+    print(info(f"📊 Added: {counts['added']}, changed: {counts['changed']}, "
+               f"unchanged: {counts['unchanged']}, skipped: {counts['skipped']}"))
+
+    if args.export and not args.dry_run:
+        os.makedirs("profiles", exist_ok=True)
+        store.exportProfile(args.profile, os.path.join("profiles", f"{args.profile}.json"))
+
+if __name__ == "__main__":
+    main()
@@ -2,243 +2,158 @@
 import os
 import time
 from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from config import success, error, info, warning, highlight, profiles
+from config import success, error, info, warning, highlight, profiles, instagramUrl
 from browserUtils import BrowserManager, setupLogging
+from selectorRegistry import registry
+from textEntry import enterText
+from fileInput import selectFiles
+from stepEngine import Wizard, clickable, present, gone, anyOf, stale, clickWhenReady
+from metrics import span, setOutcome
+from uploadSteps import (Step, StepError, cropButtonLocators, nextButtonLocators, shareButtonLocators,
+                         sharedConfirmationLocator, createLocator, closeButtonLocators, instagramCheckpoints)
 
-if os.name == "nt":
-    import pyautogui
 
-def automateInstagramActions(driver, videoPath=None, caption="Instagram said 'post daily' — so here's me being obedient."):
+def clickFirstAvailable(driver, stepName, locators, timeout, profileName, notFoundMessage):
     try:
-        print(info("🔄 Starting Instagram automation..."))
-        
-        createButton = WebDriverWait(driver, 20).until(
-            EC.element_to_be_clickable((By.XPATH, "//span[contains(text(), 'Create')]"))
+        element, _ = registry.find(driver, stepName, locators, timeout, profileName)
+    except Exception:
+        raise StepError(notFoundMessage)
+    element.click()
+    return element
+
+def clickCreate(driver, timeout=20):
+    print(info("🔄 Starting Instagram automation..."))
+    clickWhenReady(driver, createLocator, timeout)
+
+def selectVideoFile(driver, videoPath, timeout=20):
+    selectFiles(driver, videoPath, timeout)
+    print(success(f"✅ Selected: {os.path.basename(videoPath)}"))
+
+def openCropMenu(driver, timeout=10, profileName=None):
+    clickFirstAvailable(driver, "instagram.crop", cropButtonLocators, timeout, profileName, "Crop button not found")
+
+def selectOriginalCrop(driver, timeout=10, profileName=None):
+    clickFirstAvailable(driver, "instagram.original", [
+        (By.XPATH, "//span[text()='Original']"),
+        (By.XPATH, "//span[contains(text(), 'Original')]")
+    ], timeout, profileName, "Original format not found")
+
+def clickNext(driver, timeout=10, profileName=None):
+    # Returned so the step can wait for the next page to replace it
+    return clickFirstAvailable(driver, "instagram.next", nextButtonLocators, timeout, profileName, "Next button not found")
+
+def cropPageLeft(previousButton):
+    def condition(driver):
+        if stale(previousButton)(driver):
+            return True
+        return not any(driver.find_elements(*locator) for locator in cropButtonLocators)
+    return condition
+
+def writeCaption(driver, caption, timeout=10, profileName=None):
+    try:
+        captionField, _ = registry.find(driver, "instagram.caption", [
+            (By.XPATH, "//div[@aria-label='Write a caption...']"),
+            (By.XPATH, "//div[@role='textbox']")
+        ], timeout, profileName)
+    except Exception:
+        captionField = None
+    
+    if captionField:
+        if not enterText(driver, captionField, caption, chunkSize=50):
+            raise StepError("Caption not accepted by the editor")
+    else:
+        try:
+            captionField = driver.find_element(By.XPATH, "//div[@contenteditable='true']")
+            driver.execute_script("arguments[0].innerText = arguments[1]", captionField, caption)
+        except Exception:
+            raise StepError("Caption field not found")
+    
+    print(success("✅ Caption added"))
+
+def openAccessibility(driver, timeout=10, profileName=None):
+    clickFirstAvailable(driver, "instagram.accessibility", [
+        (By.XPATH, "//span[text()='Accessibility']"),
+        (By.XPATH, "//div[.//span[contains(text(), 'Accessibility')]]")
+    ], timeout, profileName, "Accessibility button not found")
+
+def enableAutoCaptions(driver, timeout=10):
+    try:
+        captionsToggle = WebDriverWait(driver, timeout).until(
+            EC.element_to_be_clickable((By.XPATH, "//input[@role='switch']"))
         )
-        createButton.click()
-        
-        if videoPath:
-            if os.name == "nt":
-                selectButton = WebDriverWait(driver, 20).until(
-                    EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Select from computer')]"))
-                )
-                selectButton.click()
-                
-                time.sleep(2)
-                pyautogui.write(videoPath, interval=0.05)
-                time.sleep(1)
-                pyautogui.press('enter')
-                print(success(f"✅ Selected: {os.path.basename(videoPath)}"))
-            else:
-                time.sleep(2)
-                try:
-                    uploadInput = WebDriverWait(driver, 10).until(
-                        EC.presence_of_element_located((By.XPATH, "//input[@type='file']"))
-                    )
-                    uploadInput.send_keys(videoPath)
-                    print(success(f"✅ Selected: {os.path.basename(videoPath)}"))
-                except Exception as e:
-                    print(error(f"❌ Upload error: {e}"))
-                    raise
+    except Exception:
+        captionsSection = WebDriverWait(driver, 5).until(
+            EC.presence_of_element_located((By.XPATH, "//span[contains(text(), 'Auto-generated captions')]"))
+        )
+        captionsToggle = captionsSection.find_element(By.XPATH, "./following::input[@type='checkbox']")
+    
+    if captionsToggle.get_attribute("aria-checked") == "false":
+        captionsToggle.click()
+    print(success("✅ Captions enabled"))
 
-            time.sleep(5)
-            
-            try:
-                try:
-                    cropButtonContainer = WebDriverWait(driver, 10).until(
-                        EC.element_to_be_clickable((By.XPATH, "//div[@class='_abfz _abg1' and @role='button']"))
-                    )
-                    cropButtonContainer.click()
-                except Exception:
-                    try:
-                        cropButton = WebDriverWait(driver, 10).until(
-                            EC.element_to_be_clickable((By.XPATH, "//button[.//svg[@aria-label='Select crop']]"))
-                        )
-                        cropButton.click()
-                    except Exception:
-                        try:
-                            cropSvg = WebDriverWait(driver, 10).until(
-                                EC.element_to_be_clickable((By.XPATH, "//svg[@aria-label='Select crop']"))
-                            )
-                            cropSvg.click()
-                        except Exception:
-                            raise Exception("Crop button not found")
-                
-                time.sleep(2)
-                try:
-                    originalOption = WebDriverWait(driver, 10).until(
-                        EC.element_to_be_clickable((By.XPATH, "//span[text()='Original']"))
-                    )
-                    originalOption.click()
-                except Exception:
-                    try:
-                        originalOption = WebDriverWait(driver, 5).until(
-                            EC.element_to_be_clickable((By.XPATH, "//span[contains(text(), 'Original')]"))
-                        )
-                        originalOption.click()
-                    except Exception:
-                        raise Exception("Original format not found")
-                
-                time.sleep(2)
-                
-                try:
-                    nextButton = WebDriverWait(driver, 10).until(
-                        EC.element_to_be_clickable((By.XPATH, "//div[@role='button' and text()='Next']"))
-                    )
-                    nextButton.click()
-                except Exception:
-                    try:
-                        nextButton = WebDriverWait(driver, 5).until(
-                            EC.element_to_be_clickable((By.XPATH, "//*[text()='Next']"))
-                        )
-                        nextButton.click()
-                    except Exception:
-                        raise Exception("Next button not found")
-                
-                time.sleep(3)
-                
-                try:
-                    nextButton2 = WebDriverWait(driver, 10).until(
-                        EC.element_to_be_clickable((By.XPATH, "//div[@role='button' and text()='Next']"))
-                    )
-                    nextButton2.click()
-                except Exception:
-                    try:
-                        nextButton2 = WebDriverWait(driver, 5).until(
-                            EC.element_to_be_clickable((By.XPATH, "//*[text()='Next']"))
-                        )
-                        nextButton2.click()
-                    except Exception:
-                        raise Exception("Second Next button not found")
-                
-                time.sleep(3)
-                
-                try:
-                    captionField = WebDriverWait(driver, 10).until(
-                        EC.element_to_be_clickable((By.XPATH, "//div[@aria-label='Write a caption...']"))
-                    )
-                    captionField.click()
-                    time.sleep(1)
-                    
-                    chunkSize = 50
-                    for i in range(0, len(caption), chunkSize):
-                        chunk = caption[i:i+chunkSize]
-                        captionField.send_keys(chunk)
-                        time.sleep(0.5)
-                except Exception:
-                    try:
-                        captionField = WebDriverWait(driver, 5).until(
-                            EC.element_to_be_clickable((By.XPATH, "//div[@role='textbox']"))
-                        )
-                        captionField.click()
-                        time.sleep(1)
-                        
-                        chunkSize = 50
-                        for i in range(0, len(caption), chunkSize):
-                            chunk = caption[i:i+chunkSize]
-                            captionField.send_keys(chunk)
-                            time.sleep(0.5)
-                    except Exception:
-                        try:
-                            captionField = driver.find_element(By.XPATH, "//div[@contenteditable='true']")
-                            
-                            try:
-                                driver.execute_script("arguments[0].innerText = arguments[1]", captionField, caption)
-                            except:
-                                driver.execute_script("arguments[0].innerText = ''", captionField)
-                                chunkSize = 50
-                                for i in range(0, len(caption), chunkSize):
-                                    chunk = caption[i:i+chunkSize]
-                                    current = driver.execute_script("return arguments[0].innerText", captionField)
-                                    driver.execute_script("arguments[0].innerText = arguments[1]", captionField, current + chunk)
-                                    time.sleep(0.5)
-                        except Exception:
-                            raise Exception("Caption field not found")
-                
-                print(success("✅ Caption added"))
-                
-                try:
-                    accessibilityButton = WebDriverWait(driver, 10).until(
-                        EC.element_to_be_clickable((By.XPATH, "//span[text()='Accessibility']"))
-                    )
-                    accessibilityButton.click()
-                except Exception:
-                    try:
-                        accessibilityDiv = WebDriverWait(driver, 5).until(
-                            EC.element_to_be_clickable((By.XPATH, "//div[.//span[contains(text(), 'Accessibility')]]"))
-                        )
-                        accessibilityDiv.click()
-                    except Exception:
-                        raise Exception("Accessibility button not found")
-                
-                time.sleep(2)
-                
-                try:
-                    captionsToggle = WebDriverWait(driver, 10).until(
-                        EC.element_to_be_clickable((By.XPATH, "//input[@role='switch']"))
-                    )
-                    if captionsToggle.get_attribute("aria-checked") == "false":
-                        captionsToggle.click()
-                except Exception:
-                    try:
-                        captionsSection = WebDriverWait(driver, 5).until(
-                            EC.presence_of_element_located((By.XPATH, "//span[contains(text(), 'Auto-generated captions')]"))
-                        )
-                        captionsToggle = captionsSection.find_element(By.XPATH, "./following::input[@type='checkbox']")
-                        if captionsToggle.get_attribute("aria-checked") == "false":
-                            captionsToggle.click()
-                    except Exception:
-                        print(warning("⚠️ Auto-captions not enabled"))
-                
-                print(success("✅ Captions enabled"))
-                
-                time.sleep(2)
-                try:
-                    shareButton = WebDriverWait(driver, 10).until(
-                        EC.element_to_be_clickable((By.XPATH, "//div[@role='button' and text()='Share']"))
-                    )
-                    shareButton.click()
-                    print(success("✅ Share button clicked"))
-                    
-                    try:
-                        success_message = WebDriverWait(driver, 60).until(
-                            EC.presence_of_element_located((By.XPATH, "//h3[contains(text(), 'Your reel has been shared')]"))
-                        )
-                        print(success("✅ Post shared successfully"))
-                    except Exception as e:
-                        print(warning(f"⚠️ Share confirmation not detected: {e}"))
-                except Exception:
-                    try:
-                        shareButton = WebDriverWait(driver, 5).until(
-                            EC.element_to_be_clickable((By.XPATH, "//*[text()='Share']"))
-                        )
-                        shareButton.click()
-                        print(success("✅ Share button clicked"))
-                        
-                        try:
-                            success_message = WebDriverWait(driver, 60).until(
-                                EC.presence_of_element_located((By.XPATH, "//h3[contains(text(), 'Your reel has been shared')]"))
-                            )
-                            print(success("✅ Post shared successfully"))
-                        except Exception as e:
-                            print(warning(f"⚠️ Share confirmation not detected: {e}"))
-                    except Exception as e:
-                        print(error(f"❌ Share error: {e}"))
-                
-            except Exception as e:
-                print(error(f"❌ Error: {e}"))
+def shareReel(driver, timeout=60, profileName=None):
+    clickFirstAvailable(driver, "instagram.share", shareButtonLocators, min(timeout, 10), profileName, "Share button not found")
+    print(success("✅ Share button clicked"))
+
+def returnToFeed(driver, timeout=15, profileName=None):
+    """Dismiss the shared confirmation so Create can start the next reel, reloading the tab if that fails"""
+    try:
+        try:
+            clickFirstAvailable(driver, "instagram.close", closeButtonLocators, 5, profileName, "Close button not found")
+        except StepError:
+            ActionChains(driver).send_keys(Keys.ESCAPE).perform()
+        WebDriverWait(driver, timeout, poll_frequency=0.2).until(gone(sharedConfirmationLocator))
+        WebDriverWait(driver, timeout, poll_frequency=0.2).until(clickable(createLocator))
+    except Exception:
+        print(warning("⚠️ Dialog did not close, reloading the feed"))
+        driver.get(instagramUrl)
+        WebDriverWait(driver, timeout, poll_frequency=0.2).until(clickable(createLocator))
+    print(info("🏠 Back on the feed"))
+
+def buildInstagramWizard(driver, videoPath, caption, profileName=None, onCheckpoint=None):
+    captionLocator = (By.XPATH, "//div[@aria-label='Write a caption...'] | //div[@role='textbox']")
+    return Wizard(driver, "instagram", [
+        Step("clickCreate", lambda t: clickCreate(driver, t),
+             readyWhen=present((By.XPATH, "//input[@type='file'] | //button[contains(text(), 'Select from computer')]"))),
+        Step("selectFile", lambda t: selectVideoFile(driver, videoPath, t),
+             readyWhen=anyOf(*[clickable(l) for l in cropButtonLocators])),
+        Step("openCropMenu", lambda t: openCropMenu(driver, t, profileName),
+             readyWhen=clickable((By.XPATH, "//span[contains(text(), 'Original')]"))),
+        Step("selectOriginalCrop", lambda t: selectOriginalCrop(driver, t, profileName),
+             readyWhen=anyOf(*[clickable(l) for l in nextButtonLocators])),
+        Step("nextToEdit", lambda t: clickNext(driver, t, profileName), readyAfter=cropPageLeft),
+        Step("nextToCaption", lambda t: clickNext(driver, t, profileName), readyWhen=clickable(captionLocator)),
+        Step("writeCaption", lambda t: writeCaption(driver, caption, t, profileName)),
+        Step("openAccessibility", lambda t: openAccessibility(driver, t, profileName), required=False),
+        Step("enableAutoCaptions", lambda t: enableAutoCaptions(driver, t), required=False),
+        Step("shareReel", lambda t: shareReel(driver, t, profileName), readyWhen=present(sharedConfirmationLocator))
+    ], instagramCheckpoints, onCheckpoint)
+
+def automateInstagramActions(driver, videoPath=None, caption="Instagram said 'post daily' — so here's me being obedient.", profileName=None, onCheckpoint=None):
+    try:
+        if not videoPath:
+            clickCreate(driver)
+            print(success("✅ Automation complete"))
+            return True
         
-        print(success("✅ Automation complete"))
-        return True
+        result = buildInstagramWizard(driver, videoPath, caption, profileName, onCheckpoint).run()
+        if result:
+            print(success("✅ Post shared successfully"))
+            print(success("✅ Automation complete"))
+        return result
         
     except Exception as e:
         print(error(f"❌ Error: {e}"))
         return False
 
-def uploadToInstagram(profileName, word, caption, videoLocation):
+def uploadToInstagram(profileName, word, caption, videoLocation, session=None, driver=None, checkpoint=None):
     startTime = time.time()
+    browser = None
+    tabHandle = None
     
     try:
         print(highlight(f"\n=== Instagram Upload: {word.upper()} ==="))
@@ -251,18 +166,27 @@ def uploadToInstagram(profileName, word, caption, videoLocation):
             logger.error(f"Video not found: {videoLocation}")
             return False
         
-        browser = BrowserManager(profiles, profileName)
-        url = 'https://www.instagram.com/'
+        if checkpoint and checkpoint.passed("published"):
+            print(success("✅ Already shared before the last restart"))
+            return True
+        if checkpoint and checkpoint.stage:
+            # Instagram keeps no draft of an unfinished reel, the flow starts over
+            print(info(f"🔄 Previous attempt stopped after {checkpoint.stage}, starting over"))
         
-        if not browser.startBrowser(url):
-            return False
+        url = instagramUrl
         
-        driver = browser.driver
+        if session:
+            driver = driver or session.driver
+            tabHandle = session.openTab(url, driver)
+        else:
+            browser = BrowserManager(profiles, profileName)
+            if not browser.startBrowser(url):
+                return False
+            driver = browser.driver
         
         print(info(f"🚀 Starting upload process..."))
         
-        result = automateInstagramActions(driver, videoLocation, caption)
-        time.sleep(5)
+        result = automateInstagramActions(driver, videoLocation, caption, profileName, checkpoint.reached if checkpoint else None)
         
         endTime = time.time()
         duration = endTime - startTime
@@ -283,9 +207,114 @@ def uploadToInstagram(profileName, word, caption, videoLocation):
         logger.error(f"Upload error: {e}")
         return False
     finally:
-        if 'browser' in locals():
+        if session and tabHandle:
+            session.closeTab(tabHandle, driver)
+        elif browser:
+            browser.closeBrowser()
+
+def uploadReelsToInstagram(profileName, items, session=None, driver=None, checkpoints=None, onResult=None):
+    """
+    Share several reels back to back in one tab
+
+    After each "Your reel has been shared" the flow returns to the feed and starts
+    the next reel, Chrome and the driver stay attached throughout. A failed reel
+    reloads the tab and the batch goes on with the next one
+
+    Args:
+        profileName (str): Name of the profile from config
+        items (list): (title, caption, videoLocation) per reel
+        session (BrowserManager): Pooled Chrome session, or None for a standalone launch
+        driver: Driver to use instead of the session's own
+        checkpoints (list): Checkpoint per item
+        onResult (callable): Called with (item index, result) as each reel finishes
+
+    Returns:
+        list: Share result per item
+    """
+    startTime = time.time()
+    browser = None
+    tabHandle = None
+    results = [False] * len(items)
+    checkpoints = checkpoints or [None] * len(items)
+    reported = set()
+    
+    def report(itemIndex, result):
+        results[itemIndex] = result
+        reported.add(itemIndex)
+        if onResult:
+            onResult(itemIndex, result)
+    
+    try:
+        print(highlight(f"\n=== Instagram Session: {len(items)} reels ==="))
+        logger = setupLogging("instagram_upload.log", profileName)
+        logger.info(f"Starting session of {len(items)} reels")
+        
+        if session:
+            driver = driver or session.driver
+            tabHandle = session.openTab(instagramUrl, driver)
+        else:
+            browser = BrowserManager(profiles, profileName)
+            if not browser.startBrowser(instagramUrl):
+                for itemIndex in range(len(items)):
+                    report(itemIndex, False)
+                return results
+            driver = browser.driver
+        
+        for itemIndex, (title, caption, videoLocation) in enumerate(items):
+            checkpoint = checkpoints[itemIndex]
+            result = False
+            with span("instagram.upload", profile=profileName, batch=True):
+                print(highlight(f"\n--- {itemIndex + 1}/{len(items)}: {title.upper()} ---"))
+                if not os.path.exists(videoLocation):
+                    print(error(f"❌ Video not found: {videoLocation}"))
+                    logger.error(f"Video not found: {videoLocation}")
+                elif checkpoint and checkpoint.passed("published"):
+                    print(success("✅ Already shared before the last restart"))
+                    result = True
+                else:
+                    try:
+                        result = buildInstagramWizard(
+                            driver, videoLocation, caption, profileName, checkpoint.reached if checkpoint else None
+                        ).run()
+                    except Exception as e:
+                        print(error(f"❌ {title}: {e}"))
+                    
+                    try:
+                        if result:
+                            logger.info(f"Reel {title} shared")
+                            if itemIndex < len(items) - 1:
+                                returnToFeed(driver, profileName=profileName)
+                        else:
+                            logger.error(f"Reel {title} failed")
+                            # Whatever dialog the failure left open is thrown away
+                            driver.get(instagramUrl)
+                    except Exception as e:
+                        print(warning(f"⚠️ Could not get back to the feed: {e}"))
+                if not result:
+                    setOutcome("failed")
+            report(itemIndex, result)
+        
+        duration = time.time() - startTime
+        shared = sum(1 for result in results if result)
+        print(success(f"🏁 Session finished in {int(duration // 60)}m {int(duration % 60)}s: "
+                      f"{shared}/{len(items)} reels shared"))
+        logger.info(f"Session finished: {shared}/{len(items)} shared")
+        return results
+    
+    except Exception as e:
+        print(error(f"❌ Session error: {e}"))
+        logger.error(f"Session error: {e}")
+        for itemIndex in range(len(items)):
+            if itemIndex not in reported:
+                report(itemIndex, False)
+        return results
+    finally:
+        if session and tabHandle:
+            session.closeTab(tabHandle, driver)
+        elif browser:
             browser.closeBrowser()
 
+
 if __name__ == "__main__":
     videoLocation = "C:/Users/UtsavChaudhary/OneDrive - EDGE196/Desktop/NaradX_Social_Uploader/Balk.mp4"
     title = videoLocation.split("/")[-1].split(".")[0]
@@ -1,7 +1,7 @@
 import os
-from youTubeUpload import uploadToYoutube
-from instagramUpload import uploadToInstagram
-from config import success, error, info, warning, highlight, profiles, basePath
+from uploadRunner import uploadVideo
+from sessionPool import SessionPool
+from config import success, error, info, warning, highlight, profiles, basePath, concurrentUploads
 
 # Video configuration
 videoLocation = os.path.join(basePath, "Balk.mp4")
@@ -9,28 +9,37 @@ title = videoLocation.split("/")[-1].split(".")[0]
 caption = "BALK means to hesitate or refuse to proceed; to stop short and refuse to continue. #GREprep #IELTSvocab #wordoftheday #englishwithstyle #speaklikeanative #studygram #vocabularyboost #learnenglish #englishreels #explorepage #IELTSpreparation #englishvocabulary #spokenenglish #studymotivation #englishlearning #dailyvocab #englishpractice #fluencygoals #vocabchallenge #englishtips #educationreels #englishgrammar #ieltsvocab #smartvocab"
 tags = "GRE, IELTS, vocabulary, english, learning, education, words, study, exam prep, english vocabulary"  # Default tags
 
-def uploadWithProfile(profileName, videoLocation, title, caption):
+def uploadWithProfile(profileName, videoLocation, title, caption, pool=None, concurrent=concurrentUploads):
     print(highlight(f"\n=== Starting Upload Process for Profile: {profileName} ==="))
     if profileName not in profiles:
         print(error(f"❌ Profile '{profileName}' not found"))
         return False, False
     
-    # Upload to YouTube
-    print(info("\n📺 Starting YouTube Upload..."))
-    youtube_result = uploadToYoutube(profileName, title, caption, videoLocation)
+    ownPool = pool is None
+    if ownPool:
+        pool = SessionPool()
+    session = pool.acquire(profileName)
+    
+    print(info("\n📺📸 Starting YouTube and Instagram Uploads..."))
+    results = uploadVideo(profileName, title, caption, videoLocation, session, concurrent)
+    youtube_result = results['youtube']
+    instagram_result = results['instagram']
+    
     if youtube_result:
         print(success("✅ YouTube Upload Successful"))
     else:
         print(error("❌ YouTube Upload Failed"))
     
-    # Upload to Instagram
-    print(info("\n📸 Starting Instagram Upload..."))
-    instagram_result = uploadToInstagram(profileName, title, caption, videoLocation)
     if instagram_result:
         print(success("✅ Instagram Upload Successful"))
     else:
         print(error("❌ Instagram Upload Failed"))
     
+    if ownPool:
+        pool.closeAll()
+    else:
+        pool.release(profileName)
+    
     # Final status
     print(highlight(f"\n=== Upload Process Complete for {profileName} ==="))
     if youtube_result and instagram_result:
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Metadata compiler
+Renders the YouTube title, description and tags and the Instagram caption of
+every queued video from its word and meaning with the profile's templates,
+cut to the platform limits, and stores the result. Only entries whose source
+fields or templates changed since the last run are rendered again, uploads
+just read the stored strings
+"""
+import re
+import sys
+import json
+import hashlib
+import argparse
+from datetime import datetime, UTC
+from config import success, info, warning, highlight, profiles, metadataTemplates, metadataLimits
+from stateStore import StateStore
+
+# Catalog fields a rendering depends on
+sourceFields = ("word", "meaning", "title", "description")
+
+hashtagPattern = re.compile(r"#\w+")
+trailingHashtagsPattern = re.compile(r"(?:\s*#\w+)+\s*$")
+
+def utcNow():
+    return datetime.now(UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def digest(value):
+    return hashlib.sha256(json.dumps(value, sort_keys=True).encode("utf-8")).hexdigest()
+
+def profileTemplates(profileName):
+    """The default templates with the profile's own on top, tags from the profile config"""
+    templates = {**metadataTemplates["default"], **metadataTemplates.get(profileName, {})}
+    templates.setdefault("tags", profiles.get(profileName, {}).get("tags", ""))
+    return templates
+
+def truncate(text, limit):
+    """Cut text to limit characters, at a word boundary when one is close"""
+    if len(text) <= limit:
+        return text
+    cut = text[:limit - 1]
+    space = cut.rfind(" ")
+    if space > limit * 0.8:
+        cut = cut[:space]
+    return cut.rstrip() + "…"
+
+def cleanYoutubeText(text):
+    # Studio rejects angle brackets in titles and descriptions
+    return text.replace("<", "").replace(">", "")
+
+def fitTags(tags, limit):
+    """
+    Drop duplicate and overflowing tags
+
+    YouTube counts the commas between tags and the quotes it adds around tags with spaces
+
+    Returns:
+        tuple: (comma separated tags, dropped tags)
+    """
+    kept = []
+    dropped = []
+    seen = set()
+    used = 0
+    for tag in (tag.strip() for tag in tags.split(",")):
+        if not tag or tag.lower() in seen:
+            continue
+        seen.add(tag.lower())
+        cost = len(tag) + (2 if " " in tag else 0) + (1 if kept else 0)
+        if used + cost > limit:
+            dropped.append(tag)
+            continue
+        kept.append(tag)
+        used += cost
+    return ", ".join(kept), dropped
+
+def fitCaption(caption, maxChars, maxHashtags):
+    """
+    Keep the first maxHashtags hashtags and cut the text before the trailing hashtags to fit
+
+    Returns:
+        tuple: (caption, problems found)
+    """
+    problems = []
+    count = 0
+
+    def limitHashtag(match):
+        nonlocal count
+        count += 1
+        return match.group(0) if count <= maxHashtags else ""
+
+    limited = hashtagPattern.sub(limitHashtag, caption)
+    if count > maxHashtags:
+        problems.append(f"{count} hashtags, kept the first {maxHashtags}")
+        limited = re.sub(r"[ \t]{2,}", " ", limited).strip()
+
+    if len(limited) > maxChars:
+        problems.append(f"caption of {len(limited)} chars cut to {maxChars}")
+        trailing = trailingHashtagsPattern.search(limited)
+        hashtags = trailing.group(0) if trailing and len(trailing.group(0)) < maxChars // 2 else ""
+        body = limited[:len(limited) - len(hashtags)] if hashtags else limited
+        limited = truncate(body, maxChars - len(hashtags)) + hashtags
+    return limited, problems
+
+def renderTemplate(template, video):
+    word = (video.get("word") or "").strip()
+    return template.format_map({
+        "word": word,
+        "WORD": word.upper(),
+        "Word": word.capitalize(),
+        "meaning": (video.get("meaning") or "").strip()
+    }).strip()
+
+def renderMetadata(video, templates, limits=None):
+    """
+    Upload text for one video on every platform
+
+    Entries without a word, like hand-added videos, keep their own title and
+    description and are only checked against the limits
+
+    Returns:
+        dict: {"youtube": {title, description, tags}, "instagram": {caption}, "problems": [...]}
+    """
+    limits = limits or metadataLimits
+    youtubeLimits, instagramLimits = limits["youtube"], limits["instagram"]
+    problems = []
+
+    if (video.get("word") or "").strip():
+        title = renderTemplate(templates["youtubeTitle"], video)
+        description = renderTemplate(templates["youtubeDescription"], video)
+        caption = renderTemplate(templates["instagramCaption"], video)
+    else:
+        title = video.get("title") or ""
+        description = caption = video.get("description") or ""
+
+    title = " ".join(cleanYoutubeText(title).split())
+    if not title:
+        problems.append("empty title")
+    if len(title) > youtubeLimits["titleChars"]:
+        problems.append(f"title of {len(title)} chars cut to {youtubeLimits['titleChars']}")
+        title = truncate(title, youtubeLimits["titleChars"])
+
+    description = cleanYoutubeText(description)
+    if len(description) > youtubeLimits["descriptionChars"]:
+        problems.append(f"description of {len(description)} chars cut to {youtubeLimits['descriptionChars']}")
+        description = truncate(description, youtubeLimits["descriptionChars"])
+
+    tags, dropped = fitTags(templates["tags"], youtubeLimits["tagsChars"])
+    if dropped:
+        problems.append(f"tags over {youtubeLimits['tagsChars']} chars dropped: {', '.join(dropped)}")
+
+    caption, captionProblems = fitCaption(caption, instagramLimits["captionChars"], instagramLimits["hashtags"])
+    problems.extend(captionProblems)
+
+    return {
+        "youtube": {"title": title, "description": description, "tags": tags},
+        "instagram": {"caption": caption},
+        "problems": problems
+    }
+
+class MetadataCompiler:
+    def __init__(self, store=None):
+        self.store = store or StateStore()
+
+    def compileProfile(self, profileName, force=False, batchSize=500):
+        """
+        Render every video of a profile whose source fields or templates changed
+
+        Returns:
+            dict: Counts of rendered, unchanged and flagged (cut to fit) entries
+        """
+        templates = profileTemplates(profileName)
+        templateHash = digest({"templates": templates, "limits": metadataLimits})
+        stored = {
+            row["position"]: (row["templateHash"], row["sourceHash"])
+            for row in self.store.connection().execute(
+                "SELECT position, templateHash, sourceHash FROM renderedMetadata WHERE profile = ?", (profileName,)
+            )
+        }
+
+        counts = {"rendered": 0, "unchanged": 0, "flagged": 0}
+        pending = []
+
+        def flush():
+            with self.store.transaction() as conn:
+                for values in pending:
+                    self.write(conn, *values)
+            pending.clear()
+
+        for position, video in self.store.iterVideos(profileName):
+            sourceHash = digest({field: video.get(field) for field in sourceFields})
+            if not force and stored.get(position) == (templateHash, sourceHash):
+                counts["unchanged"] += 1
+                continue
+            metadata = renderMetadata(video, templates)
+            counts["rendered"] += 1
+            if metadata["problems"]:
+                counts["flagged"] += 1
+                print(warning(f"⚠️ {profileName} #{position} ({video.get('word') or video.get('filename')}): "
+                              f"{'; '.join(metadata['problems'])}"))
+            pending.append((profileName, position, templateHash, sourceHash, metadata))
+            if len(pending) >= batchSize:
+                flush()
+        if pending:
+            flush()
+        return counts
+
+    def write(self, conn, profileName, position, templateHash, sourceHash, metadata):
+        conn.execute(
+            """
+            INSERT INTO renderedMetadata (profile, position, templateHash, sourceHash, metadata, renderedAt)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (profile, position) DO UPDATE SET
+                templateHash = excluded.templateHash, sourceHash = excluded.sourceHash,
+                metadata = excluded.metadata, renderedAt = excluded.renderedAt
+            """,
+            (profileName, position, templateHash, sourceHash, json.dumps(metadata), utcNow())
+        )
+
+    def forVideo(self, profileName, position, video=None):
+        """
+        Stored metadata of one video, rendered on the spot if it is missing or out of date
+
+        Returns:
+            dict: Same shape as renderMetadata
+        """
+        video = video or self.store.getVideo(profileName, position)
+        templates = profileTemplates(profileName)
+        templateHash = digest({"templates": templates, "limits": metadataLimits})
+        sourceHash = digest({field: video.get(field) for field in sourceFields})
+        row = self.store.connection().execute(
+            "SELECT templateHash, sourceHash, metadata FROM renderedMetadata WHERE profile = ? AND position = ?",
+            (profileName, position)
+        ).fetchone()
+        if row and (row["templateHash"], row["sourceHash"]) == (templateHash, sourceHash):
+            return json.loads(row["metadata"])
+
+        metadata = renderMetadata(video, templates)
+        with self.store.transaction() as conn:
+            self.write(conn, profileName, position, templateHash, sourceHash, metadata)
+        return metadata
+
+def main():
+    parser = argparse.ArgumentParser(description="Render upload titles, tags and captions for the queued videos")
+    parser.add_argument("command", nargs="?", default="compile", choices=["compile", "show"])
+    parser.add_argument("profile", nargs="*", help="Profiles to compile, or <profile> <position> to show")
+    parser.add_argument("--force", action="store_true", help="Render everything again")
+    args = parser.parse_args()
+
+    compiler = MetadataCompiler()
+    if args.command == "show":
+        if len(args.profile) != 2:
+            print(info("python metadataCompiler.py show <profile> <position>"))
+            sys.exit(1)
+        metadata = compiler.forVideo(args.profile[0], int(args.profile[1]))
+        print(highlight(f"\n=== {args.profile[0]} #{args.profile[1]} ==="))
+        print(json.dumps(metadata, indent=2, ensure_ascii=False))
+        return
+
+    for profileName in args.profile or compiler.store.listProfiles():
+        counts = compiler.compileProfile(profileName, args.force)
+        print(success(f"✅ {profileName}: {counts['rendered']} rendered, {counts['unchanged']} unchanged, "
+                      f"{counts['flagged']} cut to fit"))
+
+if __name__ == "__main__":
+    main()
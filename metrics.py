@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Upload metrics
+Timing spans around wizard steps, browser launch/attach and whole uploads.
+Every finished span is appended to a JSONL file and the totals over that
+file are written as a Prometheus textfile, so every worker process adds to
+the same counters. `python metrics.py report` shows p50/p95 per span across runs
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta, UTC
+from config import warning, highlight, info, metricsDir
+from atomicFile import writeAtomically
+
+spansPath = os.path.join(metricsDir, "spans.jsonl")
+promPath = os.path.join(metricsDir, "uploader.prom")
+
+# Attributes copied from the enclosing span, so steps know their profile
+inheritedAttributes = ("profile",)
+
+class Metrics:
+    def __init__(self, spansPath=spansPath, promPath=promPath):
+        self.spansPath = spansPath
+        self.promPath = promPath
+        self.local = threading.local()
+        self.lock = threading.Lock()
+
+    def stack(self):
+        if not hasattr(self.local, "stack"):
+            self.local.stack = []
+        return self.local.stack
+
+    def current(self):
+        stack = self.stack()
+        return stack[-1] if stack else None
+
+    def setAttribute(self, key, value):
+        """Attach an attribute to the innermost open span of this thread, if any"""
+        current = self.current()
+        if current is not None:
+            current["attributes"][key] = value
+
+    @contextmanager
+    def span(self, name, **attributes):
+        parent = self.current()
+        if parent is not None:
+            attributes = {
+                **{key: parent["attributes"][key] for key in inheritedAttributes if key in parent["attributes"]},
+                **attributes
+            }
+        record = {
+            "name": name,
+            "parent": parent["name"] if parent else None,
+            "startedAt": datetime.now(UTC).strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+            "attributes": attributes
+        }
+        self.stack().append(record)
+        startTime = time.perf_counter()
+        try:
+            yield record
+        except BaseException as e:
+            record["outcome"] = "error"
+            record["error"] = (str(e).strip().splitlines() or [type(e).__name__])[0]
+            raise
+        finally:
+            record["seconds"] = round(time.perf_counter() - startTime, 4)
+            record.setdefault("outcome", "ok")
+            self.stack().pop()
+            self.finish(record)
+
+    def record(self, name, seconds, outcome="ok", **attributes):
+        """
+        Store a span timed by the caller, for code like asyncio flows where many
+        spans are open on one thread and the span stack doesn't apply
+        """
+        self.finish({
+            "name": name,
+            "parent": None,
+            "startedAt": (datetime.now(UTC) - timedelta(seconds=seconds)).strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+            "attributes": attributes,
+            "seconds": round(seconds, 4),
+            "outcome": outcome
+        })
+
+    def setOutcome(self, outcome):
+        """Override the outcome of the innermost span, e.g. "failed" for a False result"""
+        current = self.current()
+        if current is not None:
+            current["outcome"] = outcome
+
+    def finish(self, record):
+        try:
+            with self.lock:
+                os.makedirs(os.path.dirname(self.spansPath), exist_ok=True)
+                with open(self.spansPath, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record) + "\n")
+                self.writeProm()
+        except Exception as e:
+            print(warning(f"⚠️ Could not write metrics: {e}"))
+
+    def readTotals(self):
+        """
+        Count, sum and failures per span over the whole spans file
+
+        Workers run as separate processes, so the totals live next to the
+        textfile with the offset they were read up to, and each writer only
+        reads the lines appended since
+        """
+        totalsPath = f"{self.promPath}.totals.json"
+        try:
+            with open(totalsPath, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            cache = {"offset": 0, "totals": {}}
+        if cache["offset"] > os.path.getsize(self.spansPath):
+            # The spans file was rotated or truncated
+            cache = {"offset": 0, "totals": {}}
+
+        with open(self.spansPath, "rb") as f:
+            f.seek(cache["offset"])
+            data = f.read()
+        # A line another worker is still appending is read next time
+        complete = data[:data.rfind(b"\n") + 1]
+        totals = cache["totals"]
+        for line in complete.splitlines():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            entry = totals.setdefault(record["name"], {"count": 0, "sum": 0.0, "failures": 0})
+            entry["count"] += 1
+            entry["sum"] += record["seconds"]
+            if record.get("outcome") != "ok":
+                entry["failures"] += 1
+
+        writeAtomically(totalsPath, json.dumps({"offset": cache["offset"] + len(complete), "totals": totals}))
+        return totals
+
+    def writeProm(self):
+        # node_exporter textfile format, replaced atomically so a scrape never sees half a file
+        totals = self.readTotals()
+        lines = [
+            "# HELP naradx_span_seconds Time spent in upload spans",
+            "# TYPE naradx_span_seconds summary"
+        ]
+        for name, entry in sorted(totals.items()):
+            lines.append(f'naradx_span_seconds_count{{span="{name}"}} {entry["count"]}')
+            lines.append(f'naradx_span_seconds_sum{{span="{name}"}} {entry["sum"]:.4f}')
+        lines.append("# HELP naradx_span_failures_total Spans that did not finish ok")
+        lines.append("# TYPE naradx_span_failures_total counter")
+        for name, entry in sorted(totals.items()):
+            lines.append(f'naradx_span_failures_total{{span="{name}"}} {entry["failures"]}')
+        writeAtomically(self.promPath, "\n".join(lines) + "\n")
+
+metrics = Metrics()
+span = metrics.span
+setAttribute = metrics.setAttribute
+setOutcome = metrics.setOutcome
+
+def percentile(sortedValues, fraction):
+    if not sortedValues:
+        return 0.0
+    index = min(len(sortedValues) - 1, max(0, round(fraction * (len(sortedValues) - 1))))
+    return sortedValues[index]
+
+def loadSpans(path=spansPath, sinceDays=None):
+    since = None
+    if sinceDays is not None:
+        since = (datetime.now(UTC) - timedelta(days=sinceDays)).strftime("%Y-%m-%dT%H:%M:%S")
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if since and record.get("startedAt", "") < since:
+                continue
+            yield record
+
+def report(path=spansPath, sinceDays=None, prefix=None, host=None):
+    grouped = {}
+    for record in loadSpans(path, sinceDays):
+        if prefix and not record["name"].startswith(prefix):
+            continue
+        if host and record.get("attributes", {}).get("host") != host:
+            continue
+        entry = grouped.setdefault(record["name"], {"seconds": [], "failures": 0, "selectors": {}, "rates": []})
+        entry["seconds"].append(record["seconds"])
+        if record.get("outcome") != "ok":
+            entry["failures"] += 1
+        if record.get("attributes", {}).get("bytesPerSecond"):
+            entry["rates"].append(record["attributes"]["bytesPerSecond"])
+        selector = record.get("attributes", {}).get("selector")
+        if selector:
+            entry["selectors"][selector] = entry["selectors"].get(selector, 0) + 1
+
+    print(highlight(f"\n{'span':<44}{'count':>7}{'p50 s':>9}{'p95 s':>9}{'fail':>6}"))
+    for name, entry in sorted(grouped.items(), key=lambda item: -sum(item[1]["seconds"])):
+        seconds = sorted(entry["seconds"])
+        print(f"{name:<44}{len(seconds):>7}{percentile(seconds, 0.5):>9.2f}"
+              f"{percentile(seconds, 0.95):>9.2f}{entry['failures']:>6}")
+        if entry["selectors"]:
+            selector, hits = max(entry["selectors"].items(), key=lambda item: item[1])
+            print(info(f"    most used selector: {selector} ({hits}/{len(seconds)})"))
+        if entry["rates"]:
+            rates = sorted(entry["rates"])
+            print(info(f"    upload throughput p50: {percentile(rates, 0.5) / (1024 * 1024):.2f} MB/s, "
+                       f"p5: {percentile(rates, 0.05) / (1024 * 1024):.2f} MB/s"))
+
+def main():
+    parser = argparse.ArgumentParser(description="Upload timing report")
+    parser.add_argument("command", nargs="?", default="report", choices=["report"])
+    parser.add_argument("--days", type=float, help="Only spans from the last N days")
+    parser.add_argument("--prefix", help="Only spans whose name starts with this, e.g. youtube.")
+    parser.add_argument("--host", help="Only spans recorded on this host")
+    parser.add_argument("--file", default=spansPath, help="Spans JSONL file")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.file):
+        print(warning(f"⚠️ No spans recorded yet at {args.file}"))
+        sys.exit(1)
+    report(args.file, args.days, args.prefix, args.host)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+MP4 preflight probe
+Reads the ISO-BMFF box structure (moov/mvhd/tkhd/stsd) with seeks, without
+decoding anything, and checks duration, size, aspect ratio and codec against
+config.uploadRules before a browser is started. Results are cached in the
+state store keyed by path, size and mtime
+"""
+import os
+import sys
+import json
+import struct
+from config import success, error, info, warning, highlight, uploadRules, shortsRules
+from stateStore import StateStore
+
+maxMoovBytes = 64 * 1024 * 1024
+
+class ProbeError(Exception):
+    pass
+
+def readBoxHeader(f, offset, fileSize):
+    """(size, type, headerSize) of the box at offset, size resolved for 64-bit and to-end boxes"""
+    f.seek(offset)
+    header = f.read(8)
+    if len(header) < 8:
+        raise ProbeError(f"Truncated box header at offset {offset}")
+    size, boxType = struct.unpack(">I4s", header)
+    headerSize = 8
+    if size == 1:
+        large = f.read(8)
+        if len(large) < 8:
+            raise ProbeError(f"Truncated box header at offset {offset}")
+        size = struct.unpack(">Q", large)[0]
+        headerSize = 16
+    elif size == 0:
+        size = fileSize - offset
+    if size < headerSize:
+        raise ProbeError(f"Invalid {boxType!r} box size {size} at offset {offset}")
+    return size, boxType, headerSize
+
+def iterBoxes(data, start=0, end=None):
+    """Child boxes of an in-memory container as (type, payload)"""
+    end = len(data) if end is None else end
+    offset = start
+    while offset + 8 <= end:
+        size, boxType = struct.unpack_from(">I4s", data, offset)
+        headerSize = 8
+        if size == 1:
+            size = struct.unpack_from(">Q", data, offset + 8)[0]
+            headerSize = 16
+        elif size == 0:
+            size = end - offset
+        if size < headerSize or offset + size > end:
+            raise ProbeError(f"Truncated {boxType.decode('latin-1')} box inside moov")
+        yield boxType, data[offset + headerSize:offset + size]
+        offset += size
+
+def findBoxes(data, path):
+    """Every payload reached by following a box path such as [b"trak", b"tkhd"]"""
+    matches = [data]
+    for boxType in path:
+        matches = [payload for parent in matches for childType, payload in iterBoxes(parent) if childType == boxType]
+    return matches
+
+def parseMvhd(payload):
+    if len(payload) < (32 if payload[:1] == b"\x01" else 20):
+        raise ProbeError("Truncated mvhd box")
+    version = payload[0]
+    if version == 1:
+        timescale, duration = struct.unpack_from(">IQ", payload, 20)
+    else:
+        timescale, duration = struct.unpack_from(">II", payload, 12)
+    return duration / timescale if timescale else 0.0
+
+def parseTkhd(payload):
+    if not payload:
+        raise ProbeError("Truncated tkhd box")
+    version = payload[0]
+    # Matrix and size sit after the version specific time fields
+    base = 4 + (32 if version == 1 else 20) + 8 + 8
+    if len(payload) < base + 44:
+        raise ProbeError("Truncated tkhd box")
+    a, b, _, c, d = struct.unpack_from(">iiiii", payload, base)
+    width, height = struct.unpack_from(">II", payload, base + 36)
+    rotation = {
+        (0, 1, -1, 0): 90,
+        (-1, 0, 0, -1): 180,
+        (0, -1, 1, 0): 270
+    }.get(tuple(value >> 16 for value in (a, b, c, d)), 0)
+    return width / 65536, height / 65536, rotation
+
+def parseTrak(trak):
+    handler = None
+    for hdlr in findBoxes(trak, [b"mdia", b"hdlr"]):
+        handler = hdlr[8:12].decode("latin-1")
+    codec = None
+    for stsd in findBoxes(trak, [b"mdia", b"minf", b"stbl", b"stsd"]):
+        if len(stsd) >= 16:
+            codec = stsd[12:16].decode("latin-1")
+    width = height = rotation = 0
+    for tkhd in findBoxes(trak, [b"tkhd"]):
+        width, height, rotation = parseTkhd(tkhd)
+    return {"handler": handler, "codec": codec, "width": width, "height": height, "rotation": rotation}
+
+def probeMp4(path):
+    """
+    Parse an MP4 file's metadata without decoding
+
+    Args:
+        path (str): Video file
+
+    Returns:
+        dict: duration, width, height (as displayed, after rotation), rotation,
+        videoCodec, audioCodec, faststart and size
+
+    Raises:
+        ProbeError: If the file is truncated or not an ISO-BMFF file
+    """
+    fileSize = os.path.getsize(path)
+    topLevel = []
+    moov = None
+
+    with open(path, "rb") as f:
+        offset = 0
+        while offset < fileSize:
+            size, boxType, headerSize = readBoxHeader(f, offset, fileSize)
+            if offset + size > fileSize:
+                raise ProbeError(f"File truncated: {boxType.decode('latin-1')} box needs "
+                                 f"{offset + size - fileSize} more bytes")
+            topLevel.append(boxType)
+            if boxType == b"moov":
+                if size > maxMoovBytes:
+                    raise ProbeError(f"moov box of {size} bytes is implausibly large")
+                f.seek(offset + headerSize)
+                moov = f.read(size - headerSize)
+            offset += size
+
+    if not topLevel or topLevel[0] not in (b"ftyp", b"styp", b"free", b"wide", b"moov", b"skip"):
+        raise ProbeError("Not an MP4/ISO-BMFF file")
+    if moov is None:
+        raise ProbeError("No moov box, the file was probably not finalized")
+    if b"mdat" not in topLevel:
+        raise ProbeError("No mdat box, the file has no media data")
+
+    mvhd = findBoxes(moov, [b"mvhd"])
+    if not mvhd:
+        raise ProbeError("No mvhd box in moov")
+
+    result = {
+        "size": fileSize,
+        "duration": round(parseMvhd(mvhd[0]), 3),
+        "width": 0,
+        "height": 0,
+        "rotation": 0,
+        "videoCodec": None,
+        "audioCodec": None,
+        # moov ahead of mdat lets the sites start processing before the upload ends
+        "faststart": topLevel.index(b"moov") < topLevel.index(b"mdat")
+    }
+    for trak in findBoxes(moov, [b"trak"]):
+        track = parseTrak(trak)
+        if track["handler"] == "vide" and result["videoCodec"] is None:
+            width, height = track["width"], track["height"]
+            if track["rotation"] in (90, 270):
+                width, height = height, width
+            result.update(width=int(width), height=int(height), rotation=track["rotation"], videoCodec=track["codec"])
+        elif track["handler"] == "soun" and result["audioCodec"] is None:
+            result["audioCodec"] = track["codec"]
+
+    if result["videoCodec"] is None:
+        raise ProbeError("No video track")
+    return result
+
+def checkRules(probe, platform, rules=None):
+    """Reasons the probed file breaks a platform's upload rules, empty if it is fine"""
+    rules = (rules or uploadRules).get(platform, {})
+    problems = []
+    if "minSeconds" in rules and probe["duration"] < rules["minSeconds"]:
+        problems.append(f"{probe['duration']:.1f}s is shorter than {rules['minSeconds']}s")
+    if "maxSeconds" in rules and probe["duration"] > rules["maxSeconds"]:
+        problems.append(f"{probe['duration']:.1f}s is longer than {rules['maxSeconds']}s")
+    if "maxSizeMB" in rules and probe["size"] > rules["maxSizeMB"] * 1024 * 1024:
+        problems.append(f"{probe['size'] / (1024 * 1024):.0f} MB is over {rules['maxSizeMB']} MB")
+    if probe["height"]:
+        aspect = probe["width"] / probe["height"]
+        if "minAspect" in rules and aspect < rules["minAspect"]:
+            problems.append(f"aspect {probe['width']}x{probe['height']} is narrower than {rules['minAspect']:.2f}")
+        if "maxAspect" in rules and aspect > rules["maxAspect"]:
+            problems.append(f"aspect {probe['width']}x{probe['height']} is wider than {rules['maxAspect']:.2f}")
+    if "minHeight" in rules and probe["height"] < rules["minHeight"]:
+        problems.append(f"{probe['height']}p is below {rules['minHeight']}p")
+    if "videoCodecs" in rules and probe["videoCodec"] not in rules["videoCodecs"]:
+        problems.append(f"video codec {probe['videoCodec']} is not one of {', '.join(rules['videoCodecs'])}")
+    return problems
+
+def cachedProbe(path, store=None):
+    """
+    probeMp4 with results kept in the state store until the file's size or mtime changes
+
+    Returns:
+        dict: The probe result, or {"error": "..."} for files that can't be parsed
+    """
+    store = store or StateStore()
+    stat = os.stat(path)
+    absolutePath = os.path.abspath(path)
+    row = store.connection().execute(
+        "SELECT result FROM probeCache WHERE path = ? AND size = ? AND mtimeNs = ?",
+        (absolutePath, stat.st_size, stat.st_mtime_ns)
+    ).fetchone()
+    if row:
+        return json.loads(row["result"])
+
+    try:
+        result = probeMp4(path)
+    except (ProbeError, struct.error, IndexError, ValueError) as e:
+        result = {"error": str(e) or "Unreadable MP4 structure"}
+
+    with store.transaction() as conn:
+        conn.execute(
+            """
+            INSERT INTO probeCache (path, size, mtimeNs, result) VALUES (?, ?, ?, ?)
+            ON CONFLICT (path) DO UPDATE SET size = excluded.size, mtimeNs = excluded.mtimeNs, result = excluded.result
+            """,
+            (absolutePath, stat.st_size, stat.st_mtime_ns, json.dumps(result))
+        )
+    return result
+
+def preflight(path, platforms, store=None):
+    """
+    Check a video against every platform's rules before uploading
+
+    Returns:
+        tuple: (probe result, {platform: [problems]}) with only failing platforms in the dict
+    """
+    probe = cachedProbe(path, store)
+    if "error" in probe:
+        return probe, {platform: [probe["error"]] for platform in platforms}
+    problems = {platform: checkRules(probe, platform) for platform in platforms}
+    return probe, {platform: found for platform, found in problems.items() if found}
+
+def shortsWarnings(probe, platforms):
+    """
+    Platforms the probed file won't be shown as a Short on, with the reasons
+
+    Returns:
+        dict: {platform: [reasons]} with only those platforms, empty for files that can't be parsed
+    """
+    if "error" in probe:
+        return {}
+    found = {platform: checkRules(probe, platform, shortsRules) for platform in platforms if platform in shortsRules}
+    return {platform: reasons for platform, reasons in found.items() if reasons}
+
+def main():
+    if len(sys.argv) < 2:
+        print(info("python mp4Probe.py <video.mp4> [platform...]"))
+        sys.exit(1)
+
+    path = sys.argv[1]
+    platforms = sys.argv[2:] or list(uploadRules)
+    probe, problems = preflight(path, platforms)
+
+    print(highlight(f"\n=== {os.path.basename(path)} ==="))
+    if "error" not in probe:
+        print(info(f"⏱️  {probe['duration']:.2f}s, {probe['width']}x{probe['height']}, rotation {probe['rotation']}°"))
+        print(info(f"🎞️  {probe['videoCodec']} / {probe['audioCodec'] or 'no audio'}, "
+                   f"{'faststart' if probe['faststart'] else 'moov at the end'}, {probe['size'] / (1024 * 1024):.1f} MB"))
+    notShorts = shortsWarnings(probe, platforms)
+    for platform in platforms:
+        if platform in problems:
+            print(error(f"❌ {platform}: {'; '.join(problems[platform])}"))
+        elif platform in notShorts:
+            print(warning(f"⚠️ {platform}: ok, as a regular video rather than a Short ({'; '.join(notShorts[platform])})"))
+        else:
+            print(success(f"✅ {platform}: ok"))
+    sys.exit(1 if problems else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Process reaper
+Kills whole process trees, a worker together with the Chrome it launched or
+Chrome with its renderer and GPU processes, and finds Chrome processes left
+behind by a crashed or killed run that still hold one of our profiles' user
+data dirs or debugging ports. The daemon reaps those at startup and after a
+worker is killed
+"""
+import os
+import time
+import signal
+import argparse
+import subprocess
+from config import success, error, info, warning, basePath, profiles, killGraceSeconds
+from resourceGovernor import descendantPids
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+def profileDataDir(profile):
+    """Chrome user data dir of a profile config entry"""
+    return profile.get("chromeDataDir") or os.path.join(basePath, "chromeData", profile["profileName"])
+
+def isRunning(pid):
+    # A zombie is gone for our purposes, its parent just hasn't reaped it yet
+    if psutil is not None:
+        try:
+            return psutil.Process(pid).status() != psutil.STATUS_ZOMBIE
+        except psutil.Error:
+            return False
+    if os.path.isdir("/proc"):
+        try:
+            with open(f"/proc/{pid}/stat", "r") as f:
+                return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+        except OSError:
+            return False
+    if os.name == "nt":
+        # os.kill(pid, 0) would terminate the process on Windows
+        listed = subprocess.run(["tasklist", "/FI", f"PID eq {pid}", "/NH"], capture_output=True, text=True)
+        return str(pid) in listed.stdout.split()
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def sendSignal(pid, sig, group=False):
+    try:
+        if group:
+            os.killpg(pid, sig)
+        else:
+            os.kill(pid, sig)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+def leadsOwnGroup(pid):
+    # Never signal our own group, that would take the caller down too
+    try:
+        return os.getpgid(pid) == pid and pid != os.getpgrp()
+    except (ProcessLookupError, PermissionError):
+        return False
+
+def killProcessTree(pid, grace=None, process=None):
+    """
+    Stop a process and everything below it, SIGTERM first and SIGKILL after the grace period
+
+    The tree is read before anything is signalled, since children are
+    re-parented once their parent is gone. A root that leads its own process
+    group (workers are started with start_new_session) is signalled as a
+    group as well, which also catches descendants that couldn't be listed
+
+    Args:
+        pid (int): Root of the tree
+        grace (float): Seconds to wait after each signal
+        process (Popen): The root's Popen, so it is reaped instead of left as a zombie
+
+    Returns:
+        list: PIDs still running afterwards, empty when the whole tree is gone
+    """
+    grace = killGraceSeconds if grace is None else grace
+    pids = [pid] + descendantPids(pid)
+
+    def waitForExit(seconds):
+        deadline = time.monotonic() + seconds
+        while True:
+            if process is not None:
+                process.poll()
+            alive = [p for p in pids if isRunning(p)]
+            if not alive or time.monotonic() >= deadline:
+                return alive
+            time.sleep(0.1)
+
+    if os.name == "nt":
+        # taskkill walks the tree itself, /F because Chrome's windowless processes ignore a polite close
+        subprocess.run(["taskkill", "/PID", str(pid), "/T", "/F"], capture_output=True)
+        for survivor in waitForExit(grace):
+            subprocess.run(["taskkill", "/PID", str(survivor), "/F"], capture_output=True)
+        return waitForExit(grace)
+
+    group = leadsOwnGroup(pid)
+    alive = pids
+    for sig in (signal.SIGTERM, signal.SIGKILL):
+        if group:
+            sendSignal(pid, sig, group=True)
+        for p in alive:
+            sendSignal(p, sig)
+        alive = waitForExit(grace)
+        if not alive:
+            break
+    return alive
+
+def processCommandLines():
+    """(pid, ppid, args) of every process whose command line can be read"""
+    if psutil is not None:
+        for process in psutil.process_iter(["pid", "ppid", "cmdline"]):
+            yield process.info["pid"], process.info["ppid"], process.info["cmdline"] or []
+        return
+    if not os.path.isdir("/proc"):
+        return
+
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/cmdline", "rb") as f:
+                rawArgs = f.read()
+            with open(f"/proc/{entry}/stat", "r") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        args = [arg.decode("utf-8", "replace") for arg in rawArgs.split(b"\0") if arg]
+        yield int(entry), int(stat.rsplit(")", 1)[1].split()[1]), args
+
+def chromeFlags(args):
+    """--user-data-dir and --remote-debugging-port values of a command line"""
+    flags = {}
+    for arg in args:
+        for name in ("--user-data-dir", "--remote-debugging-port"):
+            if arg.startswith(f"{name}="):
+                flags[name] = arg.split("=", 1)[1].strip('"')
+    return flags
+
+def normalizedPath(path):
+    return os.path.normcase(os.path.abspath(path))
+
+def findStaleChrome(profileNames=None, profilesConfig=None):
+    """
+    Chrome processes holding one of our profiles' user data dirs or debugging ports
+
+    Only the topmost match of each process tree is returned, killing its tree
+    takes the renderer and GPU processes with it
+
+    Returns:
+        dict: {pid: profileName}
+    """
+    profilesConfig = profilesConfig if profilesConfig is not None else profiles
+    profileNames = [name for name in (profileNames or profilesConfig) if name in profilesConfig]
+    dataDirs = {normalizedPath(profileDataDir(profilesConfig[name])): name for name in profileNames}
+    ports = {str(profilesConfig[name]["debuggingPort"]): name for name in profileNames}
+
+    matches = {}
+    parents = {}
+    for pid, ppid, args in processCommandLines():
+        if pid == os.getpid() or not args:
+            continue
+        flags = chromeFlags(args)
+        owner = None
+        if "--user-data-dir" in flags:
+            owner = dataDirs.get(normalizedPath(flags["--user-data-dir"]))
+        # Anything else named chrome on our port keeps our Chrome from binding it
+        if owner is None and "chrom" in os.path.basename(args[0]).lower():
+            owner = ports.get(flags.get("--remote-debugging-port"))
+        if owner is not None:
+            matches[pid] = owner
+            parents[pid] = ppid
+    return {pid: owner for pid, owner in matches.items() if parents[pid] not in matches}
+
+def reapStaleChrome(profileNames=None, dryRun=False):
+    """
+    Kill Chrome left behind for these profiles, all configured profiles by default
+
+    Only call this while no upload of those profiles is running, their live Chrome would match too
+
+    Returns:
+        int: Number of process trees killed
+    """
+    reaped = 0
+    for pid, owner in findStaleChrome(profileNames).items():
+        print(warning(f"🧹 Stale Chrome (pid {pid}) still holds the profile of {owner}"
+                      f"{'' if dryRun else ', killing it'}"))
+        if dryRun:
+            continue
+        survivors = killProcessTree(pid)
+        if survivors:
+            print(error(f"❌ Could not kill Chrome for {owner}, still running: {', '.join(map(str, survivors))}"))
+        else:
+            reaped += 1
+    if reaped:
+        print(success(f"✅ Reaped {reaped} stale Chrome process tree(s)"))
+    return reaped
+
+def main():
+    parser = argparse.ArgumentParser(description="Kill Chrome left behind by crashed or killed upload runs")
+    parser.add_argument("profile", nargs="*", help="Profiles to check, all configured profiles by default")
+    parser.add_argument("--dry-run", action="store_true", help="Only list the stale processes")
+    args = parser.parse_args()
+
+    if not findStaleChrome(args.profile or None):
+        print(info("🧹 No stale Chrome processes found"))
+        return
+    reapStaleChrome(args.profile or None, args.dry_run)
+
+if __name__ == "__main__":
+    main()
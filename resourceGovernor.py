@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Resource governor
+Caps how many Chrome instances run at the same time based on the
+configured limit, the CPU count and the memory currently available
+"""
+import os
+import ctypes
+import threading
+from contextlib import contextmanager
+from config import info, warning, maxConcurrentBrowsers, browserMemoryMB, cpusPerBrowser
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+def getAvailableMemoryMB():
+    if os.name == "nt":
+        class MemoryStatus(ctypes.Structure):
+            _fields_ = [
+                ("dwLength", ctypes.c_ulong),
+                ("dwMemoryLoad", ctypes.c_ulong),
+                ("ullTotalPhys", ctypes.c_ulonglong),
+                ("ullAvailPhys", ctypes.c_ulonglong),
+                ("ullTotalPageFile", ctypes.c_ulonglong),
+                ("ullAvailPageFile", ctypes.c_ulonglong),
+                ("ullTotalVirtual", ctypes.c_ulonglong),
+                ("ullAvailVirtual", ctypes.c_ulonglong),
+                ("ullAvailExtendedVirtual", ctypes.c_ulonglong),
+            ]
+        status = MemoryStatus()
+        status.dwLength = ctypes.sizeof(MemoryStatus)
+        if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+            return status.ullAvailPhys // (1024 * 1024)
+        return None
+
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+    except OSError:
+        pass
+    return None
+
+def readProcChildren():
+    # ppid -> [pid] for every process, from /proc/<pid>/stat
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # The command name may contain spaces, the fields after it don't
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        children.setdefault(ppid, []).append(int(entry))
+    return children
+
+def descendantPids(pid):
+    """Every process below pid, children before grandchildren, empty if it can't be read on this OS"""
+    if psutil is not None:
+        try:
+            return [child.pid for child in psutil.Process(pid).children(recursive=True)]
+        except psutil.Error:
+            return []
+    if not os.path.isdir("/proc"):
+        return []
+
+    children = readProcChildren()
+    pids = [pid]
+    index = 0
+    while index < len(pids):
+        pids.extend(children.get(pids[index], []))
+        index += 1
+    return pids[1:]
+
+def readProcRssKB(pid):
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+def getProcessTreeMemoryMB(pid):
+    """
+    Resident memory of a process and all of its descendants
+
+    Pages shared between Chrome's processes are counted once per process,
+    so this is an upper bound
+
+    Args:
+        pid (int): Root process, e.g. the Chrome browser process
+
+    Returns:
+        tuple: (rssMB, processCount), or (None, 0) if it can't be read on this OS
+    """
+    if psutil is not None:
+        try:
+            root = psutil.Process(pid)
+            processes = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return None, 0
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                continue
+        return total // (1024 * 1024), len(processes)
+
+    if not os.path.isdir("/proc"):
+        return None, 0
+
+    pids = [pid] + descendantPids(pid)
+    return sum(readProcRssKB(p) for p in pids) // 1024, len(pids)
+
+def computeBrowserCap(maxBrowsers=None, memoryPerBrowserMB=None, cpusPerInstance=None):
+    """
+    Work out how many Chrome instances this host can run right now
+
+    Args:
+        maxBrowsers (int): Hard cap from config
+        memoryPerBrowserMB (int): Expected RAM use of one Chrome instance
+        cpusPerInstance (float): CPU cores reserved per Chrome instance
+
+    Returns:
+        int: Number of concurrent Chrome instances, never below 1
+    """
+    maxBrowsers = maxConcurrentBrowsers if maxBrowsers is None else maxBrowsers
+    memoryPerBrowserMB = browserMemoryMB if memoryPerBrowserMB is None else memoryPerBrowserMB
+    cpusPerInstance = cpusPerBrowser if cpusPerInstance is None else cpusPerInstance
+
+    limits = [maxBrowsers]
+
+    cpuCount = os.cpu_count() or 1
+    limits.append(int(cpuCount // cpusPerInstance))
+
+    availableMB = getAvailableMemoryMB()
+    if availableMB is not None:
+        limits.append(int(availableMB // memoryPerBrowserMB))
+    else:
+        print(warning("⚠️ Could not read available memory, using CPU and config limits only"))
+
+    return max(1, min(limits))
+
+class ResourceGovernor:
+    def __init__(self, maxBrowsers=None, memoryPerBrowserMB=None, cpusPerInstance=None):
+        self.capacity = computeBrowserCap(maxBrowsers, memoryPerBrowserMB, cpusPerInstance)
+        self.semaphore = threading.BoundedSemaphore(self.capacity)
+        print(info(f"🧮 Resource governor: up to {self.capacity} concurrent Chrome instance(s)"))
+
+    @contextmanager
+    def slot(self, profileName):
+        if not self.semaphore.acquire(blocking=False):
+            print(info(f"⏳ {profileName} waiting for a free Chrome slot..."))
+            self.semaphore.acquire()
+        try:
+            yield
+        finally:
+            self.semaphore.release()
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Upload job queue
+One job per video and platform in the state store. Failed uploads come back
+after an exponential backoff with jitter, are dead-lettered after
+retryMaxAttempts, and due retries alternate with fresh videos
+"""
+import sys
+import json
+import random
+from datetime import datetime, timedelta, UTC
+from config import success, info, warning, highlight, retryMaxAttempts, retryBaseSeconds, retryMaxSeconds
+from stateStore import StateStore, platformColumns
+
+allPlatforms = list(platformColumns)
+
+def utcNow():
+    return datetime.now(UTC)
+
+def isoFormat(moment):
+    return moment.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def backoffDelay(attempts, baseSeconds=None, maxSeconds=None):
+    """Delay before the next attempt after `attempts` failures, jittered to 50-100%"""
+    baseSeconds = retryBaseSeconds if baseSeconds is None else baseSeconds
+    maxSeconds = retryMaxSeconds if maxSeconds is None else maxSeconds
+    delay = min(maxSeconds, baseSeconds * (2 ** max(0, attempts - 1)))
+    return timedelta(seconds=delay * random.uniform(0.5, 1.0))
+
+class UploadQueue:
+    def __init__(self, store=None, maxAttempts=None):
+        self.store = store or StateStore()
+        self.maxAttempts = retryMaxAttempts if maxAttempts is None else maxAttempts
+
+    def dueRetries(self, profileName, platform, now=None, limit=1):
+        rows = self.store.connection().execute(
+            """
+            SELECT position FROM uploadJobs
+            WHERE profile = ? AND platform = ? AND state = 'retry' AND availableAt <= ?
+            ORDER BY availableAt LIMIT ?
+            """,
+            (profileName, platform, isoFormat(now or utcNow()), limit)
+        ).fetchall()
+        return [row["position"] for row in rows]
+
+    def freshVideos(self, profileName, platform, limit=1):
+        # Unchecked videos this platform has never attempted
+        rows = self.store.connection().execute(
+            f"""
+            SELECT v.position FROM videos v
+            WHERE v.profile = ? AND v.videoChecked = 0 AND v.{platformColumns[platform]} = 0
+            AND NOT EXISTS (
+                SELECT 1 FROM uploadJobs j
+                WHERE j.profile = v.profile AND j.position = v.position AND j.platform = ?
+            )
+            ORDER BY v.position LIMIT ?
+            """,
+            (profileName, platform, limit)
+        ).fetchall()
+        return [row["position"] for row in rows]
+
+    def dueRetry(self, profileName, platform, now=None):
+        positions = self.dueRetries(profileName, platform, now)
+        return positions[0] if positions else None
+
+    def freshVideo(self, profileName, platform):
+        positions = self.freshVideos(profileName, platform)
+        return positions[0] if positions else None
+
+    def lastKind(self, profileName, platform):
+        row = self.store.connection().execute(
+            "SELECT lastKind FROM queueMeta WHERE profile = ? AND platform = ?", (profileName, platform)
+        ).fetchone()
+        return row["lastKind"] if row else None
+
+    def setLastKind(self, conn, profileName, platform, kind):
+        conn.execute(
+            """
+            INSERT INTO queueMeta (profile, platform, lastKind) VALUES (?, ?, ?)
+            ON CONFLICT (profile, platform) DO UPDATE SET lastKind = excluded.lastKind
+            """,
+            (profileName, platform, kind)
+        )
+
+    def nextJob(self, profileName, platform, now=None):
+        """
+        Pick the next video to upload on a platform
+
+        Returns:
+            tuple: (position, kind) where kind is "retry" or "fresh", or None if there is no work
+        """
+        retryPosition = self.dueRetry(profileName, platform, now)
+        freshPosition = self.freshVideo(profileName, platform)
+
+        # Alternate so retries never starve fresh work and vice versa
+        if retryPosition is not None and (freshPosition is None or self.lastKind(profileName, platform) != "retry"):
+            return retryPosition, "retry"
+        if freshPosition is not None:
+            return freshPosition, "fresh"
+        return None
+
+    def hasWork(self, profileName, platform, now=None):
+        return self.nextJob(profileName, platform, now) is not None
+
+    def claim(self, profileName, platforms, now=None):
+        """
+        Claim the next job for each platform
+
+        Returns:
+            dict: {position: [platforms]} so platforms sharing a video upload it together
+        """
+        plan = {}
+        with self.store.transaction() as conn:
+            for platform in platforms:
+                job = self.nextJob(profileName, platform, now)
+                if job is None:
+                    continue
+                position, kind = job
+                self.setLastKind(conn, profileName, platform, kind)
+                plan.setdefault(position, []).append(platform)
+        return plan
+
+    def claimBatch(self, profileName, platform, limit, now=None):
+        """
+        Claim up to `limit` jobs on one platform for a batch upload, retries and fresh videos alternating
+
+        Returns:
+            list: Positions in upload order
+        """
+        positions = []
+        with self.store.transaction() as conn:
+            retries = self.dueRetries(profileName, platform, now, limit)
+            fresh = self.freshVideos(profileName, platform, limit)
+            kind = self.lastKind(profileName, platform)
+            while len(positions) < limit and (retries or fresh):
+                if retries and (not fresh or kind != "retry"):
+                    positions.append(retries.pop(0))
+                    kind = "retry"
+                else:
+                    positions.append(fresh.pop(0))
+                    kind = "fresh"
+            if positions:
+                self.setLastKind(conn, profileName, platform, kind)
+        return positions
+
+    def recordResult(self, profileName, position, platform, ok, errorMessage=None, now=None, final=False):
+        """
+        Store one platform attempt and update the video record in a single transaction
+
+        A failure with final=True goes straight to the dead letters, for problems a retry can't fix
+        """
+        now = now or utcNow()
+        with self.store.transaction() as conn:
+            row = conn.execute(
+                "SELECT attempts FROM uploadJobs WHERE profile = ? AND position = ? AND platform = ?",
+                (profileName, position, platform)
+            ).fetchone()
+            attempts = (row["attempts"] if row else 0) + 1
+
+            if ok:
+                state, availableAt = "done", None
+            elif final or attempts >= self.maxAttempts:
+                state, availableAt = "dead", None
+            else:
+                state, availableAt = "retry", isoFormat(now + backoffDelay(attempts))
+
+            conn.execute(
+                """
+                INSERT INTO uploadJobs (profile, position, platform, state, attempts, availableAt, lastError, updatedAt)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (profile, position, platform) DO UPDATE SET
+                    state = excluded.state,
+                    attempts = excluded.attempts,
+                    availableAt = excluded.availableAt,
+                    lastError = excluded.lastError,
+                    updatedAt = excluded.updatedAt
+                """,
+                (profileName, position, platform, state, attempts, availableAt,
+                 None if ok else (errorMessage or "upload failed"), isoFormat(now))
+            )
+
+            if state != "retry":
+                # Finished either way, a later requeue starts over
+                self.store.clearCheckpoint(conn, profileName, position, platform)
+
+            jobs = conn.execute(
+                "SELECT platform, state, attempts FROM uploadJobs WHERE profile = ? AND position = ?",
+                (profileName, position)
+            ).fetchall()
+            states = {job["platform"]: job["state"] for job in jobs}
+
+            dataRow = conn.execute(
+                "SELECT data FROM videos WHERE profile = ? AND position = ?", (profileName, position)
+            ).fetchone()
+            video = json.loads(dataRow["data"])
+            video[platformColumns[platform]] = bool(ok)
+            video["uploadTimestamp"] = isoFormat(now)
+            video["retryCount"] = max(job["attempts"] for job in jobs) - 1
+            # Checked once every platform is uploaded or given up on
+            video["videoChecked"] = all(
+                states.get(name) in ("done", "dead") or video.get(platformColumns[name])
+                for name in allPlatforms
+            )
+            self.store.writeVideo(conn, profileName, position, video)
+
+        if state == "retry":
+            print(warning(f"🔁 {platform} attempt {attempts}/{self.maxAttempts} failed, retrying after {availableAt}"))
+        elif state == "dead":
+            print(warning(f"🪦 {platform} gave up after {attempts} attempts, moved to dead letters"))
+        return video
+
+    def requeue(self, profileName, position, platform):
+        """Send a dead-lettered job back into the queue"""
+        with self.store.transaction() as conn:
+            conn.execute(
+                """
+                UPDATE uploadJobs SET state = 'retry', attempts = 0, availableAt = ?, updatedAt = ?
+                WHERE profile = ? AND position = ? AND platform = ?
+                """,
+                (isoFormat(utcNow()), isoFormat(utcNow()), profileName, position, platform)
+            )
+            video = json.loads(conn.execute(
+                "SELECT data FROM videos WHERE profile = ? AND position = ?", (profileName, position)
+            ).fetchone()["data"])
+            video["videoChecked"] = False
+            self.store.writeVideo(conn, profileName, position, video)
+
+    def listJobs(self, state):
+        return self.store.connection().execute(
+            "SELECT * FROM uploadJobs WHERE state = ? ORDER BY profile, availableAt, position", (state,)
+        ).fetchall()
+
+def main():
+    queue = UploadQueue()
+    command = sys.argv[1] if len(sys.argv) > 1 else "status"
+
+    if command == "requeue" and len(sys.argv) == 5:
+        queue.requeue(sys.argv[2], int(sys.argv[3]), sys.argv[4])
+        print(success(f"✅ Requeued {sys.argv[2]} #{sys.argv[3]} on {sys.argv[4]}"))
+        return
+
+    for state in ("retry", "dead"):
+        jobs = queue.listJobs(state)
+        print(highlight(f"\n=== {state} ({len(jobs)}) ==="))
+        for job in jobs:
+            print(f"{info(job['profile'])} #{job['position']} {job['platform']}: "
+                  f"{job['attempts']} attempt(s), next {job['availableAt'] or '-'}, {job['lastError'] or ''}")
+    print(f"\n{info('python retryQueue.py requeue <profile> <position> <platform>')}  # revive a dead job")
+
+if __name__ == "__main__":
+    main()
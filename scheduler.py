@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Posting scheduler
+Fires per-profile, per-platform slots at fixed local times, catches up on
+slots missed during downtime and sleeps exactly until the next slot
+"""
+import signal
+import threading
+from datetime import datetime, timedelta
+from config import success, info, warning, highlight, schedules, catchUpHours
+
+class Slot:
+    def __init__(self, profileName, platform, slotTime):
+        self.profileName = profileName
+        self.platform = platform
+        self.slotTime = slotTime
+        self.hour, self.minute = (int(part) for part in slotTime.split(":"))
+
+    def __repr__(self):
+        return f"{self.profileName}/{self.platform}@{self.slotTime}"
+
+    def at(self, day):
+        return datetime(day.year, day.month, day.day, self.hour, self.minute).astimezone()
+
+    def previousFire(self, now):
+        """Latest scheduled time at or before now"""
+        today = self.at(now)
+        return today if today <= now else self.at(now - timedelta(days=1))
+
+    def nextFire(self, now):
+        """Earliest scheduled time after now"""
+        today = self.at(now)
+        return today if today > now else self.at(now + timedelta(days=1))
+
+def buildSlots(profileNames, scheduleConfig=None):
+    scheduleConfig = scheduleConfig or schedules
+    slots = []
+    for profileName in profileNames:
+        profileSchedule = scheduleConfig.get(profileName, scheduleConfig.get("default", {}))
+        for platform, slotTimes in profileSchedule.items():
+            for slotTime in slotTimes:
+                slots.append(Slot(profileName, platform, slotTime))
+    return slots
+
+class Scheduler:
+    def __init__(self, store, listProfiles, runDue, scheduleConfig=None, catchUp=None):
+        """
+        Args:
+            store (StateStore): Keeps the last fire time of every slot
+            listProfiles (callable): Returns the profile names to schedule, called every wakeup
+            runDue (callable): Called with {profileName: [platforms]} for the slots that are due
+            scheduleConfig (dict): Slot times, config.schedules by default
+            catchUp (timedelta): How late a missed slot may still fire
+        """
+        self.store = store
+        self.listProfiles = listProfiles
+        self.runDue = runDue
+        self.scheduleConfig = scheduleConfig
+        self.catchUp = catchUp if catchUp is not None else timedelta(hours=catchUpHours)
+        self.stopEvent = threading.Event()
+
+    def installSignalHandlers(self):
+        def handleSignal(signum, frame):
+            print(warning(f"\n🛑 Received signal {signum}, stopping after the current uploads..."))
+            self.stopEvent.set()
+
+        signal.signal(signal.SIGINT, handleSignal)
+        signal.signal(signal.SIGTERM, handleSignal)
+        if hasattr(signal, "SIGBREAK"):
+            signal.signal(signal.SIGBREAK, handleSignal)
+
+    def stop(self):
+        self.stopEvent.set()
+
+    def dueSlots(self, slots, now):
+        due = []
+        for slot in slots:
+            scheduledAt = slot.previousFire(now)
+            lastFired = self.store.getLastFired(slot.profileName, slot.platform, slot.slotTime)
+            if lastFired and datetime.fromisoformat(lastFired) >= scheduledAt:
+                continue
+
+            if now - scheduledAt > self.catchUp:
+                # Too late to post, don't let an old slot fire at a random hour
+                print(warning(f"⏭️  Skipping missed slot {slot} from {scheduledAt.strftime('%Y-%m-%d %H:%M')}"))
+                self.store.setLastFired(slot.profileName, slot.platform, slot.slotTime, scheduledAt.isoformat())
+                continue
+
+            if now - scheduledAt > timedelta(minutes=1):
+                print(info(f"⏪ Catching up slot {slot} from {scheduledAt.strftime('%Y-%m-%d %H:%M')}"))
+            due.append((slot, scheduledAt))
+        return due
+
+    def runOnce(self, now=None):
+        """Fire every due slot, returns the number of slots fired"""
+        now = now or datetime.now().astimezone()
+        slots = buildSlots(self.listProfiles(), self.scheduleConfig)
+        due = self.dueSlots(slots, now)
+        if not due:
+            return 0
+
+        plan = {}
+        for slot, _ in due:
+            plan.setdefault(slot.profileName, []).append(slot.platform)
+
+        print(highlight(f"\n⏰ {now.strftime('%Y-%m-%d %H:%M:%S')} firing {len(due)} slot(s)"))
+        try:
+            self.runDue(plan)
+        finally:
+            # Marked fired even if uploads failed, a slot is one posting opportunity
+            for slot, scheduledAt in due:
+                self.store.setLastFired(slot.profileName, slot.platform, slot.slotTime, scheduledAt.isoformat())
+        return len(due)
+
+    def run(self):
+        print(success("🚀 Scheduler started"))
+        while not self.stopEvent.is_set():
+            self.runOnce()
+            if self.stopEvent.is_set():
+                break
+
+            now = datetime.now().astimezone()
+            slots = buildSlots(self.listProfiles(), self.scheduleConfig)
+            if not slots:
+                print(warning("⚠️ No schedule slots configured, nothing to wait for"))
+                break
+
+            nextSlot = min(slots, key=lambda slot: slot.nextFire(now))
+            nextAt = nextSlot.nextFire(now)
+            waitSeconds = max(0, (nextAt - datetime.now().astimezone()).total_seconds())
+            print(info(f"😴 Next slot {nextSlot} at {nextAt.strftime('%Y-%m-%d %H:%M')} "
+                       f"(in {waitSeconds/3600:.2f} hours)"))
+            # One wait until the slot, woken early only by a stop signal
+            self.stopEvent.wait(waitSeconds)
+
+        print(success("✅ Scheduler stopped"))
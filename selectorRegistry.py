@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Selector registry
+Remembers which locator alternative matched for each step and profile,
+tries the last winner first and probes all alternatives in one short wait
+"""
+import os
+import json
+import time
+import threading
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from config import warning, basePath
+from metrics import setAttribute
+from atomicFile import writeAtomically, fileLock
+
+statsPath = os.path.join(basePath, "cache", "selectorStats.json")
+
+class SelectorRegistry:
+    def __init__(self, path=statsPath):
+        self.path = path
+        self.lock = threading.Lock()
+        self.stats = self.load()
+        # Hits since the last save, keyed (profile, step, locator)
+        self.pending = {}
+
+    def load(self):
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(warning(f"⚠️ Ignoring unreadable selector stats {self.path}: {e}"))
+            return {}
+
+    def save(self):
+        # Workers for other profiles save the same file, so it is read back and only our new hits are added
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with fileLock(self.path):
+            merged = self.load()
+            for (profileKey, stepName, key), delta in self.pending.items():
+                entry = merged.setdefault(profileKey, {}).setdefault(stepName, {}).setdefault(key, {"hits": 0})
+                entry["hits"] = entry.get("hits", 0) + delta["hits"]
+                entry["lastHit"] = max(entry.get("lastHit", 0), delta["lastHit"])
+            writeAtomically(self.path, json.dumps(merged, indent=2))
+        self.stats = merged
+        self.pending.clear()
+
+    def stepStats(self, profileName, stepName):
+        return self.stats.setdefault(profileName or "default", {}).setdefault(stepName, {})
+
+    def ordered(self, profileName, stepName, locators):
+        """Locators sorted so the last winner comes first, then by hit count"""
+        with self.lock:
+            stats = self.stepStats(profileName, stepName)
+            def rank(indexedLocator):
+                index, locator = indexedLocator
+                entry = stats.get(locatorKey(locator), {})
+                return (-entry.get("lastHit", 0), -entry.get("hits", 0), index)
+            return [locator for _, locator in sorted(enumerate(locators), key=rank)]
+
+    def recordHit(self, profileName, stepName, locator):
+        with self.lock:
+            entry = self.stepStats(profileName, stepName).setdefault(locatorKey(locator), {"hits": 0})
+            entry["hits"] = entry.get("hits", 0) + 1
+            entry["lastHit"] = time.time()
+            delta = self.pending.setdefault((profileName or "default", stepName, locatorKey(locator)), {"hits": 0})
+            delta["hits"] += 1
+            delta["lastHit"] = entry["lastHit"]
+            try:
+                self.save()
+            except Exception as e:
+                print(warning(f"⚠️ Could not save selector stats: {e}"))
+
+    def find(self, driver, stepName, locators, timeout=10, profileName=None, condition=EC.element_to_be_clickable):
+        """
+        Wait once for whichever alternative matches first
+
+        Args:
+            driver: Selenium driver
+            stepName (str): Step the locators belong to, e.g. "instagram.crop"
+            locators (list): (By, selector) alternatives
+            timeout (float): Single wait shared by all alternatives
+            profileName (str): Stats are kept per profile
+            condition (callable): Expected condition applied to each locator
+
+        Returns:
+            tuple: (element, locator) of the matching alternative
+        """
+        orderedLocators = self.ordered(profileName, stepName, locators)
+        conditions = [(locator, condition(locator)) for locator in orderedLocators]
+
+        def anyMatch(d):
+            # Every poll checks all alternatives, best candidate first
+            for locator, check in conditions:
+                try:
+                    element = check(d)
+                except Exception:
+                    continue
+                if element:
+                    return element, locator
+            return False
+
+        element, locator = WebDriverWait(driver, timeout, poll_frequency=0.2).until(anyMatch)
+        self.recordHit(profileName, stepName, locator)
+        # Which alternative matched, 0 being the primary selector
+        setAttribute("selector", locatorKey(locator))
+        setAttribute("fallback", locators.index(locator))
+        return element, locator
+
+def locatorKey(locator):
+    return f"{locator[0]}={locator[1]}"
+
+registry = SelectorRegistry()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Chrome session pool
+Keeps one attached Chrome session per profile so every platform upload
+for that profile reuses it instead of cold-launching Chrome again
+"""
+import time
+import threading
+from config import success, info, warning, profiles
+from browserUtils import BrowserManager
+
+class SessionPool:
+    def __init__(self, profilesConfig=None, maxIdleSeconds=600):
+        self.profiles = profilesConfig if profilesConfig is not None else profiles
+        self.maxIdleSeconds = maxIdleSeconds
+        self.sessions = {}
+        self.profileLocks = {}
+        self.lock = threading.RLock()
+
+    def acquire(self, profileName):
+        """
+        Get the running Chrome session for a profile, launching it on first use
+
+        Args:
+            profileName (str): Name of the profile from config
+
+        Returns:
+            BrowserManager: Attached session, or None if Chrome failed to start
+        """
+        self.closeIdle()
+
+        # Only one launch per profile, other profiles can start Chrome in parallel
+        with self.lock:
+            profileLock = self.profileLocks.setdefault(profileName, threading.Lock())
+
+        with profileLock:
+            browser = self.sessions.get(profileName)
+            if browser and browser.isAlive():
+                browser.lastUsed = time.time()
+                browser.leases += 1
+                print(info(f"♻️ Reusing Chrome session for {profileName}"))
+                return browser
+
+            if browser:
+                print(warning(f"⚠️ Chrome session for {profileName} is gone, relaunching..."))
+                browser.closeBrowser()
+                with self.lock:
+                    self.sessions.pop(profileName, None)
+
+            browser = BrowserManager(self.profiles, profileName)
+            if not browser.startBrowser("about:blank"):
+                return None
+
+            browser.leases = 1
+            with self.lock:
+                self.sessions[profileName] = browser
+            return browser
+
+    def release(self, profileName):
+        with self.lock:
+            browser = self.sessions.get(profileName)
+            if browser:
+                browser.lastUsed = time.time()
+                browser.leases = max(0, browser.leases - 1)
+
+    def closeIdle(self, maxIdleSeconds=None):
+        maxIdle = self.maxIdleSeconds if maxIdleSeconds is None else maxIdleSeconds
+        with self.lock:
+            now = time.time()
+            for profileName in list(self.sessions):
+                browser = self.sessions[profileName]
+                if browser.leases == 0 and now - browser.lastUsed >= maxIdle:
+                    print(info(f"💤 Closing idle Chrome session for {profileName}"))
+                    browser.closeBrowser()
+                    del self.sessions[profileName]
+
+    def closeAll(self):
+        with self.lock:
+            for profileName, browser in list(self.sessions.items()):
+                browser.closeBrowser()
+            self.sessions.clear()
+            print(success("✅ All pooled Chrome sessions closed"))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.closeAll()
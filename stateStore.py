@@ -0,0 +1,444 @@
+#!/usr/bin/env python3
+"""
+State store for profile video queues
+SQLite in WAL mode with indexes on the upload flags, so finding the next
+pending video and updating one record never touch the whole queue.
+profiles/*.json stays the import/export format
+"""
+import os
+import sys
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from config import success, error, info, warning, highlight, stateDbPath
+
+schema = """
+CREATE TABLE IF NOT EXISTS videos (
+    profile TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    filename TEXT,
+    catalogKey TEXT,
+    videoChecked INTEGER,
+    youtubeUploaded INTEGER NOT NULL DEFAULT 0,
+    instagramUploaded INTEGER NOT NULL DEFAULT 0,
+    createdAt TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (profile, position)
+);
+CREATE INDEX IF NOT EXISTS idxVideosPending ON videos (profile, videoChecked, position);
+CREATE INDEX IF NOT EXISTS idxVideosYoutube ON videos (profile, youtubeUploaded, position);
+CREATE INDEX IF NOT EXISTS idxVideosInstagram ON videos (profile, instagramUploaded, position);
+CREATE INDEX IF NOT EXISTS idxVideosCreated ON videos (profile, createdAt);
+CREATE INDEX IF NOT EXISTS idxVideosCatalogKey ON videos (profile, catalogKey);
+CREATE TABLE IF NOT EXISTS uploadJobs (
+    profile TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    platform TEXT NOT NULL,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    availableAt TEXT,
+    lastError TEXT,
+    updatedAt TEXT NOT NULL,
+    PRIMARY KEY (profile, position, platform)
+);
+CREATE INDEX IF NOT EXISTS idxJobsDue ON uploadJobs (profile, platform, state, availableAt);
+CREATE TABLE IF NOT EXISTS queueMeta (
+    profile TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    lastKind TEXT NOT NULL,
+    PRIMARY KEY (profile, platform)
+);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    profile TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    platform TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    detail TEXT,
+    updatedAt TEXT NOT NULL,
+    PRIMARY KEY (profile, position, platform)
+);
+CREATE TABLE IF NOT EXISTS probeCache (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtimeNs INTEGER NOT NULL,
+    result TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS fileHashes (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtimeNs INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    hashedAt TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idxFileHashesSha ON fileHashes (sha256);
+CREATE TABLE IF NOT EXISTS contentUploads (
+    sha256 TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    profile TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    updatedAt TEXT NOT NULL,
+    PRIMARY KEY (sha256, platform)
+);
+CREATE TABLE IF NOT EXISTS renderedMetadata (
+    profile TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    templateHash TEXT NOT NULL,
+    sourceHash TEXT NOT NULL,
+    metadata TEXT NOT NULL,
+    renderedAt TEXT NOT NULL,
+    PRIMARY KEY (profile, position)
+);
+CREATE TABLE IF NOT EXISTS scheduleRuns (
+    profile TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    slot TEXT NOT NULL,
+    lastFiredAt TEXT NOT NULL,
+    PRIMARY KEY (profile, platform, slot)
+);
+"""
+
+# Tables with rows per video, keyed by its position in the profile's queue
+positionedTables = ("uploadJobs", "checkpoints", "renderedMetadata")
+
+# Record fields mirrored into indexed columns
+indexedFields = ("filename", "videoChecked", "youtubeUploaded", "instagramUploaded", "createdAt")
+platformColumns = {"youtube": "youtubeUploaded", "instagram": "instagramUploaded"}
+
+# Upload progress boundaries, in order, saved per video and platform. A selected
+# file is still transferring, only fileTransferred means Studio has all of it
+checkpointStages = ("fileSelected", "metadataFilled", "fileTransferred", "published")
+
+def catalogKey(video):
+    """Identity of a catalog entry: the word if it has one, else the filename"""
+    word = (video.get("word") or "").strip().lower()
+    if word:
+        return f"word:{word}"
+    filename = video.get("filename")
+    return f"file:{filename}" if filename else None
+
+def toColumn(field, value):
+    if field in ("videoChecked", "youtubeUploaded", "instagramUploaded"):
+        if value is None:
+            return None if field == "videoChecked" else 0
+        return 1 if value else 0
+    return value
+
+class StateStore:
+    def __init__(self, path=stateDbPath):
+        self.path = path
+        self.local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.connection().executescript(schema)
+
+    def connection(self):
+        # sqlite3 connections can't be shared between threads, keep one per thread
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+
+    def transaction(self):
+        return Transaction(self.connection())
+
+    def close(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self.local.conn = None
+
+    def listProfiles(self):
+        rows = self.connection().execute("SELECT DISTINCT profile FROM videos ORDER BY profile").fetchall()
+        return [row["profile"] for row in rows]
+
+    def countVideos(self, profileName):
+        row = self.connection().execute(
+            "SELECT COUNT(*) AS total FROM videos WHERE profile = ?", (profileName,)
+        ).fetchone()
+        return row["total"]
+
+    def getVideo(self, profileName, position):
+        row = self.connection().execute(
+            "SELECT data FROM videos WHERE profile = ? AND position = ?", (profileName, position)
+        ).fetchone()
+        return json.loads(row["data"]) if row else None
+
+    def iterVideos(self, profileName):
+        rows = self.connection().execute(
+            "SELECT position, data FROM videos WHERE profile = ? ORDER BY position", (profileName,)
+        )
+        for row in rows:
+            yield row["position"], json.loads(row["data"])
+
+    def findVideoByKey(self, profileName, key, conn=None):
+        row = (conn or self.connection()).execute(
+            "SELECT position, data FROM videos WHERE profile = ? AND catalogKey = ? ORDER BY position LIMIT 1",
+            (profileName, key)
+        ).fetchone()
+        if row is None:
+            return None
+        return row["position"], json.loads(row["data"])
+
+    def nextPosition(self, profileName, conn=None):
+        row = (conn or self.connection()).execute(
+            "SELECT MAX(position) AS last FROM videos WHERE profile = ?", (profileName,)
+        ).fetchone()
+        return 0 if row["last"] is None else row["last"] + 1
+
+    def nextPendingVideo(self, profileName, platform=None):
+        """
+        Find the first unchecked video in queue order
+
+        Args:
+            profileName (str): Profile to look in
+            platform (str): Also require the video not to be uploaded to this platform yet
+
+        Returns:
+            tuple: (position, video dict), or None when nothing is pending
+        """
+        query = "SELECT position, data FROM videos WHERE profile = ? AND videoChecked = 0"
+        if platform:
+            query += f" AND {platformColumns[platform]} = 0"
+        row = self.connection().execute(query + " ORDER BY position LIMIT 1", (profileName,)).fetchone()
+        if row is None:
+            return None
+        return row["position"], json.loads(row["data"])
+
+    def hasPendingVideos(self, profileName=None):
+        if profileName:
+            row = self.connection().execute(
+                "SELECT 1 FROM videos WHERE profile = ? AND videoChecked = 0 LIMIT 1", (profileName,)
+            ).fetchone()
+        else:
+            row = self.connection().execute("SELECT 1 FROM videos WHERE videoChecked = 0 LIMIT 1").fetchone()
+        return row is not None
+
+    def updateVideo(self, profileName, position, fields):
+        """Merge fields into one video record in a single transaction, returns the updated record"""
+        with self.transaction() as conn:
+            row = conn.execute(
+                "SELECT data FROM videos WHERE profile = ? AND position = ?", (profileName, position)
+            ).fetchone()
+            if row is None:
+                raise KeyError(f"No video at position {position} in profile {profileName}")
+            video = json.loads(row["data"])
+            video.update(fields)
+            self.writeVideo(conn, profileName, position, video)
+        return video
+
+    def writeVideo(self, conn, profileName, position, video):
+        columns = {field: toColumn(field, video.get(field)) for field in indexedFields}
+        conn.execute(
+            """
+            INSERT INTO videos (profile, position, filename, catalogKey, videoChecked, youtubeUploaded, instagramUploaded, createdAt, data)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (profile, position) DO UPDATE SET
+                filename = excluded.filename,
+                catalogKey = excluded.catalogKey,
+                videoChecked = excluded.videoChecked,
+                youtubeUploaded = excluded.youtubeUploaded,
+                instagramUploaded = excluded.instagramUploaded,
+                createdAt = excluded.createdAt,
+                data = excluded.data
+            """,
+            (
+                profileName, position, columns["filename"], catalogKey(video), columns["videoChecked"],
+                columns["youtubeUploaded"], columns["instagramUploaded"], columns["createdAt"],
+                json.dumps(video)
+            )
+        )
+
+    def getLastFired(self, profileName, platform, slot):
+        row = self.connection().execute(
+            "SELECT lastFiredAt FROM scheduleRuns WHERE profile = ? AND platform = ? AND slot = ?",
+            (profileName, platform, slot)
+        ).fetchone()
+        return row["lastFiredAt"] if row else None
+
+    def setLastFired(self, profileName, platform, slot, firedAt):
+        with self.transaction() as conn:
+            conn.execute(
+                """
+                INSERT INTO scheduleRuns (profile, platform, slot, lastFiredAt) VALUES (?, ?, ?, ?)
+                ON CONFLICT (profile, platform, slot) DO UPDATE SET lastFiredAt = excluded.lastFiredAt
+                """,
+                (profileName, platform, slot, firedAt)
+            )
+
+    def getCheckpoint(self, profileName, position, platform):
+        row = self.connection().execute(
+            "SELECT stage, detail FROM checkpoints WHERE profile = ? AND position = ? AND platform = ?",
+            (profileName, position, platform)
+        ).fetchone()
+        if row is None:
+            return None, {}
+        return row["stage"], json.loads(row["detail"] or "{}")
+
+    def setCheckpoint(self, profileName, position, platform, stage, detail=None):
+        with self.transaction() as conn:
+            conn.execute(
+                """
+                INSERT INTO checkpoints (profile, position, platform, stage, detail, updatedAt)
+                VALUES (?, ?, ?, ?, ?, strftime('%Y-%m-%dT%H:%M:%SZ', 'now'))
+                ON CONFLICT (profile, position, platform) DO UPDATE SET
+                    stage = excluded.stage,
+                    detail = excluded.detail,
+                    updatedAt = excluded.updatedAt
+                """,
+                (profileName, position, platform, stage, json.dumps(detail or {}))
+            )
+
+    def clearCheckpoint(self, conn, profileName, position, platform):
+        conn.execute(
+            "DELETE FROM checkpoints WHERE profile = ? AND position = ? AND platform = ?",
+            (profileName, position, platform)
+        )
+
+    def importProfile(self, profileName, profilePath):
+        """Replace a profile's queue with the contents of a profiles/*.json file"""
+        with open(profilePath, "r") as f:
+            videos = json.load(f).get("videos", [])
+
+        missingChecked = 0
+        with self.transaction() as conn:
+            oldKeys = conn.execute(
+                "SELECT position, catalogKey FROM videos WHERE profile = ? ORDER BY position", (profileName,)
+            ).fetchall()
+            conn.execute("DELETE FROM videos WHERE profile = ?", (profileName,))
+            newPositions = {}
+            for position, video in enumerate(videos):
+                if "videoChecked" not in video:
+                    missingChecked += 1
+                self.writeVideo(conn, profileName, position, video)
+                newPositions.setdefault(catalogKey(video), position)
+            # A reordered file must not leave retries, checkpoints or metadata on another video
+            moves = {}
+            for row in oldKeys:
+                newPosition = newPositions.pop(row["catalogKey"], None) if row["catalogKey"] else None
+                if newPosition is not None:
+                    moves[row["position"]] = newPosition
+            self.movePositions(conn, profileName, moves)
+
+        if missingChecked:
+            print(warning(f"⚠️  {missingChecked} video(s) in {profileName} have no 'videoChecked' field and will be skipped"))
+        print(success(f"✅ Imported {len(videos)} video(s) into {profileName}"))
+        return len(videos)
+
+    def movePositions(self, conn, profileName, moves):
+        """Re-key a profile's per-video rows from old to new positions, rows of positions not in moves are dropped"""
+        for table in positionedTables:
+            rows = conn.execute(f"SELECT * FROM {table} WHERE profile = ?", (profileName,)).fetchall()
+            conn.execute(f"DELETE FROM {table} WHERE profile = ?", (profileName,))
+            for row in rows:
+                if row["position"] not in moves:
+                    continue
+                values = {**dict(row), "position": moves[row["position"]]}
+                conn.execute(
+                    f"INSERT INTO {table} ({', '.join(values)}) VALUES ({', '.join('?' * len(values))})",
+                    tuple(values.values())
+                )
+        # Content claims stay with their hash, only the owning position follows the video
+        for row in conn.execute(
+            "SELECT sha256, platform, position FROM contentUploads WHERE profile = ?", (profileName,)
+        ).fetchall():
+            if row["position"] in moves:
+                conn.execute(
+                    "UPDATE contentUploads SET position = ? WHERE sha256 = ? AND platform = ?",
+                    (moves[row["position"]], row["sha256"], row["platform"])
+                )
+
+    def exportProfile(self, profileName, profilePath):
+        """Write a profile's queue back out in the profiles/*.json format"""
+        videos = [video for _, video in self.iterVideos(profileName)]
+        tempPath = f"{profilePath}.tmp"
+        with open(tempPath, "w") as f:
+            json.dump({"videos": videos}, f, indent=2)
+        os.replace(tempPath, profilePath)
+        print(success(f"✅ Exported {len(videos)} video(s) from {profileName} to {profilePath}"))
+        return len(videos)
+
+    def importNewProfiles(self, profilesDir="profiles"):
+        """Import profiles/*.json files whose profile isn't in the store yet"""
+        known = set(self.listProfiles())
+        imported = []
+        for filePath in sorted(Path(profilesDir).glob("*.json")):
+            if filePath.stem in known:
+                continue
+            try:
+                self.importProfile(filePath.stem, filePath)
+                imported.append(filePath.stem)
+            except Exception as e:
+                print(error(f"❌ Error importing {filePath}: {e}"))
+        return imported
+
+class Checkpoint:
+    """Progress of one platform upload of one video, saved as each stage is reached"""
+    def __init__(self, store, profileName, position, platform):
+        self.store = store
+        self.profileName = profileName
+        self.position = position
+        self.platform = platform
+        self.stage, self.detail = store.getCheckpoint(profileName, position, platform)
+
+    def passed(self, stage):
+        if self.stage is None:
+            return False
+        return checkpointStages.index(self.stage) >= checkpointStages.index(stage)
+
+    def reached(self, stage, **detail):
+        self.detail = {**self.detail, **{key: value for key, value in detail.items() if value is not None}}
+        self.stage = stage
+        self.store.setCheckpoint(self.profileName, self.position, self.platform, stage, self.detail)
+
+class Transaction:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, excType, excValue, traceback):
+        if excType is None:
+            self.conn.execute("COMMIT")
+        else:
+            self.conn.execute("ROLLBACK")
+        return False
+
+def main():
+    usage = [
+        "python stateStore.py import [profile...]    # profiles/<profile>.json -> store (replaces the queue)",
+        "python stateStore.py export [profile...]    # store -> profiles/<profile>.json",
+        "python stateStore.py status"
+    ]
+    if len(sys.argv) < 2 or sys.argv[1] not in ("import", "export", "status"):
+        print(error("❌ Usage:"))
+        for line in usage:
+            print(f"  {info(line)}")
+        return
+
+    store = StateStore()
+    command, names = sys.argv[1], sys.argv[2:]
+
+    if command == "import":
+        paths = [Path("profiles") / f"{name}.json" for name in names] or sorted(Path("profiles").glob("*.json"))
+        for path in paths:
+            store.importProfile(path.stem, path)
+    elif command == "export":
+        os.makedirs("profiles", exist_ok=True)
+        for name in names or store.listProfiles():
+            store.exportProfile(name, os.path.join("profiles", f"{name}.json"))
+    else:
+        print(highlight(f"\n=== State store: {store.path} ==="))
+        for name in store.listProfiles():
+            pending = store.nextPendingVideo(name)
+            nextFile = pending[1].get("filename", "N/A") if pending else "none"
+            print(f"{info(name)}: {store.countVideos(name)} video(s), next pending: {nextFile}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Step engine for the upload wizards
+Each wizard is a list of explicit steps. A step runs its action and is done
+as soon as its DOM readiness condition holds, instead of sleeping a fixed time.
+Step and StepError live in uploadSteps, which the DevTools orchestrator shares
+"""
+import time
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from config import error, warning, stepTimeouts
+from metrics import span
+
+class Wizard:
+    def __init__(self, driver, name, steps, checkpoints=None, onCheckpoint=None):
+        """
+        Args:
+            driver: Selenium driver the steps run against
+            name (str): Wizard name, prefix of the config.stepTimeouts keys
+            steps (list): Steps in order
+            checkpoints (dict): Step name -> checkpoint stage reached once that step is over
+            onCheckpoint (callable): Called with the stage name when a checkpoint is reached
+        """
+        self.driver = driver
+        self.name = name
+        self.steps = steps
+        self.checkpoints = checkpoints or {}
+        self.onCheckpoint = onCheckpoint
+        self.state = "idle"
+        self.results = {}
+
+    def resumeStep(self, stage):
+        """Name of the step whose checkpoint is the given stage"""
+        for stepName, checkpointStage in self.checkpoints.items():
+            if checkpointStage == stage:
+                return stepName
+        return None
+
+    def timeoutFor(self, step):
+        if step.timeout is not None:
+            return step.timeout
+        return stepTimeouts.get(f"{self.name}.{step.name}", stepTimeouts["default"])
+
+    def runStep(self, step):
+        timeout = self.timeoutFor(step)
+        self.state = step.name
+        startTime = time.perf_counter()
+
+        with span(f"{self.name}.{step.name}", required=step.required):
+            result = step.action(timeout)
+            readyWhen = step.readyAfter(result) if step.readyAfter else step.readyWhen
+            if readyWhen:
+                WebDriverWait(self.driver, timeout, poll_frequency=0.2).until(readyWhen)
+
+        self.results[step.name] = {
+            "ok": True,
+            "result": result,
+            "seconds": time.perf_counter() - startTime
+        }
+        return result
+
+    def run(self, resumeAfter=None):
+        """
+        Run every step in order
+
+        Args:
+            resumeAfter (str): Skip the steps up to and including this one
+
+        Returns:
+            bool: True if all required steps completed
+        """
+        steps = self.steps
+        if resumeAfter:
+            names = [step.name for step in steps]
+            steps = steps[names.index(resumeAfter) + 1:]
+
+        for step in steps:
+            try:
+                self.runStep(step)
+            except Exception as e:
+                self.results[step.name] = {"ok": False, "error": str(e)}
+                message = str(e).strip().splitlines()[0] if str(e).strip() else type(e).__name__
+                if step.required:
+                    self.state = "failed"
+                    print(error(f"❌ {self.name} step '{step.name}' failed: {message}"))
+                    return False
+                print(warning(f"⚠️ {self.name} step '{step.name}' skipped: {message}"))
+
+            if step.name in self.checkpoints and self.onCheckpoint:
+                self.onCheckpoint(self.checkpoints[step.name])
+
+        self.state = "done"
+        return True
+
+# Readiness conditions, all usable as WebDriverWait(...).until(condition)
+
+def clickable(locator):
+    return EC.element_to_be_clickable(locator)
+
+def present(locator):
+    return EC.presence_of_element_located(locator)
+
+def gone(locator):
+    return EC.invisibility_of_element_located(locator)
+
+def anyOf(*conditions):
+    return EC.any_of(*conditions)
+
+def stale(element):
+    return EC.staleness_of(element)
+
+def textEquals(element, text, script="return arguments[0].innerText"):
+    def condition(driver):
+        try:
+            return (driver.execute_script(script, element) or "").strip() == text.strip()
+        except Exception:
+            return False
+    return condition
+
+def attributeEquals(locator, attribute, value):
+    def condition(driver):
+        try:
+            return driver.find_element(*locator).get_attribute(attribute) == value
+        except Exception:
+            return False
+    return condition
+
+def clickWhenReady(driver, locator, timeout):
+    element = WebDriverWait(driver, timeout).until(EC.element_to_be_clickable(locator))
+    element.click()
+    return element
+
+def findWhenReady(driver, locator, timeout):
+    return WebDriverWait(driver, timeout).until(EC.element_to_be_clickable(locator))
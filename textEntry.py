@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Text entry for the upload forms
+Inserts a whole string in one DevTools Input.insertText call, which editors
+treat as real typing, then verifies the field and only falls back to
+chunked send_keys when the contents don't match
+"""
+import time
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.common.action_chains import ActionChains
+from config import warning
+from uploadSteps import normalizeText
+
+readFieldScript = """
+    const el = arguments[0];
+    if (el.tagName === 'INPUT' || el.tagName === 'TEXTAREA') return el.value;
+    return el.innerText;
+"""
+
+def readField(driver, field):
+    return driver.execute_script(readFieldScript, field) or ""
+
+def fieldMatches(driver, field, text):
+    return normalizeText(readField(driver, field)) == normalizeText(text)
+
+def clearField(driver, field, timeout=5):
+    try:
+        field.send_keys(Keys.CONTROL + "a")
+        field.send_keys(Keys.DELETE)
+    except AttributeError:
+        try:
+            actions = ActionChains(driver)
+            actions.key_down(Keys.CONTROL).send_keys("a").key_up(Keys.CONTROL).perform()
+            field.send_keys(Keys.DELETE)
+        except:
+            driver.execute_script("arguments[0].innerText = ''", field)
+
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.1).until(lambda d: readField(d, field).strip() == "")
+    except Exception:
+        driver.execute_script("arguments[0].innerText = ''", field)
+
+def removeAddedText(driver, field, before, timeout=5):
+    """
+    Take back what a failed insert appended to a field that held before
+
+    Returns:
+        bool: True if the field holds before again
+    """
+    current = readField(driver, field)
+    if current == before:
+        return True
+    if not current.startswith(before):
+        return False
+    field.send_keys(Keys.END)
+    field.send_keys(Keys.BACKSPACE * (len(current) - len(before)))
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.1).until(lambda d: readField(d, field) == before)
+        return True
+    except Exception:
+        return False
+
+def focusField(driver, field, timeout=5):
+    field.click()
+    WebDriverWait(driver, timeout, poll_frequency=0.1).until(
+        lambda d: d.execute_script(
+            "return document.activeElement === arguments[0] || arguments[0].contains(document.activeElement)", field
+        )
+    )
+
+def insertWholeText(driver, text):
+    try:
+        driver.execute_cdp_cmd("Input.insertText", {"text": text})
+    except Exception:
+        # Non-Chrome drivers: execCommand also fires the editor's input events
+        driver.execute_script("document.execCommand('insertText', false, arguments[0])", text)
+
+def typeInChunks(field, text, chunkSize, chunkDelay):
+    for i in range(0, len(text), chunkSize):
+        field.send_keys(text[i:i+chunkSize])
+        time.sleep(chunkDelay)
+
+def enterText(driver, field, text, clear=True, verify=None, chunkSize=50, chunkDelay=0.3, timeout=5):
+    """
+    Put text into an input or contenteditable field in one operation
+
+    Args:
+        driver: Selenium driver
+        field: Target element
+        text (str): Full text to enter
+        clear (bool): Empty the field first
+        verify (callable): Custom check taking (driver, field, text), defaults to comparing contents
+        chunkSize (int): Chunk size for the send_keys fallback
+        chunkDelay (float): Delay between chunks for the send_keys fallback
+        timeout (float): How long to wait for the field to settle
+
+    Returns:
+        bool: True if the field holds the text afterwards
+    """
+    verify = verify or fieldMatches
+
+    focusField(driver, field, timeout)
+    if clear:
+        clearField(driver, field, timeout)
+    before = readField(driver, field)
+
+    insertWholeText(driver, text)
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.1).until(lambda d: verify(d, field, text))
+        return True
+    except Exception:
+        print(warning("⚠️ Bulk text entry not accepted, typing in chunks"))
+
+    if clear:
+        clearField(driver, field, timeout)
+    elif not removeAddedText(driver, field, before, timeout):
+        # Typing on top of a partial insert would enter the text twice
+        print(warning("⚠️ Could not undo the partial text entry, leaving the field as it is"))
+        return False
+    typeInChunks(field, text, chunkSize, chunkDelay)
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.1).until(lambda d: verify(d, field, text))
+        return True
+    except Exception:
+        return False
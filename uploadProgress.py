@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Studio upload progress watcher
+Reads the upload dialog's progress label until the transfer is complete,
+fails on a stall instead of waiting out a fixed sleep, and records the
+observed bytes/s on the current metrics span. Without a label the transfer
+only counts as done when the dialog itself shows it finished
+"""
+import re
+import time
+import socket
+from config import info, success, uploadStallSeconds
+from uploadSteps import StepError
+from metrics import setAttribute
+
+progressLabelSelectors = [
+    "ytcp-video-upload-progress .progress-label",
+    "ytcp-video-upload-progress span",
+    "ytcp-multi-progress-monitor .progress-title"
+]
+readProgressScript = """
+    for (const selector of arguments[0]) {
+        for (const el of document.querySelectorAll(selector)) {
+            const text = (el.innerText || el.textContent || '').trim();
+            if (text) return text;
+        }
+    }
+    return null;
+"""
+# Text and thumbnail of the dialog, checked when a reopened draft shows no progress label
+readDialogScript = """
+    const dialog = document.querySelector('ytcp-uploads-dialog');
+    if (!dialog) return null;
+    const thumbnail = [...dialog.querySelectorAll('ytcp-video-info img, ytcp-video-thumbnail-with-info img')]
+        .some(img => (img.src || '').includes('ytimg.com'));
+    return {text: dialog.innerText || '', thumbnail: thumbnail};
+"""
+percentPattern = re.compile(r"(\d{1,3})\s*%")
+uploadingPattern = re.compile(r"uploading|upload paused|waiting", re.IGNORECASE)
+completePattern = re.compile(r"upload complete|processing|checks complete|video uploaded", re.IGNORECASE)
+failedPattern = re.compile(r"upload failed|couldn.t upload|error|processing abandoned", re.IGNORECASE)
+transferredPattern = re.compile(r"upload complete|checks complete|video uploaded", re.IGNORECASE)
+
+def readProgress(driver):
+    """
+    Current upload state from the progress label
+
+    Returns:
+        tuple: (state, percent, text) where state is "uploading", "complete", "failed" or None if no label is shown
+    """
+    return parseProgress(driver.execute_script(readProgressScript, progressLabelSelectors))
+
+def parseProgress(text):
+    """(state, percent, text) of a progress label's text, see readProgress"""
+    if not text:
+        return None, None, None
+    match = percentPattern.search(text)
+    percent = int(match.group(1)) if match else None
+    if failedPattern.search(text):
+        return "failed", percent, text
+    if uploadingPattern.search(text) and percent != 100:
+        return "uploading", percent, text
+    if completePattern.search(text):
+        return "complete", 100, text
+    return "uploading", percent, text
+
+def dialogShowsTransferred(dialog):
+    """True if readDialogScript's result shows the file finished transferring: a completion text or a processed thumbnail"""
+    if not dialog:
+        return False
+    return bool(dialog.get("thumbnail")) or bool(transferredPattern.search(dialog.get("text") or ""))
+
+def waitForTransfer(driver, fileSize, timeout, startedAt=None, stallSeconds=None, appearSeconds=10, pollSeconds=0.5):
+    """
+    Block until Studio reports the file fully transferred
+
+    Args:
+        driver: Selenium driver on the upload dialog
+        fileSize (int): Size of the uploaded file in bytes, for the bytes/s figure
+        timeout (float): Longest the whole transfer may take
+        startedAt (float): time.perf_counter() when the file was selected, if known
+        stallSeconds (float): Fail when the percentage hasn't moved for this long
+        appearSeconds (float): A draft reopened after the transfer shows no label, check the dialog after this
+
+    Returns:
+        float: Observed bytes per second, or None if it couldn't be measured
+    """
+    stallSeconds = uploadStallSeconds if stallSeconds is None else stallSeconds
+    watchStart = time.perf_counter()
+    deadline = watchStart + timeout
+    lastPercent = None
+    lastChange = watchStart
+    firstSeen = None
+    lastReported = -25
+
+    while True:
+        now = time.perf_counter()
+        state, percent, text = readProgress(driver)
+
+        if state is None:
+            if now - watchStart > appearSeconds:
+                if not dialogShowsTransferred(driver.execute_script(readDialogScript)):
+                    raise StepError(f"No upload progress shown after {appearSeconds}s and the dialog doesn't show the "
+                                    f"transfer finished")
+                print(info("📤 No upload progress shown, the dialog reports the transfer finished"))
+                return None
+        elif state == "failed":
+            raise StepError(f"Studio reported the upload failed: {text}")
+        elif state == "complete":
+            break
+        else:
+            if percent is not None:
+                if firstSeen is None:
+                    firstSeen = (now, percent)
+                if percent != lastPercent:
+                    lastPercent = percent
+                    lastChange = now
+                if percent >= lastReported + 25:
+                    lastReported = percent - percent % 25
+                    print(info(f"📤 Uploading... {percent}%"))
+            if now - lastChange > stallSeconds:
+                raise StepError(f"Upload stalled at {lastPercent if lastPercent is not None else '?'}% "
+                                f"for {int(now - lastChange)}s")
+
+        if now > deadline:
+            raise StepError(f"Upload not finished after {int(timeout)}s (last: {text})")
+        time.sleep(pollSeconds)
+
+    # Rate over the whole transfer when the start is known, else over the part we watched
+    end = time.perf_counter()
+    bytesPerSecond = None
+    if startedAt is not None and end > startedAt:
+        bytesPerSecond = fileSize / (end - startedAt)
+    elif firstSeen is not None and end > firstSeen[0] and firstSeen[1] < 100:
+        bytesPerSecond = fileSize * (100 - firstSeen[1]) / 100 / (end - firstSeen[0])
+
+    setAttribute("fileBytes", fileSize)
+    setAttribute("host", socket.gethostname())
+    if bytesPerSecond is not None:
+        setAttribute("bytesPerSecond", round(bytesPerSecond))
+        print(success(f"✅ Transfer complete ({bytesPerSecond / (1024 * 1024):.2f} MB/s)"))
+    else:
+        print(success("✅ Transfer complete"))
+    return bytesPerSecond
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Upload runner
+Drives the YouTube and Instagram uploads for one video, either one after
+the other or concurrently in separate tabs of the same Chrome session
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from youTubeUpload import uploadToYoutube
+from instagramUpload import uploadToInstagram
+from config import success, error, info
+from metrics import span, setOutcome
+
+platformUploaders = {
+    "youtube": uploadToYoutube,
+    "instagram": uploadToInstagram
+}
+
+def runPlatformUpload(platformName, profileName, title, caption, videoLocation, session, ownDriver, checkpoint=None, onResult=None,
+                      metadata=None):
+    uploader = platformUploaders[platformName]
+    driver = None
+    result = False
+    # Precompiled text for this platform replaces the shared title and caption
+    metadata = dict((metadata or {}).get(platformName, {}))
+    title = metadata.pop("title", title)
+    caption = metadata.pop("caption", metadata.pop("description", caption))
+    with span(f"{platformName}.upload", profile=profileName, resumedFrom=checkpoint.stage if checkpoint else None):
+        try:
+            if session and ownDriver:
+                driver = session.attachDriver()
+            result = uploader(profileName, title, caption, videoLocation, session, driver, checkpoint, **metadata)
+        except Exception as e:
+            print(error(f"❌ {platformName} upload crashed: {e}"))
+        finally:
+            if driver:
+                session.detachDriver(driver)
+        if not result:
+            setOutcome("failed")
+    
+    # Saved as soon as this platform is done, not after the slower one
+    if onResult:
+        onResult(platformName, result)
+    return result
+
+def uploadVideo(profileName, title, caption, videoLocation, session=None, concurrent=True, platforms=None,
+                checkpoints=None, onResult=None, metadata=None):
+    """
+    Upload one video to every platform (or the given ones) and merge the results
+
+    Args:
+        profileName (str): Name of the profile from config
+        title (str): Video title
+        caption (str): Description / caption text
+        videoLocation (str): Path to the video file
+        session (BrowserManager): Pooled Chrome session, or None for standalone launches
+        concurrent (bool): Drive both platforms at the same time, only with a session
+        platforms (list): Platforms to upload to, all of them by default
+        checkpoints (dict): Checkpoint per platform to save and resume progress from
+        onResult (callable): Called with (platform, result) as each platform finishes
+        metadata (dict): Compiled text per platform from metadataCompiler, overrides title and caption
+
+    Returns:
+        dict: Upload result per platform, e.g. {"youtube": True, "instagram": False}
+    """
+    startTime = time.time()
+    platforms = platforms or list(platformUploaders)
+    checkpoints = checkpoints or {}
+
+    # Standalone uploads each launch Chrome on the profile's data dir and debugging
+    # port, two at once would collide and the first to finish would close the other
+    if concurrent and session is None and len(platforms) > 1:
+        print(info("ℹ️ No shared Chrome session, uploading one platform at a time"))
+        concurrent = False
+
+    results = {}
+    if concurrent and len(platforms) > 1:
+        print(info(f"⚡ Uploading to {', '.join(platforms)} concurrently..."))
+        with ThreadPoolExecutor(max_workers=len(platforms)) as executor:
+            futures = {
+                platformName: executor.submit(
+                    runPlatformUpload, platformName, profileName, title, caption, videoLocation, session, True,
+                    checkpoints.get(platformName), onResult, metadata
+                )
+                for platformName in platforms
+            }
+            for platformName, future in futures.items():
+                results[platformName] = future.result()
+    else:
+        for platformName in platforms:
+            print(info(f"\n▶️ Attempting {platformName} upload..."))
+            results[platformName] = runPlatformUpload(
+                platformName, profileName, title, caption, videoLocation, session, False,
+                checkpoints.get(platformName), onResult, metadata
+            )
+
+    duration = time.time() - startTime
+    summary = ", ".join(f"{name}: {'✅' if ok else '❌'}" for name, ok in results.items())
+    print(success(f"🏁 Uploads finished in {int(duration // 60)}m {int(duration % 60)}s ({summary})"))
+    return results
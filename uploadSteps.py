@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Upload steps without a browser driver
+The step types, checkpoint maps, selectors and page scripts shared by the
+Selenium wizards and the DevTools orchestrator. Nothing here imports
+Selenium, so the orchestrator can run flows without loading it
+"""
+import re
+
+# Locator strategies, the values of Selenium's By.XPATH and By.CSS_SELECTOR
+byXPath = "xpath"
+byCss = "css selector"
+
+class StepError(Exception):
+    pass
+
+class Step:
+    def __init__(self, name, action, readyWhen=None, readyAfter=None, timeout=None, required=True):
+        """
+        Args:
+            name (str): Step name, also the key into config.stepTimeouts
+            action (callable): Called with the step timeout, does the DOM work
+            readyWhen (callable): Selenium condition that holds once the step has taken effect
+            readyAfter (callable): Builds the readiness condition from the action's return value
+            timeout (float): Overrides the configured timeout for this step
+            required (bool): Abort the wizard if this step fails
+        """
+        self.name = name
+        self.action = action
+        self.readyWhen = readyWhen
+        self.readyAfter = readyAfter
+        self.timeout = timeout
+        self.required = required
+
+def normalizeText(text):
+    return re.sub(r"\s+", " ", text or "").strip()
+
+# YouTube Studio
+titleSelector = "#textbox[contenteditable='true'][role='textbox']"
+descriptionSelectors = [
+    "ytcp-social-suggestions-textbox[label='Description'] #textbox[contenteditable='true']",
+    "#description-textarea #textbox[contenteditable='true']",
+    "div[aria-label*='Tell viewers about your video'][contenteditable='true']"
+]
+playlistSelectors = [
+    "ytcp-dropdown-trigger[aria-label*='Select playlists']",
+    "ytcp-dropdown-trigger[aria-label*='Select']",
+    "ytcp-text-dropdown-trigger"
+]
+showMoreLocators = [
+    (byXPath, "//ytcp-button[.//div[contains(text(), 'Show more')]]"),
+    (byCss, "ytcp-button[aria-label*='Show advanced settings']"),
+    (byCss, "#toggle-button")
+]
+entertainmentLocators = [
+    (byCss, "tp-yt-paper-item[test-id='CREATOR_VIDEO_CATEGORY_ENTERTAINMENT']"),
+    (byCss, "#text-item-3"),
+    (byXPath, "//tp-yt-paper-item[.//yt-formatted-string[text()='Entertainment']]")
+]
+
+# Studio's stepper marks the current badge; -1 when it can't be read
+activeStepScript = """
+    const badges = Array.from(document.querySelectorAll("[id^='step-badge-']"));
+    return badges.findIndex(b => b.hasAttribute('active') || b.getAttribute('state') === 'active'
+        || b.classList.contains('active') || b.getAttribute('aria-selected') === 'true');
+"""
+
+# Visible headings of the upload dialog, they change with the page; None without a dialog
+stepHeadingScript = """
+    const dialog = document.querySelector("ytcp-uploads-dialog");
+    if (!dialog) return null;
+    const headings = Array.from(dialog.querySelectorAll("h1, h2, [role='heading']"))
+        .filter(el => el.getClientRects().length > 0)
+        .map(el => (el.innerText || el.textContent || "").trim())
+        .filter(Boolean);
+    return headings.length ? headings.join(" | ") : null;
+"""
+
+# Checkpoint reached once each of these steps is over
+youtubeCheckpoints = {
+    "clickCreateAndUpload": "fileSelected",
+    "setCategoryToEntertainment": "metadataFilled",
+    "waitForTransfer": "fileTransferred",
+    "setPublicAndSave": "published"
+}
+
+# Instagram
+cropButtonLocators = [
+    (byXPath, "//div[@class='_abfz _abg1' and @role='button']"),
+    (byXPath, "//button[.//svg[@aria-label='Select crop']]"),
+    (byXPath, "//svg[@aria-label='Select crop']")
+]
+nextButtonLocators = [
+    (byXPath, "//div[@role='button' and text()='Next']"),
+    (byXPath, "//*[text()='Next']")
+]
+shareButtonLocators = [
+    (byXPath, "//div[@role='button' and text()='Share']"),
+    (byXPath, "//*[text()='Share']")
+]
+sharedConfirmationLocator = (byXPath, "//h3[contains(text(), 'Your reel has been shared')]")
+createLocator = (byXPath, "//span[contains(text(), 'Create')]")
+closeButtonLocators = [
+    (byXPath, "//div[@role='button'][.//*[local-name()='svg' and @aria-label='Close']]"),
+    (byXPath, "//*[local-name()='svg' and @aria-label='Close']")
+]
+
+# Checkpoint reached once each of these steps is over
+instagramCheckpoints = {
+    "selectFile": "fileSelected",
+    "writeCaption": "metadataFilled",
+    "shareReel": "published"
+}
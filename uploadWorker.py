@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Upload worker
+Short-lived process started by loop.py for one profile and its due
+platforms. Selenium and the uploaders are only imported once there is a
+video to upload, and a crash here never takes the scheduler down.
+
+Exit codes: 0 all uploads succeeded, 1 some failed, 2 nothing to upload, 3 crashed
+"""
+import os
+import sys
+from stateStore import StateStore, Checkpoint
+from retryQueue import UploadQueue, allPlatforms
+from mp4Probe import preflight, shortsWarnings
+from contentIndex import ContentIndex
+from metadataCompiler import MetadataCompiler
+from metrics import span
+from config import error, info, warning, concurrentUploads, batchSizes, basePath
+
+exitUploaded = 0
+exitFailed = 1
+exitIdle = 2
+exitCrashed = 3
+
+def printVideoInfo(video):
+    print("\n📹 Video Details:")
+    print(f"📁 Filename: {video.get('filename', 'N/A')}")
+    print(f"📝 Title: {video.get('title', 'N/A')}")
+    print(f"📄 Description: {video.get('description', 'N/A')}")
+    print(f"📺 Video Checked: {'✅' if video.get('videoChecked', False) else '❌'}")
+    print(f"📱 Instagram Upload: {'✅' if video.get('instagramUploaded', False) else '❌'}")
+    print(f"🎥 YouTube Upload: {'✅' if video.get('youtubeUploaded', False) else '❌'}")
+    if video.get('uploadTimestamp'):
+        print(f"⏰ Upload Time: {video['uploadTimestamp']}")
+    print("-" * 50)
+
+def prepareVideo(store, queue, index, profileName, videoIndex, platforms, results=None):
+    """
+    Checks that need no browser: file present, earlier checkpoints, duplicates and preflight
+
+    Args:
+        results (dict): Filled with {platform: result} as each platform's result is recorded,
+            so a caller still knows what was recorded if a later check raises
+
+    Returns:
+        tuple: (video, videoLocation, sha256, checkpoints, results, remaining) with the platforms
+        still to upload in remaining, or None if the file is missing
+    """
+    video = store.getVideo(profileName, videoIndex)
+    print(f"\n📼 Processing video ({videoIndex + 1}/{store.countVideos(profileName)}) on {', '.join(platforms)}:")
+    printVideoInfo(video)
+    
+    # Construct video path
+    videoLocation = os.path.join(basePath, video['filename'])
+    
+    if not os.path.exists(videoLocation):
+        print(error(f"❌ Video file not found: {videoLocation}"))
+        for platformName in platforms:
+            queue.recordResult(profileName, videoIndex, platformName, False, "video file not found")
+        return None
+    
+    # Resume from where an interrupted run stopped, a platform already published is only recorded
+    checkpoints = {name: Checkpoint(store, profileName, videoIndex, name) for name in platforms}
+    results = {} if results is None else results
+    for platformName in platforms:
+        if checkpoints[platformName].passed("published"):
+            print(info(f"⏩ {platformName} was published before the last restart, recording it"))
+            queue.recordResult(profileName, videoIndex, platformName, True)
+            results[platformName] = True
+    remaining = [name for name in platforms if name not in results]
+    
+    # The same content already uploaded or in flight from another video is not uploaded twice
+    sha256, duplicates = index.claimPlatforms(videoLocation, platforms, profileName, videoIndex)
+    for platformName in results:
+        index.finish(sha256, platformName, profileName, videoIndex, True)
+    for platformName, owner in duplicates.items():
+        if platformName in remaining:
+            queue.recordResult(profileName, videoIndex, platformName, False,
+                               f"duplicate of {owner['profile']} #{owner['position']}", final=True)
+            results[platformName] = False
+    remaining = [name for name in remaining if name not in duplicates]
+    
+    # Files a platform would reject are caught here, before any browser starts
+    probe, problems = preflight(videoLocation, remaining, store) if remaining else ({}, {})
+    for platformName, reasons in problems.items():
+        print(error(f"❌ Preflight failed for {platformName}: {'; '.join(reasons)}"))
+        # A broken or half-synced file may still be fixed, a rule violation never is
+        queue.recordResult(profileName, videoIndex, platformName, False, f"preflight: {'; '.join(reasons)}",
+                           final="error" not in probe)
+        index.finish(sha256, platformName, profileName, videoIndex, False)
+        results[platformName] = False
+    remaining = [name for name in remaining if name not in problems]
+    for platformName, reasons in shortsWarnings(probe, remaining).items():
+        print(warning(f"⚠️ {platformName} will show this as a regular video, not a Short: {'; '.join(reasons)}"))
+    return video, videoLocation, sha256, checkpoints, results, remaining
+
+def recordCrash(queue, index, profileName, videoIndex, platforms, e):
+    """Record an exception raised for one video as a failed attempt, so it backs off instead of being claimed again"""
+    print(error(f"❌ Video #{videoIndex + 1} failed: {e}"))
+    for platformName in platforms:
+        try:
+            queue.recordResult(profileName, videoIndex, platformName, False, str(e))
+            index.release(platformName, profileName, videoIndex)
+        except Exception as saveError:
+            print(error(f"❌ Failed to save changes: {saveError}"))
+
+def processVideo(store, queue, profileName, videoIndex, platforms, pool=None):
+    index = ContentIndex(store)
+    results = {}
+    try:
+        prepared = prepareVideo(store, queue, index, profileName, videoIndex, platforms, results)
+        if prepared is None:
+            return False
+        return uploadPrepared(store, queue, index, profileName, videoIndex, prepared, pool)
+    except Exception as e:
+        recordCrash(queue, index, profileName, videoIndex, [name for name in platforms if name not in results], e)
+        return False
+
+def uploadPrepared(store, queue, index, profileName, videoIndex, prepared, pool=None):
+    video, videoLocation, sha256, checkpoints, results, remaining = prepared
+    
+    # Each platform's result is saved the moment it finishes, failures go back on the queue with a backoff
+    def onResult(platformName, result):
+        results[platformName] = result
+        try:
+            queue.recordResult(profileName, videoIndex, platformName, result)
+            index.finish(sha256, platformName, profileName, videoIndex, result)
+        except Exception as e:
+            print(f"❌ Failed to save changes: {e}")
+    
+    if remaining:
+        from uploadRunner import uploadVideo
+        
+        # Both platforms share one Chrome session for this profile
+        session = pool.acquire(profileName) if pool else None
+        try:
+            results.update(uploadVideo(
+                profileName, video['title'], video['description'], videoLocation, session, concurrentUploads,
+                remaining, checkpoints, onResult, MetadataCompiler(store).forVideo(profileName, videoIndex, video)
+            ))
+        finally:
+            if pool:
+                pool.release(profileName)
+    video = store.getVideo(profileName, videoIndex)
+    
+    # Show updated status
+    print("\n📊 Upload Results:")
+    printVideoInfo(video)
+    print("✅ Status updated in profile!")
+    return all(results.values())
+
+def batchItem(store, profileName, platformName, videoIndex, video, videoLocation):
+    metadata = MetadataCompiler(store).forVideo(profileName, videoIndex, video)
+    if platformName == "youtube":
+        text = metadata["youtube"]
+        return text["title"], text["description"], videoLocation, text["tags"]
+    return video['title'], metadata["instagram"]["caption"], videoLocation
+
+def batchUploader(platformName):
+    # Imported on use like uploadVideo, so an idle run never loads Selenium
+    if platformName == "youtube":
+        from youTubeUpload import uploadBatchToYoutube
+        return uploadBatchToYoutube
+    from instagramUpload import uploadReelsToInstagram
+    return uploadReelsToInstagram
+
+def processBatch(store, queue, profileName, platformName, positions, pool=None):
+    """Upload several videos to one platform in a single browser session"""
+    index = ContentIndex(store)
+    batch = []
+    results = []
+    for videoIndex in positions:
+        earlier = {}
+        try:
+            prepared = prepareVideo(store, queue, index, profileName, videoIndex, [platformName], earlier)
+            if prepared is None:
+                results.append(False)
+                continue
+            video, videoLocation, sha256, checkpoints, earlier, remaining = prepared
+            # An interrupted YouTube upload is finished from its draft, which the batch dialog can't do
+            if not remaining or (platformName == "youtube" and checkpoints[platformName].stage):
+                results.append(uploadPrepared(store, queue, index, profileName, videoIndex, prepared, pool))
+                continue
+            batch.append((videoIndex, prepared))
+        except Exception as e:
+            if platformName not in earlier:
+                recordCrash(queue, index, profileName, videoIndex, [platformName], e)
+            results.append(False)
+    
+    if len(batch) == 1:
+        videoIndex, prepared = batch[0]
+        try:
+            results.append(uploadPrepared(store, queue, index, profileName, videoIndex, prepared, pool))
+        except Exception as e:
+            if platformName not in prepared[4]:
+                recordCrash(queue, index, profileName, videoIndex, [platformName], e)
+            results.append(False)
+    elif batch:
+        uploadBatch = batchUploader(platformName)
+        reported = set()
+        
+        def onResult(itemIndex, result):
+            videoIndex, (_, _, sha256, _, _, _) = batch[itemIndex]
+            reported.add(itemIndex)
+            try:
+                queue.recordResult(profileName, videoIndex, platformName, result)
+                index.finish(sha256, platformName, profileName, videoIndex, result)
+            except Exception as e:
+                print(f"❌ Failed to save changes: {e}")
+        
+        session = pool.acquire(profileName) if pool else None
+        try:
+            results.extend(uploadBatch(
+                profileName,
+                [batchItem(store, profileName, platformName, videoIndex, video, videoLocation)
+                 for videoIndex, (video, videoLocation, *_) in batch],
+                session, checkpoints=[checkpoints[platformName] for _, (_, _, _, checkpoints, _, _) in batch],
+                onResult=onResult
+            ))
+        except Exception as e:
+            # Items the batch never got to report are failed attempts of their own videos
+            for itemIndex, (videoIndex, _) in enumerate(batch):
+                if itemIndex not in reported:
+                    recordCrash(queue, index, profileName, videoIndex, [platformName], e)
+            results.append(False)
+        finally:
+            if pool:
+                pool.release(profileName)
+        print("\n📊 Batch Results:")
+        for videoIndex, _ in batch:
+            printVideoInfo(store.getVideo(profileName, videoIndex))
+    return all(results)
+
+class LazySessionPool:
+    """SessionPool created on the first acquire, so a run with nothing to upload never loads Selenium"""
+    def __init__(self):
+        self.pool = None
+
+    def acquire(self, profileName):
+        if self.pool is None:
+            from sessionPool import SessionPool
+            self.pool = SessionPool()
+        return self.pool.acquire(profileName)
+
+    def release(self, profileName):
+        if self.pool:
+            self.pool.release(profileName)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        if self.pool:
+            self.pool.closeAll()
+
+def processProfile(store, profileName, pool=None, platforms=None):
+    platforms = platforms or list(allPlatforms)
+    queue = UploadQueue(store)
+    
+    # Platforms with batching on drain several videos in one browser session
+    batches = {}
+    for platformName in [name for name in platforms if batchSizes.get(name, 1) > 1]:
+        limit = min(batchSizes[platformName], 15) if platformName == "youtube" else batchSizes[platformName]
+        positions = queue.claimBatch(profileName, platformName, limit)
+        if positions:
+            batches[platformName] = positions
+        platforms = [name for name in platforms if name != platformName]
+    
+    # Each platform takes its next due retry or fresh video, platforms on the same video upload together
+    claimed = queue.claim(profileName, platforms) if platforms else {}
+    if not claimed and not batches:
+        return None
+    
+    results = [
+        processVideo(store, queue, profileName, videoIndex, videoPlatforms, pool)
+        for videoIndex, videoPlatforms in claimed.items()
+    ]
+    for platformName, positions in batches.items():
+        results.append(processBatch(store, queue, profileName, platformName, positions, pool))
+    return all(results)
+
+def main():
+    if len(sys.argv) < 2:
+        print(info("python uploadWorker.py <profile> [platform...]"))
+        sys.exit(exitCrashed)
+    
+    profileName = sys.argv[1]
+    platforms = sys.argv[2:] or list(allPlatforms)
+    store = StateStore()
+    
+    try:
+        with span("worker", profile=profileName), LazySessionPool() as pool:
+            result = processProfile(store, profileName, pool, platforms)
+    except Exception as e:
+        print(error(f"❌ Worker for {profileName} crashed: {e}"))
+        sys.exit(exitCrashed)
+    
+    if result is None:
+        sys.exit(exitIdle)
+    sys.exit(exitUploaded if result else exitFailed)
+
+if __name__ == "__main__":
+    main()
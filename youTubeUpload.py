@@ -2,381 +2,297 @@
 import os
 import time
 from selenium.webdriver.common.by import By
+from selenium.common.exceptions import StaleElementReferenceException
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.common.action_chains import ActionChains
-from config import success, error, info, warning, highlight, profiles
+from config import success, error, info, warning, highlight, profiles, youtubeStudioUrl, stepTimeouts
 from browserUtils import BrowserManager, setupLogging
+from selectorRegistry import registry
+from textEntry import enterText, readField
+from fileInput import selectFiles
+from uploadProgress import waitForTransfer
+from metrics import span, setOutcome
+from stepEngine import Wizard, clickable, present, gone, anyOf, clickWhenReady, findWhenReady
+from uploadSteps import (Step, StepError, titleSelector, descriptionSelectors, playlistSelectors, showMoreLocators,
+                         entertainmentLocators, activeStepScript, stepHeadingScript, youtubeCheckpoints)
 
-if os.name == "nt":
-    import pyautogui
-
-def fillTitleAndDescription(driver, title, description):
+def fillTitleAndDescription(driver, title, description, timeout=15, profileName=None):
+    print(info("📝 Setting title and description..."))
+    
+    titleField = findWhenReady(driver, (By.CSS_SELECTOR, titleSelector), timeout)
+    if not enterText(driver, titleField, title, chunkSize=20):
+        raise StepError("Title not accepted by the editor")
+    
+    print(success("✅ Title set"))
+    
     try:
-        print(info("📝 Setting title and description..."))
-        
-        titleField = WebDriverWait(driver, 15).until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, "#textbox[contenteditable='true'][role='textbox']"))
+        descriptionField, _ = registry.find(
+            driver, "youtube.description", [(By.CSS_SELECTOR, selector) for selector in descriptionSelectors],
+            5, profileName
         )
-        
-        titleField.click()
-        time.sleep(0.5)
-        
-        try:
-            titleField.send_keys(Keys.CONTROL + "a")
-            titleField.send_keys(Keys.DELETE)
-        except AttributeError:
-            try:
-                actions = ActionChains(driver)
-                actions.key_down(Keys.CONTROL).send_keys("a").key_up(Keys.CONTROL).perform()
-                titleField.send_keys(Keys.DELETE)
-            except:
-                driver.execute_script("arguments[0].innerText = ''", titleField)
-        
-        time.sleep(0.5)
-        
-        try:
-            chunkSize = 20
-            for i in range(0, len(title), chunkSize):
-                chunk = title[i:i+chunkSize]
-                titleField.send_keys(chunk)
-                time.sleep(0.3)
-        except Exception:
-            try:
-                driver.execute_script("arguments[0].innerText = arguments[1]", titleField, title)
-            except Exception:
-                titleField.send_keys(title)
-        
-        print(success("✅ Title set"))
-        
-        descriptionSelectors = [
-            "ytcp-social-suggestions-textbox[label='Description'] #textbox[contenteditable='true']",
-            "#description-textarea #textbox[contenteditable='true']",
-            "div[aria-label*='Tell viewers about your video'][contenteditable='true']"
-        ]
-        
+    except Exception:
         descriptionField = None
-        for selector in descriptionSelectors:
-            try:
-                descriptionField = WebDriverWait(driver, 5).until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
-                )
-                break
-            except:
-                continue
-        
-        if descriptionField:
-            descriptionField.click()
-            time.sleep(0.5)
-            
-            try:
-                descriptionField.send_keys(Keys.CONTROL + "a")
-                descriptionField.send_keys(Keys.DELETE)
-            except AttributeError:
-                try:
-                    actions = ActionChains(driver)
-                    actions.key_down(Keys.CONTROL).send_keys("a").key_up(Keys.CONTROL).perform()
-                    descriptionField.send_keys(Keys.DELETE)
-                except:
-                    driver.execute_script("arguments[0].innerText = ''", descriptionField)
-            
-            time.sleep(0.5)
-            
-            try:
-                chunkSize = 50
-                for i in range(0, len(description), chunkSize):
-                    chunk = description[i:i+chunkSize]
-                    descriptionField.send_keys(chunk)
-                    time.sleep(0.5)
-                print(success("✅ Description set"))
-            except Exception:
-                try:
-                    descriptionField = WebDriverWait(driver, 5).until(
-                        EC.element_to_be_clickable((By.XPATH, "//div[@contenteditable='true' and @aria-label]"))
-                    )
-                    descriptionField.click()
-                    time.sleep(0.5)
-                    
-                    chunkSize = 50
-                    for i in range(0, len(description), chunkSize):
-                        chunk = description[i:i+chunkSize]
-                        descriptionField.send_keys(chunk)
-                        time.sleep(0.5)
-                    print(success("✅ Description set"))
-                except Exception:
-                    try:
-                        driver.execute_script("arguments[0].innerText = arguments[1]", descriptionField, description)
-                        print(success("✅ Description set"))
-                    except Exception:
-                        try:
-                            driver.execute_script("arguments[0].innerText = ''", descriptionField)
-                            chunkSize = 50
-                            for i in range(0, len(description), chunkSize):
-                                chunk = description[i:i+chunkSize]
-                                current = driver.execute_script("return arguments[0].innerText", descriptionField)
-                                driver.execute_script("arguments[0].innerText = arguments[1]", descriptionField, current + chunk)
-                                time.sleep(0.5)
-                            print(success("✅ Description set"))
-                        except Exception:
-                            print(warning("⚠️ Description not set"))
-        else:
-            print(warning("⚠️ Description field not found"))
-        
-    except Exception as e:
-        print(error(f"❌ Title/Description error: {e}"))
+    
+    if not descriptionField:
+        print(warning("⚠️ Description field not found"))
+        return
+    
+    if enterText(driver, descriptionField, description, chunkSize=50):
+        print(success("✅ Description set"))
+    else:
+        print(warning("⚠️ Description not set"))
 
-def selectFirstPlaylist(driver):
+def selectFirstPlaylist(driver, timeout=10, profileName=None):
+    print(info("📁 Selecting playlist..."))
+    
     try:
-        print(info("📁 Selecting playlist..."))
-        
-        playlistSelectors = [
-            "ytcp-dropdown-trigger[aria-label*='Select playlists']",
-            "ytcp-dropdown-trigger[aria-label*='Select']",
-            "ytcp-text-dropdown-trigger"
-        ]
-        
-        playlistDropdown = None
-        for selector in playlistSelectors:
-            try:
-                playlistDropdown = WebDriverWait(driver, 5).until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
-                )
-                break
-            except:
-                continue
-        
-        if playlistDropdown:
-            playlistDropdown.click()
-            time.sleep(2)
-            
-            try:
-                WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "tp-yt-paper-dialog[aria-label='Choose playlists']"))
-                )
-                
-                firstCheckbox = WebDriverWait(driver, 10).until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, "#checkbox-0, ytcp-checkbox-lit[id='checkbox-0']"))
-                )
-                firstCheckbox.click()
-                
-                doneButton = WebDriverWait(driver, 10).until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, "ytcp-button.done-button"))
-                )
-                doneButton.click()
-                print(success("✅ Playlist selected"))
-                
-            except Exception:
-                print(warning("⚠️ Playlist selection failed"))
-                try:
-                    closeButton = driver.find_element(By.CSS_SELECTOR, "ytcp-button.done-button")
-                    closeButton.click()
-                except:
-                    pass
-        
-    except Exception as e:
-        print(error(f"❌ Playlist error: {e}"))
-
-def setNotMadeForKids(driver):
+        playlistDropdown, _ = registry.find(
+            driver, "youtube.playlist", [(By.CSS_SELECTOR, selector) for selector in playlistSelectors],
+            5, profileName
+        )
+    except Exception:
+        raise StepError("Playlist dropdown not found")
+    
+    playlistDropdown.click()
+    
     try:
-        print(info("👶 Setting audience..."))
-        
-        notForKidsRadio = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, "tp-yt-paper-radio-button[name='VIDEO_MADE_FOR_KIDS_NOT_MFK']"))
+        WebDriverWait(driver, timeout).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "tp-yt-paper-dialog[aria-label='Choose playlists']"))
         )
-        notForKidsRadio.click()
-        print(success("✅ Set as not for kids"))
+        clickWhenReady(driver, (By.CSS_SELECTOR, "#checkbox-0, ytcp-checkbox-lit[id='checkbox-0']"), timeout)
+        clickWhenReady(driver, (By.CSS_SELECTOR, "ytcp-button.done-button"), timeout)
+        print(success("✅ Playlist selected"))
         
-    except Exception as e:
-        print(error(f"❌ Audience error: {e}"))
+    except Exception:
+        try:
+            closeButton = driver.find_element(By.CSS_SELECTOR, "ytcp-button.done-button")
+            closeButton.click()
+        except:
+            pass
+        raise StepError("Playlist selection failed")
 
-def expandAdvancedOptions(driver):
-    try:
-        print(info("🔽 Expanding options..."))
-        
-        showMoreSelectors = [
-            "ytcp-button[aria-label*='Show advanced settings']",
-            "#toggle-button"
-        ]
-        
-        showMoreButton = None
-        for selector in showMoreSelectors:
-            try:
-                if selector == "#toggle-button":
-                    showMoreButton = WebDriverWait(driver, 3).until(
-                        EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
-                    )
-                else:
-                    xpathSelector = "//ytcp-button[.//div[contains(text(), 'Show more')]]"
-                    showMoreButton = WebDriverWait(driver, 3).until(
-                        EC.element_to_be_clickable((By.XPATH, xpathSelector))
-                    )
-                break
-            except:
-                continue
-        
-        if showMoreButton:
-            showMoreButton.click()
-            time.sleep(2)
-            print(success("✅ Options expanded"))
-        
-    except Exception as e:
-        print(error(f"❌ Options error: {e}"))
+def setNotMadeForKids(driver, timeout=10):
+    print(info("👶 Setting audience..."))
+    clickWhenReady(driver, (By.CSS_SELECTOR, "tp-yt-paper-radio-button[name='VIDEO_MADE_FOR_KIDS_NOT_MFK']"), timeout)
+    print(success("✅ Set as not for kids"))
 
-def addTags(driver, tags):
+def expandAdvancedOptions(driver, timeout=10, profileName=None):
+    print(info("🔽 Expanding options..."))
+    
     try:
-        print(info("🏷️ Adding tags..."))
-        
-        tagsInput = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, "#text-input[aria-label='Tags']"))
-        )
-        tagsInput.click()
-        time.sleep(0.5)
-        
+        showMoreButton, _ = registry.find(driver, "youtube.showMore", showMoreLocators, 3, profileName)
+    except Exception:
+        raise StepError("Show more button not found")
+    
+    showMoreButton.click()
+    print(success("✅ Options expanded"))
+
+def addTags(driver, tags, timeout=10):
+    print(info("🏷️ Adding tags..."))
+    
+    tagsInput = findWhenReady(driver, (By.CSS_SELECTOR, "#text-input[aria-label='Tags']"), timeout)
+    if enterText(driver, tagsInput, tags, clear=False, verify=tagsAccepted, chunkSize=30):
+        print(success("✅ Tags added"))
+    else:
+        print(warning("⚠️ Tags may be incomplete"))
+
+def tagsAccepted(driver, tagsInput, tags):
+    # Studio turns comma separated text into chips, so the input may already be empty
+    if readField(driver, tagsInput).replace(" ", "") == tags.replace(" ", ""):
+        return True
+    chips = driver.find_elements(By.CSS_SELECTOR, "ytcp-chip-bar ytcp-chip, #chip-bar ytcp-chip")
+    return len(chips) >= len([tag for tag in tags.split(",") if tag.strip()])
+
+def setCategoryToEntertainment(driver, timeout=10, profileName=None):
+    print(info("🎭 Setting category..."))
+    
+    clickWhenReady(driver, (By.CSS_SELECTOR, "#category ytcp-dropdown-trigger"), timeout)
+    
+    entertainmentOption, _ = registry.find(driver, "youtube.category", entertainmentLocators, 5, profileName)
+    entertainmentOption.click()
+    print(success("✅ Category set to Entertainment"))
+
+def getActiveStepIndex(driver):
+    return driver.execute_script(activeStepScript)
+
+def getStepHeading(driver):
+    return driver.execute_script(stepHeadingScript)
+
+def stepperAdvanced(previousIndex, previousHeading, nextButton):
+    # The button is still enabled right after the click, so without a readable
+    # stepper it has to go away or turn busy first, or the heading has to change
+    sawBusy = False
+
+    def condition(driver):
+        nonlocal sawBusy
         try:
-            chunkSize = 30
-            for i in range(0, len(tags), chunkSize):
-                chunk = tags[i:i+chunkSize]
-                tagsInput.send_keys(chunk)
-                time.sleep(0.3)
-            print(success("✅ Tags added"))
-        except Exception:
+            currentIndex = getActiveStepIndex(driver)
+            if previousIndex >= 0 and currentIndex >= 0:
+                return currentIndex > previousIndex
+            heading = getStepHeading(driver)
+            if previousHeading is not None and heading is not None and heading != previousHeading:
+                return True
             try:
-                driver.execute_script("arguments[0].value = arguments[1]", tagsInput, tags)
-                print(success("✅ Tags added"))
-            except Exception:
-                tagsInput.send_keys(tags)
-                print(success("✅ Tags added"))
-        
-    except Exception as e:
-        print(error(f"❌ Tags error: {e}"))
+                usable = nextButton.is_enabled() and nextButton.get_attribute("aria-disabled") != "true"
+            except StaleElementReferenceException:
+                return True
+            if not usable:
+                sawBusy = True
+                return False
+            return sawBusy
+        except Exception:
+            return False
+    return condition
 
-def setCategoryToEntertainment(driver):
-    try:
-        print(info("🎭 Setting category..."))
-        
-        categoryDropdown = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, "#category ytcp-dropdown-trigger"))
-        )
-        categoryDropdown.click()
-        time.sleep(2)
-        
-        entertainmentSelectors = [
-            "tp-yt-paper-item[test-id='CREATOR_VIDEO_CATEGORY_ENTERTAINMENT']",
-            "#text-item-3"
-        ]
-        
-        entertainmentOption = None
-        for selector in entertainmentSelectors:
-            try:
-                entertainmentOption = WebDriverWait(driver, 5).until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
-                )
-                break
-            except:
-                continue
-        
-        if not entertainmentOption:
-            xpathSelector = "//tp-yt-paper-item[.//yt-formatted-string[text()='Entertainment']]"
-            entertainmentOption = WebDriverWait(driver, 5).until(
-                EC.element_to_be_clickable((By.XPATH, xpathSelector))
-            )
-        
-        entertainmentOption.click()
-        print(success("✅ Category set to Entertainment"))
-        
-    except Exception as e:
-        print(error(f"❌ Category error: {e}"))
+def clickNextButton(driver, timeout=10):
+    print(info("➡️ Next step..."))
+    
+    nextButton = findWhenReady(driver, (By.CSS_SELECTOR, "#next-button"), timeout)
+    previousIndex = getActiveStepIndex(driver)
+    previousHeading = getStepHeading(driver)
+    nextButton.click()
+    print(success("✅ Proceeded"))
+    return previousIndex, previousHeading, nextButton
 
-def clickNextButton(driver):
-    try:
-        print(info("➡️ Next step..."))
-        
-        nextButton = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, "#next-button"))
-        )
-        nextButton.click()
-        time.sleep(3)
-        print(success("✅ Proceeded"))
-        
-    except Exception as e:
-        print(error(f"❌ Next button error: {e}"))
+def setPublicAndSave(driver, timeout=10):
+    print(info("🌍 Publishing..."))
+    
+    publicLocator = (By.CSS_SELECTOR, "tp-yt-paper-radio-button[name='PUBLIC']")
+    publicRadio = clickWhenReady(driver, publicLocator, timeout)
+    WebDriverWait(driver, timeout, poll_frequency=0.2).until(
+        lambda d: publicRadio.get_attribute("aria-checked") == "true" or publicRadio.get_attribute("checked") is not None
+    )
+    
+    clickWhenReady(driver, (By.CSS_SELECTOR, "#done-button"), timeout)
+    print(success("✅ Video published"))
+    return True
 
-def setPublicAndSave(driver):
-    try:
-        print(info("🌍 Publishing..."))
-        
-        publicRadio = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, "tp-yt-paper-radio-button[name='PUBLIC']"))
-        )
-        publicRadio.click()
-        time.sleep(2)
-        
-        saveButton = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, "#done-button"))
-        )
-        saveButton.click()
-        print(success("✅ Video published"))
-        return True
-        
-    except Exception as e:
-        print(error(f"❌ Publishing error: {e}"))
-        return False
+def publishConfirmed():
+    return anyOf(
+        present((By.CSS_SELECTOR, "ytcp-video-share-dialog")),
+        present((By.CSS_SELECTOR, "ytcp-uploads-still-processing-dialog")),
+        gone((By.CSS_SELECTOR, "ytcp-uploads-dialog"))
+    )
+
+def clickCreateAndUpload(driver, videoLocation, timeout=20):
+    clickWhenReady(driver, (By.CSS_SELECTOR, "ytcp-button#create-icon"), timeout)
+    clickWhenReady(driver, (By.CSS_SELECTOR, "tp-yt-paper-item[test-id='upload-beta']"), timeout)
+    
+    print(info(f"📁 Uploading {os.path.basename(videoLocation)}..."))
+    
+    selectFiles(driver, videoLocation, timeout)
+    print(success(f"✅ File selected: {os.path.basename(videoLocation)}"))
+    # The transfer runs in the background from here while the details are filled in
+    return time.perf_counter()
+
+batchRowLocator = "//ytcp-uploads-dialog//*[contains(@class, 'upload-row')][.//*[normalize-space() = {name}]]"
+batchEditPaths = [
+    "ytcp-button[contains(@class, 'edit-button')]",
+    "ytcp-icon-button[contains(@aria-label, 'Edit')]",
+    "*[@id='edit-draft-button']"
+]
 
-def handleFileUpload(driver, videoPath):
+def draftTitleXPath(videoLocation):
+    # Studio titles a new draft after the file name without its extension, quoted here for XPath
+    name = os.path.splitext(os.path.basename(videoLocation))[0]
+    if "'" not in name:
+        return f"'{name}'"
+    return "concat('" + "', \"'\", '".join(name.split("'")) + "')"
+
+def clickCreateAndUploadBatch(driver, videoLocations, timeout=30):
+    """Select several files in one upload dialog, Studio transfers them all in the background"""
+    clickWhenReady(driver, (By.CSS_SELECTOR, "ytcp-button#create-icon"), timeout)
+    clickWhenReady(driver, (By.CSS_SELECTOR, "tp-yt-paper-item[test-id='upload-beta']"), timeout)
+    
+    print(info(f"📁 Uploading {len(videoLocations)} files in one batch..."))
+    
+    selectFiles(driver, videoLocations, timeout)
+    startedAt = time.perf_counter()
+    WebDriverWait(driver, timeout, poll_frequency=0.2).until(
+        present((By.XPATH, batchRowLocator.format(name=draftTitleXPath(videoLocations[0]))))
+    )
+    print(success(f"✅ {len(videoLocations)} files selected"))
+    return startedAt
+
+def openBatchItem(driver, videoLocation, timeout=20, profileName=None):
+    """Open the metadata editor of one file from the batch upload list"""
+    rowLocator = (By.XPATH, batchRowLocator.format(name=draftTitleXPath(videoLocation)))
+    WebDriverWait(driver, timeout).until(EC.presence_of_element_located(rowLocator))
+    editButton, _ = registry.find(
+        driver, "youtube.batchEdit",
+        [(By.XPATH, f"{rowLocator[1]}//{path}") for path in batchEditPaths],
+        timeout, profileName
+    )
+    driver.execute_script("arguments[0].click();", editButton)
+    WebDriverWait(driver, timeout, poll_frequency=0.2).until(present((By.CSS_SELECTOR, "ytcp-video-metadata-editor")))
+
+def batchItemPublished(videoLocation):
+    # Back on the upload list with this file's editor closed
+    rowLocator = (By.XPATH, batchRowLocator.format(name=draftTitleXPath(videoLocation)))
+    return anyOf(
+        publishConfirmed(),
+        lambda driver: bool(driver.find_elements(*rowLocator))
+        and not driver.find_elements(By.CSS_SELECTOR, "ytcp-video-metadata-editor")
+    )
+
+def closeBatchEditor(driver, timeout=5):
+    """Go back to the upload list from a failed item's editor so the rest of the batch can go on, its draft stays in Studio"""
     try:
-        pyautogui.typewrite(videoPath, interval=0.05)
-        time.sleep(0.5)
-        pyautogui.press('enter')
-        print(success("✅ File selected"))
+        clickWhenReady(driver, (By.CSS_SELECTOR, "ytcp-uploads-dialog #back-button"), timeout)
+        WebDriverWait(driver, timeout, poll_frequency=0.2).until(gone((By.CSS_SELECTOR, "ytcp-video-metadata-editor")))
     except Exception as e:
-        print(error(f"❌ File upload error: {e}"))
-        raise
+        print(warning(f"⚠️ Could not close the editor: {e}"))
 
-def clickCreateAndUpload(driver, videoLocation):
+def captureVideoId(driver, timeout=10):
+    # Studio shows the video link as soon as the file is handed over, the ID is needed to reopen the draft
     try:
-        createButton = WebDriverWait(driver, 20).until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, "ytcp-button#create-icon"))
-        )
-        createButton.click()
-        
-        uploadOption = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, "tp-yt-paper-item[test-id='upload-beta']"))
+        link = WebDriverWait(driver, timeout).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, ".video-url-fadeable a, ytcp-video-info a"))
         )
-        uploadOption.click()
-        
-        if videoLocation:
-            print(info(f"📁 Uploading {os.path.basename(videoLocation)}..."))
-            
-            if os.name == "nt":
-                selectFilesButton = WebDriverWait(driver, 10).until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, "#select-files-button"))
-                )
-                selectFilesButton.click()
-                time.sleep(2)
-                handleFileUpload(driver, videoLocation)
-            else:
-                time.sleep(2)
-                try:
-                    uploadInput = WebDriverWait(driver, 10).until(
-                        EC.presence_of_element_located((By.XPATH, "//input[@type='file']"))
-                    )
-                    uploadInput.send_keys(videoLocation)
-                    print(success(f"✅ File selected: {os.path.basename(videoLocation)}"))
-                except Exception as e:
-                    print(error(f"❌ Upload error: {e}"))
-                    raise
-            
-            WebDriverWait(driver, 30).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "ytcp-video-metadata-editor"))
-            )
-            print(success("✅ Upload started"))
-        
-    except Exception as e:
-        print(error(f"❌ Upload initiation error: {e}"))
+        href = link.get_attribute("href") or ""
+        return href.rstrip("/").split("/")[-1] or None
+    except Exception:
+        return None
 
-def uploadToYoutube(profileName, word, caption, videoLocation):
+def openDraft(driver, channelId, videoId, timeout=20):
+    """Reopen the upload dialog of an unfinished upload from the Studio content list"""
+    driver.get(f"{youtubeStudioUrl}/channel/{channelId}/videos/upload")
+    row = WebDriverWait(driver, timeout).until(EC.presence_of_element_located(
+        (By.XPATH, f"//ytcp-video-row[.//a[contains(@href, '{videoId}')]]")
+    ))
+    editDraft = row.find_element(By.CSS_SELECTOR, "#edit-draft-button")
+    driver.execute_script("arguments[0].click();", editDraft)
+    WebDriverWait(driver, timeout, poll_frequency=0.2).until(present((By.CSS_SELECTOR, "ytcp-video-metadata-editor")))
+
+def buildYoutubeWizard(driver, title, description, videoLocation, tags, profileName=None, onCheckpoint=None,
+                       startedAt=None, publishedWhen=None):
+    transfer = {"startedAt": startedAt}
+    return Wizard(driver, "youtube", [
+        Step("clickCreateAndUpload",
+             lambda t: transfer.update(startedAt=clickCreateAndUpload(driver, videoLocation, t)),
+             readyWhen=present((By.CSS_SELECTOR, "ytcp-video-metadata-editor"))),
+        Step("fillTitleAndDescription", lambda t: fillTitleAndDescription(driver, title, description, t, profileName)),
+        Step("selectFirstPlaylist", lambda t: selectFirstPlaylist(driver, t, profileName), required=False),
+        Step("setNotMadeForKids", lambda t: setNotMadeForKids(driver, t), required=False),
+        Step("expandAdvancedOptions", lambda t: expandAdvancedOptions(driver, t, profileName),
+             readyWhen=present((By.CSS_SELECTOR, "#text-input[aria-label='Tags']")), required=False),
+        Step("addTags", lambda t: addTags(driver, tags, t), required=False),
+        Step("setCategoryToEntertainment", lambda t: setCategoryToEntertainment(driver, t, profileName), required=False),
+        Step("nextToVideoElements", lambda t: clickNextButton(driver, t), readyAfter=lambda r: stepperAdvanced(*r)),
+        Step("nextToChecks", lambda t: clickNextButton(driver, t), readyAfter=lambda r: stepperAdvanced(*r)),
+        Step("nextToVisibility", lambda t: clickNextButton(driver, t),
+             readyWhen=clickable((By.CSS_SELECTOR, "tp-yt-paper-radio-button[name='PUBLIC']"))),
+        # Publishing and closing the tab before this would cut the transfer off
+        Step("waitForTransfer", lambda t: waitForTransfer(
+            driver, os.path.getsize(videoLocation), t, transfer.get("startedAt")
+        )),
+        Step("setPublicAndSave", lambda t: setPublicAndSave(driver, t), readyWhen=publishedWhen or publishConfirmed())
+    ], youtubeCheckpoints, onCheckpoint)
+
+def uploadToYoutube(profileName, word, caption, videoLocation, session=None, driver=None, checkpoint=None, tags=None):
     startTime = time.time()
+    browser = None
+    tabHandle = None
     
     try:
         print(highlight(f"\n=== YouTube Upload: {word.upper()} ==="))
@@ -384,39 +300,51 @@ def uploadToYoutube(profileName, word, caption, videoLocation):
         logger.info(f"Starting upload for: {word}")
         logger.info(f"Caption: {caption}")
         
-        # Get tags from config based on profile
-        tags = profiles[profileName]["tags"]
+        # Compiled tags when given, else the profile's from config
+        tags = tags or profiles[profileName]["tags"]
         logger.info(f"Using tags: {tags}")
         
-        browser = BrowserManager(profiles, profileName)
-        url = f'https://studio.youtube.com/channel/{profiles[profileName]["youtubeChannelId"]}'
+        if checkpoint and checkpoint.passed("published"):
+            print(success("✅ Already published before the last restart"))
+            return True
         
-        if not browser.startBrowser(url):
-            return False
+        channelId = profiles[profileName]["youtubeChannelId"]
+        url = f'{youtubeStudioUrl}/channel/{channelId}'
         
-        driver = browser.driver
+        if session:
+            driver = driver or session.driver
+            tabHandle = session.openTab(url, driver)
+        else:
+            browser = BrowserManager(profiles, profileName)
+            if not browser.startBrowser(url):
+                return False
+            driver = browser.driver
         
         print(success(f"✅ Connected to Chrome ({os.name})"))
         
-        clickCreateAndUpload(driver, videoLocation)
-        
         print(info("📋 Configuring video..."))
-        fillTitleAndDescription(driver, word, caption)
-        selectFirstPlaylist(driver)
-        setNotMadeForKids(driver)
-        expandAdvancedOptions(driver)
-        addTags(driver, tags)
-        setCategoryToEntertainment(driver)
+        def onCheckpoint(stage):
+            if checkpoint:
+                videoId = captureVideoId(driver) if stage == "fileSelected" else None
+                checkpoint.reached(stage, videoId=videoId)
         
-        print(info("🔄 Processing..."))
-        clickNextButton(driver)
-        clickNextButton(driver)
-        clickNextButton(driver)
+        wizard = buildYoutubeWizard(driver, word, caption, videoLocation, tags, profileName, onCheckpoint)
         
-        time.sleep(3)
+        # A draft left by an interrupted run is finished instead of uploading the file again
+        resumeAfter = None
+        videoId = checkpoint.detail.get("videoId") if checkpoint else None
+        if videoId:
+            try:
+                openDraft(driver, channelId, videoId)
+                # The reopened draft shows the details page, past metadata only the transfer is left to check
+                resumeAfter = wizard.resumeStep("metadataFilled" if checkpoint.passed("metadataFilled") else checkpoint.stage)
+                print(info(f"⏩ Resuming draft {videoId} after {checkpoint.stage}"))
+                logger.info(f"Resuming draft {videoId} after {checkpoint.stage}")
+            except Exception as e:
+                print(warning(f"⚠️ Draft {videoId} could not be reopened, uploading again: {e}"))
+                driver.get(url)
         
-        uploadSuccess = setPublicAndSave(driver)
-        time.sleep(10)
+        uploadSuccess = wizard.run(resumeAfter)
         
         print(info("="*50))
         if uploadSuccess:
@@ -444,7 +372,119 @@ def uploadToYoutube(profileName, word, caption, videoLocation):
         logger.error(f"Upload error: {e}")
         return False
     finally:
-        if 'browser' in locals():
+        if session and tabHandle:
+            session.closeTab(tabHandle, driver)
+        elif browser:
+            browser.closeBrowser()
+
+
+def uploadBatchToYoutube(profileName, items, session=None, driver=None, checkpoints=None, onResult=None):
+    """
+    Upload several videos through one Studio upload dialog
+
+    All files are selected at once so their transfers run in parallel, then each
+    file's details are filled in and published from the batch list in turn.
+    A failed item is left as a draft and doesn't stop the others
+
+    Args:
+        profileName (str): Name of the profile from config
+        items (list): (title, description, videoLocation) per video, optionally with its tags as a fourth value
+        session (BrowserManager): Pooled Chrome session, or None for a standalone launch
+        driver: Driver to use instead of the session's own
+        checkpoints (list): Checkpoint per item, saved once its file is in Studio
+        onResult (callable): Called with (item index, result) as each video finishes
+
+    Returns:
+        list: Upload result per item
+    """
+    startTime = time.time()
+    browser = None
+    tabHandle = None
+    results = [False] * len(items)
+    checkpoints = checkpoints or [None] * len(items)
+    reported = set()
+    
+    def report(itemIndex, result):
+        results[itemIndex] = result
+        reported.add(itemIndex)
+        if onResult:
+            onResult(itemIndex, result)
+    
+    try:
+        print(highlight(f"\n=== YouTube Batch Upload: {len(items)} videos ==="))
+        logger = setupLogging("youtube_upload.log", profileName)
+        logger.info(f"Starting batch upload of {len(items)} videos")
+        
+        tags = profiles[profileName]["tags"]
+        channelId = profiles[profileName]["youtubeChannelId"]
+        url = f'{youtubeStudioUrl}/channel/{channelId}'
+        
+        if session:
+            driver = driver or session.driver
+            tabHandle = session.openTab(url, driver)
+        else:
+            browser = BrowserManager(profiles, profileName)
+            if not browser.startBrowser(url):
+                for itemIndex in range(len(items)):
+                    report(itemIndex, False)
+                return results
+            driver = browser.driver
+        
+        with span("youtube.batchSelect", profile=profileName, files=len(items)):
+            startedAt = clickCreateAndUploadBatch(
+                driver, [item[2] for item in items],
+                stepTimeouts.get("youtube.clickCreateAndUpload", stepTimeouts["default"])
+            )
+        
+        for itemIndex, (title, description, videoLocation, *itemTags) in enumerate(items):
+            checkpoint = checkpoints[itemIndex]
+            uploadSuccess = False
+            with span("youtube.upload", profile=profileName, batch=True):
+                try:
+                    print(highlight(f"\n--- {itemIndex + 1}/{len(items)}: {title.upper()} ---"))
+                    openBatchItem(driver, videoLocation, profileName=profileName)
+                    if checkpoint:
+                        checkpoint.reached("fileSelected", videoId=captureVideoId(driver))
+                    
+                    def onCheckpoint(stage, checkpoint=checkpoint):
+                        if checkpoint:
+                            checkpoint.reached(stage)
+                    
+                    # Studio queues the batch, only the first file starts transferring at selection. The
+                    # others are measured from their first progress reading instead of the shared start
+                    wizard = buildYoutubeWizard(
+                        driver, title, description, videoLocation, itemTags[0] if itemTags else tags, profileName,
+                        onCheckpoint, startedAt if itemIndex == 0 else None, batchItemPublished(videoLocation)
+                    )
+                    uploadSuccess = wizard.run("clickCreateAndUpload")
+                except Exception as e:
+                    print(error(f"❌ {title}: {e}"))
+                    logger.error(f"Batch item {title} error: {e}")
+                if uploadSuccess:
+                    logger.info(f"Batch item {title} published")
+                else:
+                    setOutcome("failed")
+                    closeBatchEditor(driver)
+            report(itemIndex, uploadSuccess)
+        
+        duration = time.time() - startTime
+        published = sum(1 for result in results if result)
+        print(success(f"🏁 Batch finished in {int(duration // 60)}m {int(duration % 60)}s: "
+                      f"{published}/{len(items)} published"))
+        logger.info(f"Batch finished: {published}/{len(items)} published")
+        return results
+    
+    except Exception as e:
+        print(error(f"❌ Batch error: {e}"))
+        logger.error(f"Batch upload error: {e}")
+        for itemIndex in range(len(items)):
+            if itemIndex not in reported:
+                report(itemIndex, False)
+        return results
+    finally:
+        if session and tabHandle:
+            session.closeTab(tabHandle, driver)
+        elif browser:
             browser.closeBrowser()
 
 